@@ -30,7 +30,7 @@ import qdarkstyle
 from PyQt6.QtCore import QMimeData, Qt, QTimer, QSize
 from PyQt6.QtGui import QColor, QAction, QTextCharFormat, QTextCursor, QIcon, QPixmap, QActionGroup
 from PyQt6.QtWidgets import QDialog, QFileDialog, QMessageBox, QLabel, QComboBox, QTreeWidgetItem, \
-    QTableWidgetItem, QHeaderView, QToolTip, QTableWidget, QMenu, QToolButton
+    QTableWidgetItem, QHeaderView, QToolTip, QTableWidget, QMenu, QToolButton, QProgressBar
 from docx.shared import Mm
 from docxtpl import DocxTemplate
 from qgis.PyQt.QtWidgets import QMainWindow
@@ -46,10 +46,16 @@ import os.path
 
 from ui.main_frame_qt_designer import Ui_MainWindow
 from ui.about_dialog_qt_designer import Ui_Dialog as UiDialogAbout
+from utils.async_sqlite_utils import AsyncSqliteUtils
+from utils.cache_utils import DetailCache
 from utils.data_utils import DataUtils
+from utils.import_utils import ImportUtils
 from utils.io_utils import IOUtils
+from utils.kpi_utils import KpiUtils, KPI_HIGH_LOAD_PRB
+from utils.measurement_utils import MeasurementUtils
 from utils.qgis_utils import CustomIdentifyTool, QGISCanvasUtils, CustomDistanceTool, CustomAzimuthMeasurementTool, \
-    CustomPolygonMapTool
+    CustomPolygonMapTool, BUBBLE_MAX_SIZE_DEFAULT
+from utils.raster_utils import SCIPY_AVAILABLE
 from utils.sqlite_utils import SqliteUtils
 from windows.existing_project_eval_widget import ExistingProjectEvalDialog
 from windows.tianditu_apikey_management_widget import TiandituApikeyManagementDialog
@@ -89,17 +95,27 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.mapCanvas = QgsMapCanvas(self)
         # 画布并行渲染，防止黑屏
         self.mapCanvas.setParallelRenderingEnabled(True)
-        self.conn = sqlite3.connect(database_path)
+        # 写操作通过异步访问层的写连接串行执行，主线程连接等待写锁的时间与写连接一致，避免批量导入期间报database is locked
+        self.conn = sqlite3.connect(database_path, timeout=30)
         self.statusMessageTimer = QTimer(self)
         self.statusMessageBlinkTimer = QTimer(self)
         #self.layerFlashTimer = QTimer(self)
         #self.bubbleExpandTimer = QTimer(self)
         #self.bubble_expand_finished_signal_connected = False
         self.sql_util = SqliteUtils()
+        # 异步数据库访问层（只读连接池与唯一写连接），供项目树、评估和批量任务共用
+        self.async_db = AsyncSqliteUtils(database_path, parent=self)
+        self.async_db.task_failed_signal.connect(lambda message: self.log_text_field_update(message, 4))
+        # 项目树明细面板的查询缓存，展开节点时后台预取子节点明细
+        self.detail_cache = DetailCache(self.conn, self.async_db)
         self.qgs_canvas_util = QGISCanvasUtils(self, PROJECT, self.conn)
         self.data_util = DataUtils()
         self.io_util = IOUtils()
         self.existing_project_eval_docx_save_path = '/'
+        # 实测占用评估模式，开启后现有项目评估时扫描原始测量点
+        self.measurement_eval_mode = False
+        # 项目树点击序号，明细异步查询完成时仅处理最后一次点击
+        self.project_tree_click_serial = 0
 
 
 
@@ -177,6 +193,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # 添加状态栏中的显示内容
         self.statusMessageBox = QLabel('')
         self.statusbar.addWidget(self.statusMessageBox, 1)
+        # 后台加载图层的进度条，无加载任务时隐藏
+        self.statusProgressBar = QProgressBar(self)
+        self.statusProgressBar.setRange(0, 100)
+        self.statusProgressBar.setFixedWidth(150)
+        self.statusProgressBar.hide()
+        self.statusbar.addWidget(self.statusProgressBar)
         self.statusXY = QLabel('{:<40}'.format(''))  # x y 坐标状态
         self.statusbar.addWidget(self.statusXY, 1)
         self.statusXY.setFixedWidth(200)
@@ -264,6 +286,50 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.menubar_about_button.clicked.connect(self.m2_about_triggered)
         self.menubar.setCornerWidget(self.menubar_about_button, Qt.Corner.TopRightCorner)
 
+        # 项目评估菜单增加栅格覆盖索引模式开关
+        self.m2_sector_grid_mode = QAction("栅格覆盖索引模式", self)
+        self.m2_sector_grid_mode.setCheckable(True)
+        self.m2_sector_grid_mode.setToolTip("以扇区覆盖栅格代替逐要素几何判定，速度更快，结果按格网精度略有外扩")
+        self.m2_sector_grid_mode.toggled.connect(self.m2_sector_grid_mode_toggled)
+        self.menu_2.addSeparator()
+        self.menu_2.addAction(self.m2_sector_grid_mode)
+        self.m2_distance_field_mode = QAction("距离场冗余评估模式", self)
+        self.m2_distance_field_mode.setCheckable(True)
+        self.m2_distance_field_mode.setToolTip("冗余度评估时对项目边界做一次距离变换，批量获取扇区距离，临界扇区自动精确复核")
+        self.m2_distance_field_mode.toggled.connect(self.m2_distance_field_mode_toggled)
+        self.menu_2.addAction(self.m2_distance_field_mode)
+        self.m2_measurement_eval_mode = QAction("实测占用评估模式", self)
+        self.m2_measurement_eval_mode.setCheckable(True)
+        self.m2_measurement_eval_mode.setToolTip("现有项目评估时流式扫描已导入的路测/MDT原始测量点，统计项目范围内实际占用的服务小区，识别未纳入项目的小区")
+        self.m2_measurement_eval_mode.toggled.connect(self.m2_measurement_eval_mode_toggled)
+        self.menu_2.addAction(self.m2_measurement_eval_mode)
+        self.m2_project_conflict_matrix = QAction("项目冲突矩阵", self)
+        self.m2_project_conflict_matrix.setToolTip("增量计算全网ToB项目之间的重叠和最小距离，并导出为表格或GeoPackage")
+        self.m2_project_conflict_matrix.triggered.connect(self.m2_project_conflict_matrix_triggered)
+        self.menu_2.addAction(self.m2_project_conflict_matrix)
+        self.m2_clear_bubble_cache = QAction("清空气泡扩散缓存", self)
+        self.m2_clear_bubble_cache.setToolTip("清空现有项目评估的气泡扩散结果缓存，下次评估将重新进行气泡扩散")
+        self.m2_clear_bubble_cache.triggered.connect(self.m2_clear_bubble_cache_triggered)
+        self.menu_2.addAction(self.m2_clear_bubble_cache)
+        # 文件菜单增加工参及项目清单批量导入
+        self.m2_import_parameter = QAction("批量导入工参/项目清单", self)
+        self.m2_import_parameter.setToolTip("从CSV/XLSX导入项目明细、基站明细或小区明细，按表头自动识别目标表")
+        self.m2_import_parameter.triggered.connect(self.m2_import_parameter_triggered)
+        self.m1_files.addSeparator()
+        self.m1_files.addAction(self.m2_import_parameter)
+        self.m2_build_sector_layer = QAction("由工参生成扇区图层", self)
+        self.m2_build_sector_layer.setToolTip("根据工参中的经纬度、方位角批量生成宏站、室分扇区图层，保存至工参目录")
+        self.m2_build_sector_layer.triggered.connect(self.m2_build_sector_layer_triggered)
+        self.m1_files.addAction(self.m2_build_sector_layer)
+        self.m2_import_measurement = QAction("导入路测/MDT数据", self)
+        self.m2_import_measurement.setToolTip("流式导入路测或MDT测量点，按六边形格网和服务小区汇聚，用于与项目评估结果交叉核对")
+        self.m2_import_measurement.triggered.connect(self.m2_import_measurement_triggered)
+        self.m1_files.addAction(self.m2_import_measurement)
+        self.m2_import_kpi = QAction("导入小区KPI数据", self)
+        self.m2_import_kpi.setToolTip("导入小时或天粒度的小区KPI（PRB利用率、RRC用户数、吞吐量），自动汇聚为天、周忙时负荷，用于新项目容量评估")
+        self.m2_import_kpi.triggered.connect(self.m2_import_kpi_triggered)
+        self.m1_files.addAction(self.m2_import_kpi)
+
         """
         完成初始化
         """
@@ -314,8 +380,13 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         renderer = QgsSingleSymbolRenderer(symbol)
         layer_to_add.setRenderer(renderer)
 
+        # 增量登记工参快照目录，之后从目录中直接查询最新工参
+        added_snapshot_count, removed_snapshot_count, _ = self.io_util.update_parameter_catalog(self.conn)
+        if added_snapshot_count or removed_snapshot_count:
+            self.log_text_field_update(f"工参快照目录新增或更新{added_snapshot_count}期、移除{removed_snapshot_count}期")
+
         # 加载宏站图层
-        shp = self.io_util.find_latest_para_file('宏站扇区图层')[0]
+        shp = self.io_util.find_latest_para_file('宏站扇区图层', self.conn)[0]
         if shp:
             layer_to_add = QgsVectorLayer(shp, '宏站扇区图层', "ogr")
             PROJECT.addMapLayer(layer_to_add)
@@ -353,7 +424,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
 
         # 加载室分图层
-        shp, latest_date = self.io_util.find_latest_para_file('室分扇区图层')
+        shp, latest_date = self.io_util.find_latest_para_file('室分扇区图层', self.conn)
         if shp:
             #shp = r"resources\layer\室分扇区图层20250519_2034.shp"
             layer_to_add = QgsVectorLayer(shp, '室分扇区图层', "ogr")
@@ -375,10 +446,24 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.log_text_field_update(f"数据库工参日期为{latest_date}")
         self.log_text_field_update("已完成工参数据加载")
-
-        # 加载ToB项目图层
-        project_data_dict_from_db = self.sql_util.get_project_full_data_include_wkt(self.conn)
-        project_data_dict_sorted = self.data_util.wkt_sort_processor(project_data_dict_from_db)
+        # 与上一版工参比对，仅对变化的扇区增量更新索引和缓存
+        self.qgs_canvas_util.update_sector_parameter_diff()
+        # 监视工参目录，新工参文件在后台加载后自动替换图层
+        self.qgs_canvas_util.start_parameter_file_watcher()
+
+        # 加载ToB项目图层，先对新增或WKT被修改的项目回填WKB，之后直接读取WKB，无需解析WKT文本
+        self.sql_util.migrate_project_geometry_wkb(self.conn)
+        if not self.sql_util.create_project_bbox_rtree(self.conn):
+            self.log_text_field_update("当前SQLite不支持R*Tree，项目冲突筛选将使用外包框列扫描", 3)
+        project_wkt_without_wkb = self.sql_util.get_project_wkt_without_wkb(self.conn)
+        if project_wkt_without_wkb:
+            self.sql_util.update_project_wkb(self.conn, [self.data_util.wkt_to_wkb_with_bbox(wkt) + (rowid,)
+                                                         for rowid, wkt in project_wkt_without_wkb])
+            self.log_text_field_update(f"已完成{len(project_wkt_without_wkb)}个项目的WKB几何回填")
+        project_data_dict_from_db = self.sql_util.get_project_full_data_include_wkb(self.conn)
+        project_data_dict_sorted = self.data_util.wkb_sort_processor(project_data_dict_from_db)
+        for wkb_dict in project_data_dict_sorted[3]:
+            self.log_text_field_update(f'项目[{wkb_dict['项目名称']}]无法生成有效的WKT几何形状', 2)
         if project_data_dict_sorted[2]:
             self.qgs_canvas_util.create_layer_from_wkt(project_data_dict_sorted[2], 6, 'ToB项目图层_面')
             layer = QgsProject.instance().mapLayersByName("ToB项目图层_面")[0]
@@ -446,11 +531,21 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.projectTreeWidget.setHeaderHidden(True)
         self.projectTreeWidget.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
 
+        self.sql_util.create_summary_tables(self.conn)
+        if not self.sql_util.create_search_index(self.conn):
+            self.log_text_field_update("当前SQLite不支持FTS5，回车检索将使用明细表扫描", 3)
+        self.projectSearchLineEdit.returnPressed.connect(self.project_search_lineedit_return_pressed)
         self.list_projects = self.sql_util.get_project_tree_inner_text(self.conn)
+        project_band_mix_dict = self.sql_util.get_project_band_mix_dict(self.conn)
         project_tree_items = []
         for list_project in self.list_projects:
             project_item = QTreeWidgetItem([list_project[0], list_project[1], list_project[2]])
-            project_item.setToolTip(0, list_project[0])
+            band_mix = project_band_mix_dict.get(list_project[0])
+            if band_mix:
+                band_mix_text = '、'.join(f"{band if band else '未知频段'}:{count}" for band, count in band_mix.items())
+                project_item.setToolTip(0, f'{list_project[0]}\n频段构成（小区数）：{band_mix_text}')
+            else:
+                project_item.setToolTip(0, list_project[0])
             project_item.setToolTip(1, list_project[1])
             for list_gnb in list_project[3]:
                 gnb_item =  QTreeWidgetItem([list_gnb[0], list_gnb[1], list_gnb[2]])
@@ -471,6 +566,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.projectTreeWidget.setColumnWidth(1, int(projectTreeWidgetWidth * 0.10))
         self.projectTreeWidget.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
 
+        # 展开节点时后台预取子节点明细，键盘切换当前节点时同步更新明细
+        self.projectTreeWidget.itemExpanded.connect(self.project_tree_item_expanded)
+        self.projectTreeWidget.currentItemChanged.connect(self.project_tree_current_item_changed)
+
         self.projectTreeWidget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)  # 启用自定义右键菜单
         self.projectTreeWidget.customContextMenuRequested.connect(self.showProjectTreeContextMenu)  # 连接菜单显示方法
         self.log_text_field_update("已完成项目列表数据结构初始化并配置右键菜单")
@@ -503,6 +602,179 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     菜单按钮槽函数区域
     """
 
+    # 按钮名称：栅格覆盖索引模式
+    def m2_sector_grid_mode_toggled(self, checked):
+        """
+        切换栅格覆盖索引模式，开启后气泡扩散和区域相交判定改为查询扇区覆盖栅格，首次使用时按需加载或重建索引
+        :param checked: 是否开启
+        :type checked: bool
+        :return: None
+        """
+        self.qgs_canvas_util.sector_grid_mode = checked
+        self.log_text_field_update(f"栅格覆盖索引模式已{'开启' if checked else '关闭'}")
+
+    # 按钮名称：距离场冗余评估模式
+    def m2_distance_field_mode_toggled(self, checked):
+        """
+        切换距离场冗余评估模式，scipy不可用时仍使用逐扇区精确计算
+        :param checked: 是否开启
+        :type checked: bool
+        :return: None
+        """
+        self.qgs_canvas_util.distance_field_mode = checked
+        if checked and not SCIPY_AVAILABLE:
+            self.log_text_field_update("未安装scipy，距离场冗余评估模式不生效，将使用逐扇区精确计算", 3)
+        else:
+            self.log_text_field_update(f"距离场冗余评估模式已{'开启' if checked else '关闭'}")
+
+    # 按钮名称：实测占用评估模式
+    def m2_measurement_eval_mode_toggled(self, checked):
+        """
+        切换实测占用评估模式，开启后现有项目评估报告中增加实测占用评估结果，未导入测量数据时不生效
+        :param checked: 是否开启
+        :type checked: bool
+        :return: None
+        """
+        self.measurement_eval_mode = checked
+        if checked and not MeasurementUtils.get_batch_file_list(self.conn):
+            self.log_text_field_update("尚未导入路测/MDT数据（或原始文件已移动），实测占用评估模式暂不生效，请先通过文件菜单导入", 3)
+        else:
+            self.log_text_field_update(f"实测占用评估模式已{'开启' if checked else '关闭'}")
+
+    # 按钮名称：项目冲突矩阵
+    def m2_project_conflict_matrix_triggered(self):
+        """
+        增量更新全网项目冲突矩阵（距离阈值与新项目冲突评估相同，为气泡最大半径的3倍），并导出
+        :return: None
+        """
+        self.log_text_field_update("开始计算全网项目冲突矩阵")
+        updated_project_count = self.qgs_canvas_util.update_project_conflict_matrix(BUBBLE_MAX_SIZE_DEFAULT*3)
+        self.log_text_field_update(f"已完成项目冲突矩阵更新，本次重新计算{updated_project_count}个项目")
+        output_filepath, _ = QFileDialog.getSaveFileName(self, "导出项目冲突矩阵", "./项目冲突矩阵.csv",
+                                                         "CSV文件 (*.csv);;GeoPackage (*.gpkg)")
+        if output_filepath:
+            error_message = self.qgs_canvas_util.export_project_conflict_matrix(output_filepath)
+            if error_message:
+                self.log_text_field_update(error_message, 4)
+                self.statusbar_message_update("项目冲突矩阵导出失败")
+            else:
+                self.log_text_field_update(f"已导出项目冲突矩阵至{output_filepath}")
+                self.statusbar_message_update("项目冲突矩阵导出成功", 3000, 'lightgreen')
+
+    # 按钮名称：清空气泡扩散缓存
+    def m2_clear_bubble_cache_triggered(self):
+        cleared_count = self.qgs_canvas_util.bubble_result_cache.invalidate()
+        self.log_text_field_update(f"已清空气泡扩散缓存，共{cleared_count}条")
+        self.statusbar_message_update("已清空气泡扩散缓存", 3000, 'lightgreen')
+
+    # 按钮名称：批量导入工参/项目清单
+    def m2_import_parameter_triggered(self):
+        """
+        选择CSV/XLSX文件，在异步访问层的写连接中批量导入，完成后在日志中输出导入报告
+        :return: None
+        """
+        import_filepath, _ = QFileDialog.getOpenFileName(self, "选择工参或项目清单", "",
+                                                         "表格文件 (*.csv *.xlsx);;CSV文件 (*.csv);;Excel文件 (*.xlsx)")
+        if not import_filepath:
+            return
+        remove_missing = QMessageBox.question(
+            self, '导入方式', '文件是否为该表的全量清单？\n选择“是”将删除数据库中文件里不存在的行，选择“否”仅新增和修改',
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No) == QMessageBox.StandardButton.Yes
+        self.log_text_field_update(f"开始导入{import_filepath}")
+        self.statusbar_message_update("正在后台导入工参/项目清单")
+        self.async_db.write(ImportUtils.import_table, import_filepath, remove_missing=remove_missing,
+                            callback=self.import_parameter_finished, error_callback=self.import_parameter_failed)
+
+    # 按钮名称：由工参生成扇区图层
+    def m2_build_sector_layer_triggered(self):
+        """
+        选择工参文件，在后台任务中批量生成宏站、室分扇区图层
+        :return: None
+        """
+        parameter_filepath, _ = QFileDialog.getOpenFileName(self, "选择工参", "",
+                                                            "表格文件 (*.csv *.xlsx);;CSV文件 (*.csv);;Excel文件 (*.xlsx)")
+        if not parameter_filepath:
+            return
+        self.log_text_field_update(f"开始由{parameter_filepath}在后台生成扇区图层")
+        self.statusbar_message_update("正在后台生成扇区图层")
+        # 读取工参、生成扇区和写入shp在后台任务中完成，完成后触发新工参检查
+        self.qgs_canvas_util.start_sector_layer_build(parameter_filepath)
+
+    # 按钮名称：导入路测/MDT数据
+    def m2_import_measurement_triggered(self):
+        """
+        选择路测/MDT文件，在异步访问层的写连接中流式导入并汇聚，完成后在日志中输出导入报告
+        :return: None
+        """
+        measurement_filepath, _ = QFileDialog.getOpenFileName(self, "选择路测/MDT数据", "",
+                                                              "表格文件 (*.csv *.xlsx);;CSV文件 (*.csv);;Excel文件 (*.xlsx)")
+        if not measurement_filepath:
+            return
+        self.log_text_field_update(f"开始导入测量数据{measurement_filepath}")
+        self.statusbar_message_update("正在后台导入路测/MDT数据")
+        self.async_db.write(MeasurementUtils.import_measurement, measurement_filepath,
+                            callback=self.import_measurement_finished, error_callback=self.import_measurement_failed)
+
+    # 路测/MDT数据导入完成，输出导入报告
+    def import_measurement_finished(self, report):
+        self.log_text_field_update(
+            f"测量数据导入完成（批次{report['批次号']}）：读取{report['读取点数']}个点，有效{report['有效点数']}个，"
+            f"汇聚为{report['格网数']}个格网-小区组合，服务小区{report['服务小区数']}个，"
+            f"耗时{report['耗时']:.1f}秒（{report['点每秒']:.0f}点/秒）")
+        self.statusbar_message_update("路测/MDT数据导入完成", 3000, 'lightgreen')
+
+    # 路测/MDT数据导入失败
+    def import_measurement_failed(self, error):
+        self.log_text_field_update(f"路测/MDT数据导入失败，数据库未作修改：{error}", 4)
+        self.statusbar_message_update("路测/MDT数据导入失败")
+
+    # 按钮名称：导入小区KPI数据
+    def m2_import_kpi_triggered(self):
+        """
+        选择小区KPI文件，在异步访问层的写连接中导入并汇聚为天、周忙时负荷，完成后在日志中输出导入报告
+        :return: None
+        """
+        kpi_filepath, _ = QFileDialog.getOpenFileName(self, "选择小区KPI数据", "",
+                                                      "表格文件 (*.csv *.xlsx);;CSV文件 (*.csv);;Excel文件 (*.xlsx)")
+        if not kpi_filepath:
+            return
+        self.log_text_field_update(f"开始导入小区KPI数据{kpi_filepath}")
+        self.statusbar_message_update("正在后台导入小区KPI数据")
+        self.async_db.write(KpiUtils.import_kpi, kpi_filepath,
+                            callback=self.import_kpi_finished, error_callback=self.import_kpi_failed)
+
+    # 小区KPI数据导入完成，输出导入报告
+    def import_kpi_finished(self, report):
+        self.log_text_field_update(
+            f"小区KPI数据导入完成（{report['粒度']}粒度）：读取{report['读取行数']}行，有效{report['有效行数']}行，"
+            f"无效{report['无效行数']}行，涉及小区{report['小区数']}个、{report['天数']}天、{report['周数']}周，"
+            f"耗时{report['耗时']:.1f}秒（{report['行每秒']:.0f}行/秒）")
+        self.statusbar_message_update("小区KPI数据导入完成", 3000, 'lightgreen')
+
+    # 小区KPI数据导入失败
+    def import_kpi_failed(self, error):
+        self.log_text_field_update(f"小区KPI数据导入失败，数据库未作修改：{error}", 4)
+        self.statusbar_message_update("小区KPI数据导入失败")
+
+    # 工参/项目清单导入完成，输出导入报告
+    def import_parameter_finished(self, report):
+        self.log_text_field_update(
+            f"[{report['表名']}]导入完成：读取{report['读取行数']}行，新增{report['新增']}行，修改{report['修改']}行，"
+            f"删除{report['删除']}行，未变化{report['未变化']}行，文件中不存在{report['文件中不存在']}行，"
+            f"无效{len(report['无效行'])}行，耗时{report['耗时']:.1f}秒（{report['行每秒']:.0f}行/秒）")
+        for line_number, error in report['无效行'][:20]:
+            self.log_text_field_update(f"第{line_number}行无效：{error}", 3)
+        if len(report['无效行']) > 20:
+            self.log_text_field_update(f"其余{len(report['无效行']) - 20}行无效行未列出", 3)
+        self.log_text_field_update("项目列表和项目图层将在重新启动后按导入结果刷新")
+        self.statusbar_message_update("工参/项目清单导入完成", 3000, 'lightgreen')
+
+    # 工参/项目清单导入失败
+    def import_parameter_failed(self, error):
+        self.log_text_field_update(f"工参/项目清单导入失败，数据库未作修改：{error}", 4)
+        self.statusbar_message_update("工参/项目清单导入失败")
+
     # 按钮名称：关于
     def m2_about_triggered(self):
         self.log_text_field_update(
@@ -695,7 +967,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     """
 
     # 槽函数：用于用户点选某个站点或项目后显示其详细信息并平移缩放地图
-    def project_tree_item_clicked(self, item, column, blink=True):
+    def project_tree_item_clicked(self, item, column, blink=True, node_dict=None):
         """
         槽函数
         用于用户点选某个站点或项目后显示其详细信息并平移缩放地图，对于点选的项目将项目和小区高亮，对于点选的小区高亮
@@ -706,7 +978,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         对点选的父节点，计划首先在图层中搜索项目图层并平移至项目，如果没有图层则平移至所有站点对应的最大和最小经纬度区域（尚未开发完成）
 
-        完成后调用tableWidgetDetailTable.setItem更新右侧表格
+        明细未命中缓存时通过异步访问层在读线程中查询，查询完成后再高亮小区并调用tableWidgetDetailTable.setItem更新右侧表格
 
         组件：projectTreeWidget
         组件位置：左上
@@ -714,9 +986,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         :param item: 自动传入，projectTreeWidget组件中当前点击的QTreeWidgetItem
         :type item: QTreeWidgetItem
+        :param node_dict: 调用方已查询的节点明细（DetailCache.get_node_dict的结果），传入时同步完成高亮，例如报告截图前
+        :type node_dict: dict{tuple:list}
         :return: None
         """
-        detail_title_and_data_return = []
         # 删除一切临时图层
         self.qgs_canvas_util.del_layer_by_name('临时项目图层')
         self.qgs_canvas_util.del_layer_by_name('临时扇区图层')
@@ -733,8 +1006,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         # 点击的是项目节点
         if item.text(2) in ['园区','线路','散点']:
-            detail_title_and_data_return = self.sql_util.get_detail_table(self.conn, 0, item.text(0))
-
+            level, vlookup_field = 0, item.text(0)
             self.log_text_field_update(f"已选择项目:[{item.text(0)}]")
 
             #高亮显示项目
@@ -806,37 +1078,57 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 self.statusbar_message_update(f"项目[{item.text(0)}]为零星散点项目，且未提供终端分布，无法进行项目地理化边界呈现")
                 project_shp_valid_flag = False
 
-            # 获取高亮小区列表
-            highlight_cgi_list = self.sql_util.get_project_cgi_list(self.conn, item.text(0))
-
         # 点击的是小区节点
         elif item.text(2) == 'c':
+            level, vlookup_field = 2, item.text(0)
             self.log_text_field_update(f"已选择小区:[{item.text(0)}]")
-            # print(item.parent().parent().text(0))
-            highlight_cgi_list = [item.text(0)]
-            detail_title_and_data_return = self.sql_util.get_detail_table(self.conn, 2, item.text(0))
-            detail_title_and_data_return_dict = {item[0]: item[1] for item in detail_title_and_data_return}
-            try:
-                lon = float(detail_title_and_data_return_dict.get('经度'))
-                lat = float(detail_title_and_data_return_dict.get('纬度'))
-                if 116 < lon < 119 and 37 < lat < 42:
-                    self.qgs_canvas_util.set_canvas_extend_to_cord(lon, lat, 20000)
-                    self.qgs_canvas_util.add_marker_in_canvas(lon, lat, 1000, 10, QgsVertexMarker.ICON_CIRCLE)
-            except ValueError:
-                print('该站点经纬度有误')
         # 点击的是基站节点
         else:
+            level, vlookup_field = 1, item.text(2)
             self.log_text_field_update(f"已选择基站:[{item.text(0)}]")
-            detail_title_and_data_return = self.sql_util.get_detail_table(self.conn, 1, item.text(2))
+
+        # 明细和高亮小区列表未命中缓存时在读线程中查询，连续点击时仅处理最后一次点击的结果
+        self.project_tree_click_serial += 1
+        click_serial = self.project_tree_click_serial
+        self.detail_cache.load(level, vlookup_field, lambda detail_title_and_data_return, highlight_cgi_list, summary_list:
+                               self.project_tree_item_detail_loaded(click_serial, level, project_shp_valid_flag,
+                                                                    detail_title_and_data_return, highlight_cgi_list,
+                                                                    summary_list), node_dict)
+
+    # 项目树节点明细查询完成，定位基站/小区、高亮小区并更新右侧表格
+    def project_tree_item_detail_loaded(self, click_serial, level, project_shp_valid_flag, detail_title_and_data_return,
+                                        highlight_cgi_list, summary_list):
+        """
+        项目树节点明细查询完成后在主线程中执行：基站和小区节点按经纬度定位，高亮小区，更新右侧表格，
+        期间用户已点击其他节点时忽略本次结果
+        :param click_serial: 点击序号
+        :type click_serial: int
+        :param level: 0为项目，1为基站，2为小区
+        :type level: int
+        :param project_shp_valid_flag: 项目节点是否已按项目边界缩放画布
+        :type project_shp_valid_flag: bool
+        :param detail_title_and_data_return: [字段名, 字段值]列表，无结果为None
+        :type detail_title_and_data_return: list[list[str]]
+        :param highlight_cgi_list: 高亮小区列表
+        :type highlight_cgi_list: list[str]
+        :param summary_list: 从物化汇总表查询的统计信息行
+        :type summary_list: list[list[str]]
+        :return: None
+        """
+        if click_serial != self.project_tree_click_serial:
+            return
+        detail_title_and_data_return = detail_title_and_data_return or []
+
+        # 点击的是基站或小区节点，按经纬度定位
+        if level != 0:
             detail_title_and_data_return_dict = {item[0]: item[1] for item in detail_title_and_data_return}
-            highlight_cgi_list = self.sql_util.get_gnb_cgi_list(self.conn, item.text(2))
             try:
                 lon = float(detail_title_and_data_return_dict.get('经度'))
                 lat = float(detail_title_and_data_return_dict.get('纬度'))
                 if 116<lon<119 and 37<lat<42:
                     self.qgs_canvas_util.set_canvas_extend_to_cord(lon, lat, 20000)
                     self.qgs_canvas_util.add_marker_in_canvas(lon, lat, 1000, 10, QgsVertexMarker.ICON_CIRCLE)
-            except ValueError:
+            except (TypeError, ValueError):
                 print('该站点经纬度有误')
 
         # 高亮小区
@@ -878,6 +1170,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 self.mapCanvas.setExtent(self.qgs_canvas_util.transformer_4326_to_3857.transform(temp_highlight_cell_layer.extent()))
 
 
+        # 从物化汇总表追加统计信息，无需重新计数
+        if detail_title_and_data_return:
+            detail_title_and_data_return.extend(summary_list)
+
         # 更新右侧表格数据
         self.tableWidgetDetailTable.setRowCount(len(detail_title_and_data_return))
         row_wkt_del = -1
@@ -896,6 +1192,49 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.tableWidgetDetailTable.removeRow(row_wkt_del)
 
 
+    # 槽函数：项目树节点展开时后台预取子节点明细
+    def project_tree_item_expanded(self, item):
+        """
+        槽函数
+
+        项目节点展开时预取其下全部基站的明细和小区列表，基站节点展开时预取其下全部小区的明细，
+        预取在后台线程完成，之后在子节点间用方向键切换时直接命中缓存
+
+        组件：projectTreeWidget
+        组件位置：左上
+        信号：itemExpanded(QTreeWidgetItem*)
+
+        :param item: 自动传入，展开的QTreeWidgetItem
+        :type item: QTreeWidgetItem
+        :return: None
+        """
+        if item.text(2) in ['园区','线路','散点']:
+            self.detail_cache.prefetch(1, [item.child(i).text(2) for i in range(item.childCount())])
+        elif item.text(2) != 'c':
+            self.detail_cache.prefetch(2, [item.child(i).text(0) for i in range(item.childCount())])
+
+    # 槽函数：使用键盘切换项目树当前节点时更新明细
+    def project_tree_current_item_changed(self, current, previous):
+        """
+        槽函数
+
+        使用方向键切换项目树当前节点时更新明细与地图定位（不闪烁），鼠标点击由itemClicked处理，此处忽略
+
+        组件：projectTreeWidget
+        组件位置：左上
+        信号：currentItemChanged(QTreeWidgetItem*,QTreeWidgetItem*)
+
+        :param current: 自动传入，当前QTreeWidgetItem
+        :type current: QTreeWidgetItem
+        :param previous: 自动传入，之前的QTreeWidgetItem
+        :type previous: QTreeWidgetItem
+        :return: None
+        """
+        if current is None or not self.projectTreeWidget.hasFocus() \
+                or QgsApplication.mouseButtons() != Qt.MouseButton.NoButton:
+            return
+        self.project_tree_item_clicked(current, 0, False)
+
     # 槽函数：在项目列表上方搜索框输入文字触发事件，实时筛选项目树中匹配的行
     def project_search_lineedit_text_changed(self, text):
         """
@@ -975,6 +1314,49 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         if text != '' and match_layer != 1:
             self.projectTreeWidget.expandAll()
 
+    # 槽函数：在项目列表上方搜索框按下回车触发事件，通过全文检索定位到最相关的项目、基站或小区
+    def project_search_lineedit_return_pressed(self):
+        """
+        槽函数
+
+        在项目列表上方搜索框按下回车触发事件，调用SqliteUtils.search在项目、基站、小区的名称、标识、行政区、厂家、频段中检索，
+        在项目树中定位并点选相关度最高的结果，其余结果打印在日志中
+
+        组件：projectSearchLineEdit
+        组件位置：左上
+        信号：returnPressed()
+
+        :return: None
+        """
+        text = self.projectSearchLineEdit.text()
+        search_results = self.sql_util.search(self.conn, text, 10)
+        if not search_results:
+            self.statusbar_message_update(f"未检索到[{text}]相关的项目、基站或小区")
+            return
+        self.log_text_field_update(f"检索到[{text}]相关结果{len(search_results)}条：" + '、'.join(
+            f"{search_result['类型']}[{search_result['名称']}]" for search_result in search_results))
+
+        # 检索结果可能不在当前筛选后的项目树中，先恢复完整项目树
+        search_result = search_results[0]
+        item = self.find_project_item_in_project_tree_by_name(search_result['项目名称'])
+        if not item:
+            self.project_search_lineedit_text_changed('')
+            item = self.find_project_item_in_project_tree_by_name(search_result['项目名称'])
+        if not item:
+            self.statusbar_message_update(f"{search_result['类型']}[{search_result['名称']}]未归属项目树中的项目")
+            return
+        if search_result['类型'] in ['基站', '小区']:
+            gnb_item = next((item.child(i) for i in range(item.childCount())
+                             if item.child(i).text(2) == search_result['基站号']), None)
+            if gnb_item:
+                item = gnb_item
+                if search_result['类型'] == '小区':
+                    item = next((gnb_item.child(i) for i in range(gnb_item.childCount())
+                                 if gnb_item.child(i).text(0) == search_result['标识']), gnb_item)
+        self.projectTreeWidget.setCurrentItem(item)
+        self.projectTreeWidget.scrollToItem(item)
+        self.project_tree_item_clicked(item, 0)
+
     def pushButtonNewProjectDrawBorder_clicked(self):
         self.qgs_canvas_util.create_temp_polygon_layer_in_canvas('临时多边形图层_新项目评估')
         self.polygon_tool = CustomPolygonMapTool(self.mapCanvas, self.active_layer)
@@ -1002,7 +1384,68 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 self.qgs_canvas_util.algorithm_bubble_expand('', True)
 
     def new_project_eval_post_bubble_expand(self, evaluate_project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list):
-
+        report_args = (evaluate_project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list)
+        # 评估项目边界的外包框（EPSG:4326），用于通过R*Tree筛选候选冲突项目
+        layer_temp_polygon = PROJECT.mapLayersByName('临时多边形图层_新项目评估')[0]
+        expression = QgsExpression(f'"名称" = \'评估项目边界\'')
+        features_layer_temp_polygon = list(layer_temp_polygon.getFeatures(QgsFeatureRequest(expression)))
+        bbox = None
+        if features_layer_temp_polygon:
+            geom_temp_4326 = features_layer_temp_polygon[0].geometry()
+            geom_temp_4326.transform(self.qgs_canvas_util.transformer_3857_to_4326)
+            bbox_temp_4326 = geom_temp_4326.boundingBox()
+            bbox = (bbox_temp_4326.xMinimum(), bbox_temp_4326.yMinimum(), bbox_temp_4326.xMaximum(),
+                    bbox_temp_4326.yMaximum())
+        # 在读线程中查询候选小区的忙时负荷和候选冲突项目，完成后再生成报告，期间不阻塞界面
+        self.statusbar_message_update("正在后台查询项目评估数据")
+        self.async_db.read(self.query_new_project_eval_data,
+                           list(intersects_cgi_list or []) + list(outer_cgi_list or []), bbox, max_bubble_size * 3,
+                           callback=lambda eval_data: self.new_project_eval_report(*report_args, eval_data),
+                           error_callback=lambda error: self.log_text_field_update(
+                               f"项目评估数据查询失败，未生成报告：{error}", 4))
+
+    # 新项目评估所需的数据库查询，在读线程中执行
+    @staticmethod
+    def query_new_project_eval_data(conn, cgi_list, bbox, distance, days=7):
+        """
+        一次性查询新项目评估报告所需的数据库数据，仅访问数据库，通过异步访问层在读线程中执行
+        :param conn: 只读数据库连接
+        :type conn: Connection
+        :param cgi_list: 候选小区（高、中优先小区）
+        :type cgi_list: list[str]
+        :param bbox: 评估项目边界的外包框(xmin, ymin, xmax, ymax)（EPSG:4326），无边界时为None
+        :type bbox: tuple
+        :param distance: 冲突距离阈值（米）
+        :type distance: float
+        :param days: 忙时负荷的统计天数
+        :type days: int
+        :return: 忙时负荷、候选冲突项目、候选冲突项目的项目明细
+        :rtype: dict
+        """
+        project_list = SqliteUtils.get_project_list_near_bbox(conn, *bbox, distance) if bbox else []
+        return {
+            '忙时负荷': KpiUtils.get_busy_hour_load(conn, cgi_list, days) if cgi_list else {},
+            '候选项目': project_list,
+            '项目明细': [project_detail for project_name in project_list
+                         for project_detail in SqliteUtils.get_project_full_data_include_wkt(conn, project_name)]}
+
+    # 生成新项目评估报告
+    def new_project_eval_report(self, evaluate_project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list,
+                                eval_data):
+        """
+        基于气泡评估结果和读线程中查询的数据库数据进行容量和项目冲突评估，生成新项目评估报告
+        :param evaluate_project_name: 项目名称
+        :type evaluate_project_name: str
+        :param max_bubble_size: 气泡最大尺寸
+        :type max_bubble_size: float
+        :param intersects_cgi_list: 高优先小区
+        :type intersects_cgi_list: list[str]
+        :param outer_cgi_list: 中优先小区
+        :type outer_cgi_list: list[str]
+        :param eval_data: query_new_project_eval_data的查询结果
+        :type eval_data: dict
+        :return: None
+        """
         docx_template = DocxTemplate('resources/template/template_new_project_eval.docx')
         docx_template_render_context = {'project_name': self.lineEditProjectName.text(),
                                         'eval_date': datetime.date.today().isoformat()}
@@ -1178,6 +1621,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             ul_speed_sum += ul_speed / ratio_num
             dl_speed_sum += dl_speed / ratio_num
         docx_template_render_context["eval_result_network_cap_summary"].insert(0, f"经评估，该项目共需要上行带宽{ul_speed_sum:.2f}Mbps，下行带宽{dl_speed_sum:.2f}Mbps，需要基于实际项目用例和小区关系，合理规划整体容量。每个用例的详情如下：")
+        # 结合高、中优先小区近7天的忙时负荷评估现网容量余量
+        docx_template_render_context["eval_result_network_cap_summary"].extend(
+            self.get_cell_load_summary(list(intersects_cgi_list or []) + list(outer_cgi_list or []), eval_data['忙时负荷']))
 
         #项目冲突评估
         layer_temp_polygon = PROJECT.mapLayersByName('临时多边形图层_新项目评估')[0]
@@ -1189,9 +1635,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         project_list_high_risk = []
         if features_layer_temp_polygon:
             geom_temp = features_layer_temp_polygon[0].geometry()
+            # 已在读线程中通过R*Tree筛选外包框在冲突距离内的候选项目，仅对候选项目计算精确距离
             geom_temp.transform(self.qgs_canvas_util.transformer_3857_to_32650)
 
-            project_list = self.sql_util.get_project_list(self.conn)
+            project_list = eval_data['候选项目']
+            self.log_text_field_update(f"已通过空间索引筛选出{len(project_list)}个候选冲突项目")
 
             for project_name in project_list:
                 distance = self.qgs_canvas_util.get_distance_from_polygon_to_project(geom_temp, project_name)
@@ -1200,7 +1648,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 elif 0< distance < max_bubble_size * 3:
                     project_list_middle_risk.append([project_name,distance])
         if project_list_middle_risk or project_list_high_risk:
-            project_dict = self.sql_util.get_project_full_data_include_wkt(self.conn)
+            project_dict = eval_data['项目明细']
             docx_template_render_context["eval_project_cli_summary"] = [
                 f'经过评估，本次新增需求可能与{len(project_list_middle_risk) + len(project_list_high_risk)}个现网项目产生冲突或资源抢占情况，需要结合对应项目的业务内容、资源占用以及核心网下沉方式，综合评估两个项目之间的冲突问题，合理制定解决方案（如独立PLMN，独立切片RB预留等）。']
             if project_list_high_risk:
@@ -1327,6 +1775,20 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.statusCrsLabel.setText(
             f"坐标系: {mapSetting.destinationCrs().description()}-{mapSetting.destinationCrs().authid()}")
 
+    # 更新状态栏中后台加载的进度条
+    def statusbar_progress_update(self, progress):
+        """
+        更新状态栏中后台加载的进度条
+        :param progress: 进度（0-100），-1为隐藏进度条
+        :type progress: int
+        :return: None
+        """
+        if progress < 0:
+            self.statusProgressBar.hide()
+        else:
+            self.statusProgressBar.setValue(progress)
+            self.statusProgressBar.show()
+
     # 在状态栏左下角显示通知、提示或告警内容，可设置文字存在时间和文字颜色
     def statusbar_message_update(self, message, interval=5000, color = 'red'):
         """
@@ -1423,19 +1885,188 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         filePathList = [u.path()[1:] for u in mimeData.urls()]
         for filePath in filePathList:
             filePath: str = filePath.replace("/", "//")
-            if filePath.split(".")[-1].lower() in ["shp", "gpkg", "geojson", "kml", "tab"]:
-                layer_to_add = QgsVectorLayer(filePath, os.path.basename(filePath), "ogr")
-                PROJECT.addMapLayer(layer_to_add)
-                self.mapCanvas.setExtent(self.qgs_canvas_util.transformer_4326_to_3857.transform(layer_to_add.extent()))
+            if filePath.split(".")[-1].lower() in ["shp", "gpkg", "geojson", "kml", "tab", "csv"]:
+                # 在后台打开并校验图层，完成后再加入工程，避免大文件阻塞界面
+                self.qgs_canvas_util.load_dropped_layer(filePath)
 
             elif filePath == "":
                 pass
             else:
                 QMessageBox.about(self, '警告', f'{filePath}为不支持的文件类型，请拖拽矢量图层(shp,tab等)')
 
+    # 重写方法，关闭窗口时等待异步数据库任务完成并关闭其连接
+    def closeEvent(self, event):
+        self.async_db.close()
+        super().closeEvent(event)
+
     """
     MainWindow下属方法，实现各类功能
     """
+    # 根据小区KPI时序库中的忙时负荷生成容量评估的说明
+    def get_cell_load_summary(self, cgi_list, busy_hour_load_dict, days=7):
+        """
+        根据候选小区最近一段时间的忙时负荷，生成容量评估的说明，并在日志中列出高负荷小区
+        :param cgi_list: 候选小区
+        :type cgi_list: list[str]
+        :param busy_hour_load_dict: KpiUtils.get_busy_hour_load的查询结果（已在读线程中查询）
+        :type busy_hour_load_dict: dict
+        :param days: 统计天数
+        :type days: int
+        :return: 报告中的说明
+        :rtype: list[str]
+        """
+        if not busy_hour_load_dict:
+            return ['未导入候选小区的KPI数据，以上容量评估未考虑现网小区负荷。']
+        prb_dict = {cgi: load['忙时PRB利用率'] for cgi, load in busy_hour_load_dict.items()
+                    if load['忙时PRB利用率'] is not None}
+        summary_list = [f'结合小区KPI数据，{len(cgi_list)}个候选小区中{len(busy_hour_load_dict)}个有近{days}天的忙时负荷数据']
+        if not prb_dict:
+            summary_list[0] += '，但缺少PRB利用率，无法评估现网容量余量。'
+            return summary_list
+        summary_list[0] += f'，忙时PRB利用率平均为{sum(prb_dict.values()) / len(prb_dict):.1f}%。'
+        high_load_cgi_list = sorted((cgi for cgi, prb in prb_dict.items() if prb >= KPI_HIGH_LOAD_PRB),
+                                    key=lambda cgi: prb_dict[cgi], reverse=True)
+        if not high_load_cgi_list:
+            summary_list.append(f'候选小区忙时PRB利用率均低于{KPI_HIGH_LOAD_PRB:.0f}%，现网负荷对本项目业务接入的影响较小。')
+            return summary_list
+        cell_name_dict = {sector_info['唯一标识']: sector_info['小区名'] for layer_name in ('宏站扇区图层', '室分扇区图层')
+                          for sector_info in self.qgs_canvas_util.get_sector_info_from_layer(layer_name, high_load_cgi_list)}
+        high_load_text = '、'.join(f"{cell_name_dict.get(cgi, cgi)}（{prb_dict[cgi]:.1f}%）" for cgi in high_load_cgi_list)
+        summary_list.append(f'其中{len(high_load_cgi_list)}个小区忙时PRB利用率不低于{KPI_HIGH_LOAD_PRB:.0f}%：{high_load_text}，'
+                            f'项目业务接入后存在容量不足风险，建议扩容或通过切片RB预留保障项目带宽。')
+        self.log_text_field_update(f"候选小区中忙时高负荷小区{len(high_load_cgi_list)}个：{high_load_text}", 3)
+        return summary_list
+
+    # 实测占用评估：在读线程中扫描原始测量点，完成后继续生成现有项目评估报告
+    def measurement_project_eval(self, project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list, eval_data):
+        """
+        通过异步访问层在读线程中流式扫描已导入的路测/MDT原始测量点，统计项目范围内及周边的服务小区分布，
+        扫描完成（或失败）后在主线程中继续生成现有项目评估报告，扫描期间不阻塞界面
+        :param project_name: 项目名称
+        :type project_name: str
+        :param max_bubble_size: 气泡最大尺寸
+        :type max_bubble_size: float
+        :param intersects_cgi_list: 高风险小区
+        :type intersects_cgi_list: list[str]
+        :param outer_cgi_list: 中风险小区
+        :type outer_cgi_list: list[str]
+        :param eval_data: query_existing_project_eval_data的查询结果
+        :type eval_data: dict
+        :return: None
+        """
+        report_args = (project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list, eval_data)
+        geometry_project = self.qgs_canvas_util.project_geometry_cache.get_geometry(project_name, True)
+        if not geometry_project or geometry_project.isEmpty():
+            self.log_text_field_update("未找到项目几何，跳过实测占用评估", 3)
+            self.existing_project_eval_report(*report_args, {'文件数': 0})
+            return
+        project_cgi_list = eval_data['小区列表']
+        self.log_text_field_update("开始在后台扫描路测/MDT文件中位于项目范围内及周边的测量点")
+        self.statusbar_message_update("正在后台进行实测占用评估")
+        self.async_db.read(MeasurementUtils.evaluate_project_measurement, bytes(geometry_project.asWkb()),
+                           project_cgi_list,
+                           callback=lambda result: self.existing_project_eval_report(*report_args, result),
+                           error_callback=lambda error: self.measurement_project_eval_failed(report_args, error))
+
+    # 实测占用评估失败，记录日志后继续生成不含实测结果的报告
+    def measurement_project_eval_failed(self, report_args, error):
+        self.log_text_field_update(f"实测占用评估失败，报告中将不包含实测结果：{error}", 4)
+        self.existing_project_eval_report(*report_args, {'文件数': 0, '错误': str(error)})
+
+    # 将实测占用评估结果输出至日志并写入报告
+    def measurement_project_eval_render(self, project_name, measurement_result, docx_template_render_context):
+        """
+        将实测占用评估结果输出至日志并写入报告，识别实际承载项目业务但未纳入项目小区明细的小区
+        :param project_name: 项目名称
+        :type project_name: str
+        :param measurement_result: MeasurementUtils.evaluate_project_measurement的评估结果，为None表示未开启实测占用评估模式
+        :type measurement_result: dict
+        :param docx_template_render_context: 报告模板的渲染数据
+        :type docx_template_render_context: dict
+        :return: None
+        """
+        if measurement_result is None:
+            docx_template_render_context["eval_result_measured_risk_summary"] = [
+                f'本次评估未开启实测占用评估模式，未基于路测/MDT数据核对项目（{project_name}）的实际占用小区。']
+            return
+        if '错误' in measurement_result:
+            docx_template_render_context["eval_result_measured_risk_summary"] = [
+                f'本项目（{project_name}）实测占用评估执行失败，未基于路测/MDT数据核对实际占用小区。']
+            return
+        if not measurement_result['文件数']:
+            self.log_text_field_update("未找到已导入的路测/MDT原始文件，跳过实测占用评估", 3)
+            docx_template_render_context["eval_result_measured_risk_summary"] = [
+                f'本项目（{project_name}）暂无路测/MDT测量数据，未进行实测占用评估。']
+            return
+        serving_cell_list = measurement_result['服务小区列表']
+        missing_cell_list = measurement_result['未纳入项目小区列表']
+        self.log_text_field_update(
+            f"已扫描{measurement_result['文件数']}个文件中的测量点{measurement_result['读取点数']}个，"
+            f"项目范围内{measurement_result['项目内点数']}个，周边{measurement_result['项目周边点数']}个，"
+            f"实际占用服务小区{len(serving_cell_list)}个，其中{len(missing_cell_list)}个未纳入项目小区明细")
+        if not serving_cell_list:
+            docx_template_render_context["eval_result_measured_risk_summary"] = [
+                f'本项目（{project_name}）范围内及周边暂无路测/MDT测量点，未进行实测占用评估。']
+            return
+
+        included_count = int(sum(item['点数'] for item in serving_cell_list if item['已纳入项目']))
+        total_count = measurement_result['项目内点数'] + measurement_result['项目周边点数']
+        docx_template_render_context["eval_result_measured_risk_summary"] = [
+            f'基于路测/MDT数据，本项目（{project_name}）范围内及周边共有测量点{total_count}个，'
+            f'实际占用服务小区{len(serving_cell_list)}个，其中占用已纳入项目小区的测量点占比{included_count / total_count:.1%}。']
+        if not missing_cell_list:
+            docx_template_render_context["eval_result_measured_risk_summary"].append(
+                '未发现实际承载业务但未纳入项目的小区。')
+            return
+        docx_template_render_context["eval_result_measured_risk_summary"].append(
+            f'存在{len(missing_cell_list)}个实际承载业务但未纳入项目的小区，涉及小区详表如下:')
+        missing_cgi_list = [item['服务小区'] for item in missing_cell_list]
+        sector_info_dict = {sector_info['唯一标识']: sector_info for layer_name in ('宏站扇区图层', '室分扇区图层')
+                            for sector_info in self.qgs_canvas_util.get_sector_info_from_layer(layer_name, missing_cgi_list)}
+        measurement_table = []
+        for item in missing_cell_list:
+            sector_info = sector_info_dict.get(item['服务小区'], {})
+            measurement_table.append({
+                '唯一标识': item['服务小区'], '小区名': sector_info.get('小区名', '工参中未找到'),
+                '频段': sector_info.get('频段', ''), '项目内点数': item['项目内点数'], '周边点数': item['周边点数'],
+                '占比': f"{item['占比']:.1%}",
+                '平均RSRP': '' if item['平均RSRP'] is None else f"{item['平均RSRP']:.1f}",
+                '弱覆盖比例': '' if item['弱覆盖比例'] is None else f"{item['弱覆盖比例']:.1%}"})
+        docx_template_render_context["eval_result_measured_risk_table"] = measurement_table
+        docx_template_render_context["eval_result_measured_risk_conclusion"] = [
+            '以上小区在项目范围内或周边承载了实际测量业务，建议结合数据出场风险评估结果和项目终端的实际分布，按需将其纳入项目小区明细。']
+        missing_text = '、'.join(f"{row['小区名']}（{row['占比']}）" for row in measurement_table)
+        self.log_text_field_update(f"实际承载业务但未纳入项目的小区：{missing_text}", 3)
+
+    # 将气泡评估的风险小区与项目范围内实测的服务小区交叉核对，结果输出至日志
+    def measurement_cross_check(self, project_name, intersects_cgi_list, outer_cgi_list, serving_cell_list):
+        """
+        将气泡评估的风险小区与已导入的路测/MDT数据中项目范围内实测的服务小区交叉核对，结果输出至日志，无测量数据时不输出
+        :param project_name: 项目名称
+        :type project_name: str
+        :param intersects_cgi_list: 高风险小区
+        :type intersects_cgi_list: list[str]
+        :param outer_cgi_list: 中风险小区
+        :type outer_cgi_list: list[str]
+        :param serving_cell_list: 项目范围内实测的服务小区（MeasurementUtils.get_project_serving_cell_list），无测量数据时为None
+        :type serving_cell_list: list[dict]
+        :return: None
+        """
+        if not serving_cell_list:
+            return
+        measured_high_list, measured_middle_list, measured_other_list, unmeasured_high_list = \
+            MeasurementUtils.cross_check_risk_list(serving_cell_list, intersects_cgi_list, outer_cgi_list)
+        self.log_text_field_update(
+            f"项目范围内实测服务小区{len(serving_cell_list)}个（测量点{sum(item['点数'] for item in serving_cell_list)}个），"
+            f"其中高风险{len(measured_high_list)}个、中风险{len(measured_middle_list)}个")
+        if measured_other_list:
+            other_text = '、'.join(f"{item['服务小区']}（{item['占比']:.1%}）" for item in measured_other_list[:10])
+            self.log_text_field_update(
+                f"实测占用但不在风险列表中的小区{len(measured_other_list)}个：{other_text}"
+                f"{'等' if len(measured_other_list) > 10 else ''}", 3)
+        if unmeasured_high_list:
+            self.log_text_field_update(f"高风险小区中{len(unmeasured_high_list)}个在项目范围内无实测占用", 2)
+
     def existing_project_eval(self, project_name):
 
         try:
@@ -1466,17 +2097,87 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def existing_project_eval_post_bubble_expand(self, evaluate_project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list):
         self.log_text_field_update(f"开始进行项目数据出场风险及冗余度分析")
+        report_args = (evaluate_project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list)
+        # 扇区六边形索引正在后台重建时跳过预筛选，全部扇区计算精确距离
+        hex_index_ready = all([self.qgs_canvas_util.update_sector_hex_index('宏站扇区图层'),
+                               self.qgs_canvas_util.update_sector_hex_index('室分扇区图层')])
+        # 先更新项目六边形索引，再在读线程中一次性查询报告所需的数据库数据，期间不阻塞界面
+        self.statusbar_message_update("正在后台查询项目评估数据")
+        self.qgs_canvas_util.update_project_hex_index(lambda _: self.async_db.read(
+            self.query_existing_project_eval_data, evaluate_project_name, max_bubble_size * 3, hex_index_ready,
+            callback=lambda eval_data: self.existing_project_eval_data_loaded(report_args, eval_data),
+            error_callback=lambda error: self.log_text_field_update(f"项目评估数据查询失败，未生成报告：{error}", 4)))
+
+    # 现有项目评估所需的数据库查询，在读线程中执行
+    @staticmethod
+    def query_existing_project_eval_data(conn, project_name, redundancy_distance, hex_index_ready):
+        """
+        一次性查询现有项目评估报告所需的数据库数据，仅访问数据库，通过异步访问层在读线程中执行
+        :param conn: 只读数据库连接
+        :type conn: Connection
+        :param project_name: 项目名称
+        :type project_name: str
+        :param redundancy_distance: 冗余小区的距离阈值（米），用于六边形索引预筛选
+        :type redundancy_distance: float
+        :param hex_index_ready: 扇区六边形索引是否可用，不可用时不进行预筛选
+        :type hex_index_ready: bool
+        :return: 小区列表、项目明细、小区明细、项目树节点明细、实测服务小区（无测量数据为None）、
+                 六边形索引判定必定不冗余的扇区（索引不可用为None）
+        :rtype: dict
+        """
+        project_cgi_list = SqliteUtils.get_project_cgi_list(conn, project_name)
+        # 扇区图层中的唯一标识统一为460-00
+        sector_cgi_list = [cgi.replace("460-08", "460-00").replace("460-15", "460-00") for cgi in project_cgi_list]
+        return {
+            '小区列表': project_cgi_list,
+            '项目明细': SqliteUtils.get_project_full_data_include_wkt(conn, project_name),
+            '小区明细': SqliteUtils.get_project_cell_detail(conn, project_name),
+            '节点明细': DetailCache.get_node_dict(conn, 0, project_name),
+            '实测服务小区': MeasurementUtils.get_project_serving_cell_list(conn, project_name)
+            if MeasurementUtils.has_measurement(conn) else None,
+            '六边形邻近扇区': SqliteUtils.get_sector_cgi_near_project_by_hex(
+                conn, project_name, sector_cgi_list, redundancy_distance) if hex_index_ready else None}
+
+    # 现有项目评估数据查询完成，继续实测占用评估或直接生成报告
+    def existing_project_eval_data_loaded(self, report_args, eval_data):
+        evaluate_project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list = report_args
+        self.measurement_cross_check(evaluate_project_name, intersects_cgi_list, outer_cgi_list, eval_data['实测服务小区'])
+
+        # 实测占用评估在读线程中扫描原始测量点，完成后再继续生成报告
+        if self.measurement_eval_mode:
+            self.measurement_project_eval(*report_args, eval_data)
+        else:
+            self.existing_project_eval_report(*report_args, eval_data, None)
 
+    # 生成现有项目评估报告
+    def existing_project_eval_report(self, evaluate_project_name, max_bubble_size, intersects_cgi_list, outer_cgi_list,
+                                     eval_data, measurement_result):
+        """
+        基于气泡评估结果和实测占用评估结果进行项目数据出场风险及冗余度分析，生成现有项目评估报告
+        :param evaluate_project_name: 项目名称
+        :type evaluate_project_name: str
+        :param max_bubble_size: 气泡最大尺寸
+        :type max_bubble_size: float
+        :param intersects_cgi_list: 高风险小区
+        :type intersects_cgi_list: list[str]
+        :param outer_cgi_list: 中风险小区
+        :type outer_cgi_list: list[str]
+        :param eval_data: query_existing_project_eval_data的查询结果
+        :type eval_data: dict
+        :param measurement_result: 实测占用评估结果，为None表示未开启实测占用评估模式
+        :type measurement_result: dict
+        :return: None
+        """
         docx_template = DocxTemplate('resources/template/template_existing_project_eval.docx')
         docx_template_render_context = {'project_name': evaluate_project_name, 'eval_date': datetime.date.today().isoformat()}
 
         # 获取项目的全部CGI，并整理成元素为[CGI,CellID]的list对(evaluate_project_cgi_remove_plmn_list_pair)，以及一个用于匹配的，仅包含cellid的list(evaluate_project_cgi_remove_plmn_list)
-        evaluate_project_cgi_list = self.sql_util.get_project_cgi_list(self.conn, evaluate_project_name)
+        evaluate_project_cgi_list = eval_data['小区列表']
         evaluate_project_cgi_remove_plmn_list_pair = self.data_util.cgi_list_remove_plmn_return_pair(evaluate_project_cgi_list)
         evaluate_project_cgi_remove_plmn_list = [item[1] for item in evaluate_project_cgi_remove_plmn_list_pair]
 
         # 处理docx模板中，项目简介的部分
-        project_detail = self.sql_util.get_project_full_data_include_wkt(self.conn, evaluate_project_name)
+        project_detail = eval_data['项目明细']
         if project_detail:
             docx_template_render_context["project_summary"] = [
                 f'{evaluate_project_name}为天津移动当前在网运行的ToB项目，'
@@ -1491,7 +2192,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 f'项目共下挂基站{project_detail[0]["基站个数"]}个，小区{project_detail[0]["小区个数"]}个，地理位置及周边站点分布如下:']
         tree_item = self.find_project_item_in_project_tree_by_name(evaluate_project_name)
         if tree_item:
-            self.project_tree_item_clicked(tree_item, 0,False)
+            self.project_tree_item_clicked(tree_item, 0,False, eval_data['节点明细'])
         image_data = self.qgs_canvas_util.get_screenshot_from_map_canvas(300)
         docx_template_render_context["project_image"] = docxtpl.InlineImage(docx_template,
                                                                                        BytesIO(image_data),
@@ -1499,7 +2200,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         # 处理docx模板中，项目现有小区列表的部分
         docx_template_render_context[
-            "project_cell_table"] = self.sql_util.get_project_cell_detail(self.conn, evaluate_project_name)
+            "project_cell_table"] = eval_data['小区明细']
+
+        # 实测占用评估，基于原始测量点统计项目范围内实际占用的服务小区
+        self.measurement_project_eval_render(evaluate_project_name, measurement_result, docx_template_render_context)
 
         # 正向评估，看intersects_cgi和outer_cgi中哪些小区不在2B总表中，分别归入数据出场风险中的高风险小区和中风险小区，获取这些小区的基本信息，生成表格
         # 定义高中风险小区列表
@@ -1678,11 +2382,22 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 if project_redundancy_possible_cgi_pair[1] not in match_cgi_list_remove_plmn:
                     project_redundancy_cgi_already_deleted.append(project_redundancy_possible_cgi_pair[0])
             if project_redundancy_cgi_already_deleted:
+                # 从工参历史版本库查询退网日期（小区从工参中消失的那一期工参）
+                removed_date_dict = self.qgs_canvas_util.parameter_history.get_removed_date_dict(
+                    project_redundancy_cgi_already_deleted)
+                cgi_already_deleted_set = set(project_redundancy_cgi_already_deleted)
+                cgi_already_deleted_table = [dict(cell_detail) for cell_detail in eval_data['小区明细']
+                                             if cell_detail['唯一标识'] in cgi_already_deleted_set]
+                for cell_detail in cgi_already_deleted_table:
+                    cell_detail['退网日期'] = removed_date_dict.get(cell_detail['唯一标识'], '未知')
                 docx_template_render_context[
-                    "eval_cgi_already_deleted_table"] = self.sql_util.get_cell_detail_by_cgi(self.conn,project_redundancy_cgi_already_deleted)
+                    "eval_cgi_already_deleted_table"] = cgi_already_deleted_table
                 docx_template_render_context["eval_cgi_already_deleted_summary"] = [
                     f'经过评估，本项目（{evaluate_project_name}）下属的{len(project_redundancy_cgi_already_deleted)}个小区中存在疑似退网情况，需要根军改小区实际在网情况评估是否调出该项目。',
                     '涉及小区详表如下:']
+                if removed_date_dict:
+                    removed_text = '、'.join(f'{cgi}（{date}）' for cgi, date in removed_date_dict.items())
+                    self.log_text_field_update(f"根据工参历史版本，疑似退网小区的退网日期为：{removed_text}", 2)
             else:
                 # 不存在已退网小区，在日志中打印小区信息，更新word context
                 docx_template_render_context["eval_cgi_already_deleted_summary"] = [
@@ -1692,14 +2407,41 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             #feature_redundancy_sector = []
             eval_result_redundancy_table_data = []
             eval_result_redundancy_cgi_list = []
+            # 通过六边形索引的格网距离先排除必定不冗余的扇区（已在读线程中查询），仅对剩余扇区计算精确距离
+            near_cgi_set = eval_data['六边形邻近扇区']
+            if near_cgi_set is not None:
+                feature_count = len(features)
+                features = [feature for feature in features if feature['唯一标识'] not in near_cgi_set]
+                self.log_text_field_update(f"六边形索引已排除{feature_count - len(features)}个必定不冗余的扇区，剩余{len(features)}个扇区进行距离计算")
+            else:
+                self.log_text_field_update(f"扇区六边形索引正在后台重建，本次对{len(features)}个扇区直接进行距离计算", 2)
+            geometry_list = []
             for feature in features:
                 geom = feature.geometry()
                 geom.transform(self.qgs_canvas_util.transformer_4326_to_32650)
-                distance = self.qgs_canvas_util.get_distance_from_polygon_to_project(geom,evaluate_project_name)
+                geometry_list.append(geom)
+            if self.qgs_canvas_util.distance_field_mode:
+                distance_list = self.qgs_canvas_util.get_distance_list_from_polygons_to_project_by_field(
+                    geometry_list, evaluate_project_name, max_bubble_size*3)
+            else:
+                distance_list = self.qgs_canvas_util.get_distance_list_from_polygons_to_project(geometry_list, evaluate_project_name)
+            bts_cgi_set = {feature['唯一标识'] for feature in features_bts}
+            redundancy_distance_dict = {'宏站扇区图层': {}, '室分扇区图层': {}}
+            for feature, distance in zip(features, distance_list):
                 if distance > (max_bubble_size*3):
                     #feature_redundancy_sector.append(feature)
-                    eval_result_redundancy_table_data.append({'唯一标识':feature['唯一标识'],'基站号':feature['基站号'],'小区名':feature['小区名'],'站型':feature['站型'],'行政区':feature['行政区'],'频段':feature['频段'],'带宽':feature['带宽'],'距离':format(distance/1000, '.2f')})
-                    eval_result_redundancy_cgi_list.append(feature['唯一标识'])
+                    layer_name = '宏站扇区图层' if feature['唯一标识'] in bts_cgi_set else '室分扇区图层'
+                    redundancy_distance_dict[layer_name][feature['唯一标识']] = distance
+            # 冗余小区的属性按行号从扇区属性列存储中批量取出
+            for layer_name, cgi_distance_dict in redundancy_distance_dict.items():
+                if not cgi_distance_dict:
+                    continue
+                sector_store = self.qgs_canvas_util.get_sector_attribute_store(layer_name)
+                for sector_info in sector_store.get_rows(sector_store.get_row_index(list(cgi_distance_dict)),
+                                                         ('唯一标识', '基站号', '小区名', '站型', '行政区', '频段', '带宽')):
+                    sector_info['距离'] = format(cgi_distance_dict[sector_info['唯一标识']]/1000, '.2f')
+                    eval_result_redundancy_table_data.append(sector_info)
+                    eval_result_redundancy_cgi_list.append(sector_info['唯一标识'])
 
             if eval_result_redundancy_table_data:
                 docx_template_render_context["eval_result_redundancy_summary"] = [
@@ -0,0 +1,214 @@
+"""
+ @file
+ @brief 六边形格网索引与空间索引（QgsSpatialIndex、Shapely STRtree）的邻近扇区判定基准测试
+
+ 在合成的扇区和项目上比较冗余度评估中“项目下属扇区中哪些与项目距离不超过阈值”的判定方式：
+ 六边形索引先以整数格网距离判定必定在阈值内的扇区，其余扇区计算精确距离；
+ QgsSpatialIndex先以外包框排除必定超出阈值的扇区，其余扇区计算精确距离；
+ Shapely STRtree以dwithin一次完成候选筛选和精确判定。各方式的结果需一致
+ QGIS或Shapely 2不可用时跳过对应方式；精确距离优先使用Shapely，否则使用QgsGeometry
+
+ 不属于pytest用例，在仓库根目录运行：
+ python -m tests.benchmark_hex_index [--sectors 30000] [--projects 300] [--cells-per-project 60] [--distance 9000]
+"""
+
+import argparse
+import sqlite3
+import time
+
+import numpy as np
+
+from utils.geometry_utils import GeometryUtils
+from utils.hex_utils import HexUtils
+from utils.shapely_utils import SHAPELY_AVAILABLE, ShapelyIndex, ShapelyUtils
+from utils.sqlite_utils import SqliteUtils
+
+try:
+    from qgis.core import QgsGeometry, QgsSpatialIndex
+    QGIS_AVAILABLE = True
+except ImportError:
+    QgsGeometry = QgsSpatialIndex = None
+    QGIS_AVAILABLE = False
+
+# 合成数据的范围（经纬度），与天津市区范围相当
+REGION = (116.9, 38.8, 117.6, 39.4)
+
+
+def make_sector_wkb_list(rng, sector_count):
+    """
+    生成三扇区站点的扇区几何WKB（EPSG:32650），半径300~800米，波瓣宽度65度
+    """
+    site_count = (sector_count + 2) // 3
+    site_lon = rng.uniform(REGION[0], REGION[2], site_count)
+    site_lat = rng.uniform(REGION[1], REGION[3], site_count)
+    lon = np.repeat(site_lon, 3)[:sector_count]
+    lat = np.repeat(site_lat, 3)[:sector_count]
+    azimuth = (np.tile([0.0, 120.0, 240.0], site_count)[:sector_count] + rng.uniform(0, 120, sector_count)) % 360
+    rings = GeometryUtils.sector_wedge_rings(lon, lat, azimuth, np.full(sector_count, 65.0),
+                                             rng.uniform(300, 800, sector_count))
+    x, y = GeometryUtils.lonlat_to_utm(rings[..., 0], rings[..., 1])
+    return GeometryUtils.polygon_rings_to_wkb_list(np.stack((x, y), axis=-1)), np.column_stack(
+        GeometryUtils.lonlat_to_utm(lon, lat))
+
+
+def make_project_wkb_list(rng, project_count):
+    """
+    生成随机星形项目边界WKB（EPSG:32650），半径200~1500米
+    """
+    center_x, center_y = GeometryUtils.lonlat_to_utm(rng.uniform(REGION[0], REGION[2], project_count),
+                                                     rng.uniform(REGION[1], REGION[3], project_count))
+    vertex_count = 12
+    angle = (np.arange(vertex_count) + rng.uniform(0, 1, (project_count, vertex_count))) * 2 * np.pi / vertex_count
+    radius = rng.uniform(200, 1500, (project_count, 1)) * rng.uniform(0.6, 1.0, (project_count, vertex_count))
+    rings = np.stack((center_x[:, None] + radius * np.cos(angle), center_y[:, None] + radius * np.sin(angle)), axis=-1)
+    rings = np.concatenate((rings, rings[:, :1]), axis=1)
+    return GeometryUtils.polygon_rings_to_wkb_list(rings), np.column_stack((center_x, center_y))
+
+
+def make_project_cell_list(rng, project_center, sector_center, cell_count):
+    """
+    为每个项目挑选下属扇区：七成取距项目最近的扇区，三成随机取全网扇区（模拟可能冗余的小区）
+    """
+    project_cell_list = []
+    for center in project_center:
+        nearest = np.argpartition(np.hypot(*(sector_center - center).T), cell_count)[:cell_count]
+        near_count = int(cell_count * 0.7)
+        far = rng.choice(len(sector_center), cell_count - near_count, replace=False)
+        project_cell_list.append(sorted(set(nearest[:near_count].tolist()) | set(far.tolist())))
+    return project_cell_list
+
+
+def exact_distance_list(wkb_list, target_wkb):
+    """
+    精确距离，优先使用Shapely批量计算，否则使用QgsGeometry逐个计算
+    """
+    if SHAPELY_AVAILABLE:
+        return ShapelyUtils.distance_list_to_geometry(wkb_list, target_wkb)
+    target_geometry = QgsGeometry()
+    target_geometry.fromWkb(target_wkb)
+    distance_list = []
+    for wkb in wkb_list:
+        geometry = QgsGeometry()
+        geometry.fromWkb(wkb)
+        distance_list.append(target_geometry.distance(geometry))
+    return distance_list
+
+
+def run_hex(sector_wkb_list, project_wkb_list, project_cell_list, distance):
+    """
+    六边形索引：计算全部扇区和项目的六边形编号写入SQLite，查询时以格网距离判定必定在阈值内的扇区，其余计算精确距离
+    """
+    start_time = time.perf_counter()
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE 项目明细 (项目名称 TEXT, WKB BLOB)")
+    SqliteUtils.create_hex_index_tables(conn)
+    hex_row_list = [(str(index), resolution, int(hex_cell)) for index, wkb in enumerate(sector_wkb_list)
+                    for resolution, hex_cells in HexUtils.wkb_to_cells(wkb).items() for hex_cell in hex_cells]
+    SqliteUtils.replace_sector_hex_index(conn, '宏站扇区图层', '', hex_row_list)
+    SqliteUtils.replace_project_hex_index(conn, {
+        str(index): [(resolution, int(hex_cell)) for resolution, hex_cells in HexUtils.wkb_to_cells(wkb).items()
+                     for hex_cell in hex_cells] for index, wkb in enumerate(project_wkb_list)})
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    result_list = []
+    exact_count = 0
+    for project_index, cell_list in enumerate(project_cell_list):
+        near_set = {int(cgi) for cgi in SqliteUtils.get_sector_cgi_near_project_by_hex(
+            conn, str(project_index), [str(cell) for cell in cell_list], distance)}
+        rest_list = [cell for cell in cell_list if cell not in near_set]
+        exact_count += len(rest_list)
+        distance_list = exact_distance_list([sector_wkb_list[cell] for cell in rest_list], project_wkb_list[project_index])
+        result_list.append(near_set | {cell for cell, cell_distance in zip(rest_list, distance_list)
+                                       if cell_distance <= distance})
+    conn.close()
+    return build_time, time.perf_counter() - start_time, exact_count, result_list
+
+
+def run_qgs_spatial_index(sector_wkb_list, project_wkb_list, project_cell_list, distance):
+    """
+    QgsSpatialIndex：以扇区外包框建立R树，查询时排除外包框超出阈值的扇区，其余计算精确距离
+    """
+    start_time = time.perf_counter()
+    index = QgsSpatialIndex()
+    for sector_index, wkb in enumerate(sector_wkb_list):
+        geometry = QgsGeometry()
+        geometry.fromWkb(wkb)
+        index.addFeature(sector_index, geometry.boundingBox())
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    result_list = []
+    exact_count = 0
+    for project_index, cell_list in enumerate(project_cell_list):
+        geometry_project = QgsGeometry()
+        geometry_project.fromWkb(project_wkb_list[project_index])
+        candidate_set = set(index.intersects(geometry_project.boundingBox().buffered(distance)))
+        candidate_list = [cell for cell in cell_list if cell in candidate_set]
+        exact_count += len(candidate_list)
+        distance_list = exact_distance_list([sector_wkb_list[cell] for cell in candidate_list],
+                                            project_wkb_list[project_index])
+        result_list.append({cell for cell, cell_distance in zip(candidate_list, distance_list)
+                            if cell_distance <= distance})
+    return build_time, time.perf_counter() - start_time, exact_count, result_list
+
+
+def run_shapely_index(sector_wkb_list, project_wkb_list, project_cell_list, distance):
+    """
+    Shapely STRtree：以dwithin一次完成候选筛选和精确判定
+    """
+    start_time = time.perf_counter()
+    index = ShapelyIndex(sector_wkb_list, list(range(len(sector_wkb_list))))
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    result_list = []
+    for project_index, cell_list in enumerate(project_cell_list):
+        _, tree_index = index.query([project_wkb_list[project_index]], 'dwithin', distance)
+        result_list.append(set(tree_index.tolist()) & set(cell_list))
+    return build_time, time.perf_counter() - start_time, None, result_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description='六边形格网索引与空间索引的邻近扇区判定基准测试')
+    parser.add_argument('--sectors', type=int, default=30000, help='扇区数量')
+    parser.add_argument('--projects', type=int, default=300, help='项目数量')
+    parser.add_argument('--cells-per-project', type=int, default=60, help='每个项目的下属扇区数量')
+    parser.add_argument('--distance', type=float, default=9000.0, help='距离阈值（米），默认为最大气泡半径的3倍')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    sector_wkb_list, sector_center = make_sector_wkb_list(rng, args.sectors)
+    project_wkb_list, project_center = make_project_wkb_list(rng, args.projects)
+    project_cell_list = make_project_cell_list(rng, project_center, sector_center, args.cells_per_project)
+    print(f"扇区{args.sectors}个，项目{args.projects}个，每个项目下属扇区{args.cells_per_project}个，"
+          f"距离阈值{args.distance:.0f}米，精确距离使用{'Shapely' if SHAPELY_AVAILABLE else 'QgsGeometry'}")
+
+    method_list = [('六边形索引', run_hex)]
+    if QGIS_AVAILABLE:
+        method_list.append(('QgsSpatialIndex', run_qgs_spatial_index))
+    else:
+        print('QGIS不可用，跳过QgsSpatialIndex')
+    if SHAPELY_AVAILABLE:
+        method_list.append(('Shapely STRtree', run_shapely_index))
+    else:
+        print('Shapely 2不可用，跳过Shapely STRtree')
+    if not SHAPELY_AVAILABLE and not QGIS_AVAILABLE:
+        print('QGIS和Shapely 2均不可用，无法计算精确距离')
+        return
+
+    reference_result_list = None
+    for method_name, method in method_list:
+        build_time, query_time, exact_count, result_list = method(sector_wkb_list, project_wkb_list,
+                                                                  project_cell_list, args.distance)
+        if reference_result_list is None:
+            reference_result_list = result_list
+        consistent = result_list == reference_result_list
+        exact_text = '—' if exact_count is None else str(exact_count)
+        print(f"{method_name:<16}建索引{build_time:8.3f}秒  查询{query_time:8.3f}秒  精确距离计算{exact_text:>7}次  "
+              f"邻近扇区{sum(len(result) for result in result_list)}个  结果{'一致' if consistent else '不一致'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+ @file
+ @brief 批量导入与物化汇总表触发器的回归测试
+"""
+
+import csv
+import sqlite3
+import time
+
+import pytest
+
+pytest.importorskip('qgis.core')
+
+from utils.import_utils import ImportUtils
+from utils.sqlite_utils import SqliteUtils
+
+
+def create_detail_tables(conn):
+    """
+    建立导入测试所需的明细表及汇总表
+    """
+    conn.execute("CREATE TABLE 项目明细 (序号 INTEGER, 项目名称 TEXT, 项目场景 TEXT, 行政区 TEXT)")
+    conn.execute("CREATE TABLE 基站明细 (序号 INTEGER, 基站号 TEXT, 基站名 TEXT, 项目名称 TEXT, 行政区 TEXT)")
+    conn.execute("CREATE TABLE 小区明细 (序号 INTEGER, CGI TEXT, 小区名 TEXT, 项目名称 TEXT, 频段 TEXT)")
+    SqliteUtils.create_summary_tables(conn)
+    conn.commit()
+
+
+def write_cell_csv(file_path, project_count, cell_count):
+    """
+    生成小区明细CSV，相邻项目共享一半小区
+    """
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['CGI', '小区名', '项目名称', '频段'])
+        for project_index in range(project_count):
+            for cell_index in range(cell_count):
+                gnb = 10000 + (project_index * cell_count + cell_index) // 2
+                writer.writerow([f'460-00-{gnb}-{cell_index % 3 + 1}', f'小区{cell_index}', f'项目{project_index}',
+                                 '2.6G' if cell_index % 2 else '4.9G'])
+
+
+@pytest.mark.parametrize('project_count, cell_count', [(20, 200), (40, 250)])
+def test_import_keeps_summary_index(tmp_path, project_count, cell_count):
+    conn = sqlite3.connect(tmp_path / 'test.db')
+    create_detail_tables(conn)
+    file_path = tmp_path / '小区明细.csv'
+    write_cell_csv(file_path, project_count, cell_count)
+
+    start_time = time.perf_counter()
+    report = ImportUtils.import_table(conn, str(file_path))
+    elapsed = time.perf_counter() - start_time
+
+    assert report['表名'] == '小区明细'
+    assert report['新增'] == project_count * cell_count
+    assert not report['无效行']
+    expected = conn.execute("SELECT CGI, COUNT(DISTINCT 项目名称) FROM 小区明细 GROUP BY CGI ORDER BY CGI").fetchall()
+    assert conn.execute("SELECT CGI, 项目数 FROM 小区归属汇总 ORDER BY CGI").fetchall() == expected
+    expected = conn.execute("SELECT 项目名称, 频段, COUNT(*) FROM 小区明细 GROUP BY 1, 2 ORDER BY 1, 2").fetchall()
+    assert conn.execute("SELECT 项目名称, 频段, 小区数 FROM 项目频段汇总 ORDER BY 1, 2").fetchall() == expected
+    # 触发器依赖的索引被删除时导入退化为平方复杂度（1万行约需6秒），保留索引时应在1秒量级内完成
+    assert elapsed < 3.0
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='小区明细_CGI_项目名称'").fetchone()
+    conn.close()
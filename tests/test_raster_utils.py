@@ -0,0 +1,62 @@
+"""
+ @file
+ @brief 距离场与精确矢量距离的一致性测试
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('qgis')
+pytest.importorskip('scipy')
+shapely = pytest.importorskip('shapely')
+
+from utils.geometry_utils import GeometryUtils
+from utils.raster_utils import ProjectDistanceField
+
+
+def random_polygon(rng, center_x, center_y, min_radius, max_radius, vertex_count):
+    """
+    以中心点生成随机星形多边形的外环
+    """
+    angle = np.sort(rng.uniform(0, 2 * np.pi, vertex_count))
+    radius = rng.uniform(min_radius, max_radius, vertex_count)
+    ring = np.column_stack((center_x + radius * np.cos(angle), center_y + radius * np.sin(angle)))
+    return np.vstack((ring, ring[:1]))
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('cell_size', [10, 20, 50])
+def test_distance_field_matches_vector_distance(seed, cell_size):
+    rng = np.random.default_rng(seed)
+    threshold = 1500.0
+    project_ring = random_polygon(rng, 0, 0, 200, 1500, int(rng.integers(3, 20)))
+    tolerance = ProjectDistanceField.get_tolerance(cell_size)
+    distance_field = ProjectDistanceField(GeometryUtils.polygon_rings_to_wkb_list(project_ring[None])[0],
+                                          threshold + 2 * tolerance, cell_size)
+
+    sector_ring_list = [random_polygon(rng, *rng.uniform(-4000, 4000, 2), 20, 400, 6) for _ in range(300)]
+    wkb_list = [GeometryUtils.polygon_rings_to_wkb_list(ring[None])[0] for ring in sector_ring_list]
+    distance_list, exact_index_list = distance_field.get_distance_list(wkb_list, threshold)
+
+    project_polygon = shapely.Polygon(project_ring)
+    exact_index_set = set(exact_index_list)
+    for i, (ring, distance) in enumerate(zip(sector_ring_list, distance_list)):
+        vector_distance = shapely.Polygon(ring).distance(project_polygon)
+        if i in exact_index_set:
+            continue
+        # 未回退精确计算的扇区，误差在容差内，且冗余判定与精确方法一致
+        assert abs(distance - vector_distance) <= tolerance
+        assert (distance > threshold) == (vector_distance > threshold)
+
+
+def test_distance_field_tolerance_covers_unsampled_spikes():
+    # 两个尖角相对的三角形，尖角均落在边界采样点之间，距离场误差超过格网对角线长度，但仍在容差内
+    cell_size = 20
+    project_ring = np.array([[310.806, 308.162], [10.806, 18.162], [300.806, 318.162], [310.806, 308.162]])
+    sector_ring = np.array([[-347.350, -329.953], [-47.350, -39.953], [-337.350, -339.953], [-347.350, -329.953]])
+    distance_field = ProjectDistanceField(GeometryUtils.polygon_rings_to_wkb_list(project_ring[None])[0], 500,
+                                          cell_size)
+    distance_list, _ = distance_field.get_distance_list(
+        [GeometryUtils.polygon_rings_to_wkb_list(sector_ring[None])[0]], 1000)
+    error = distance_list[0] - shapely.Polygon(sector_ring).distance(shapely.Polygon(project_ring))
+    assert cell_size * np.sqrt(2) < error <= distance_field.tolerance
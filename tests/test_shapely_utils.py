@@ -0,0 +1,89 @@
+"""
+ @file
+ @brief Shapely批量计算与QGIS逐要素计算的一致性测试
+"""
+
+import numpy as np
+import pytest
+
+qgis_core = pytest.importorskip('qgis.core')
+shapely = pytest.importorskip('shapely')
+
+from utils.shapely_utils import SHAPELY_AVAILABLE, ShapelyIndex, ShapelyUtils
+
+QgsGeometry = qgis_core.QgsGeometry
+
+pytestmark = pytest.mark.skipif(not SHAPELY_AVAILABLE, reason='需要Shapely 2')
+
+
+def random_polygon_wkt(rng, center_x, center_y, min_radius, max_radius, vertex_count):
+    """
+    以中心点生成随机星形多边形的WKT，顶点按扇区均匀抖动，相邻顶点夹角小于180°，保证多边形简单有效
+    """
+    angle = (np.arange(vertex_count) + rng.uniform(0, 1, vertex_count)) * 2 * np.pi / vertex_count
+    radius = rng.uniform(min_radius, max_radius, vertex_count)
+    ring = np.column_stack((center_x + radius * np.cos(angle), center_y + radius * np.sin(angle)))
+    ring = np.vstack((ring, ring[:1]))
+    return 'POLYGON((' + ', '.join(f'{x} {y}' for x, y in ring) + '))'
+
+
+def random_geometry_list(rng, count, spread, min_radius, max_radius):
+    """
+    生成一组随机多边形的QgsGeometry
+    """
+    return [QgsGeometry.fromWkt(random_polygon_wkt(rng, *rng.uniform(-spread, spread, 2), min_radius, max_radius,
+                                                   int(rng.integers(4, 12)))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_query_intersects_matches_qgis(seed):
+    rng = np.random.default_rng(seed)
+    source_geometry_list = random_geometry_list(rng, 300, 5000, 50, 400)
+    compare_geometry_list = random_geometry_list(rng, 40, 5000, 100, 1200)
+    shapely_index = ShapelyIndex([bytes(geometry.asWkb()) for geometry in source_geometry_list],
+                                 list(range(len(source_geometry_list))))
+
+    query_index, tree_index = shapely_index.query([bytes(geometry.asWkb()) for geometry in compare_geometry_list])
+    shapely_pair_list = list(zip(query_index.tolist(), shapely_index.keys[tree_index].tolist()))
+    qgis_pair_list = [(i, j) for i, geometry_compare in enumerate(compare_geometry_list)
+                      for j, geometry_source in enumerate(source_geometry_list)
+                      if geometry_source.intersects(geometry_compare)]
+    assert shapely_pair_list == qgis_pair_list
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_distance_list_matches_qgis(seed):
+    rng = np.random.default_rng(seed)
+    target_geometry = random_geometry_list(rng, 1, 0, 500, 1500)[0]
+    geometry_list = random_geometry_list(rng, 200, 5000, 20, 300)
+
+    distance_list = ShapelyUtils.distance_list_to_geometry([bytes(geometry.asWkb()) for geometry in geometry_list],
+                                                           bytes(target_geometry.asWkb()))
+    qgis_distance_list = [geometry.distance(target_geometry) for geometry in geometry_list]
+    np.testing.assert_allclose(distance_list, qgis_distance_list, rtol=1e-9, atol=1e-6)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_query_distance_and_overlap_matches_qgis(seed):
+    rng = np.random.default_rng(seed)
+    distance = 500.0
+    source_geometry_list = random_geometry_list(rng, 200, 5000, 50, 400)
+    compare_geometry_list = random_geometry_list(rng, 20, 5000, 100, 800)
+    shapely_index = ShapelyIndex([bytes(geometry.asWkb()) for geometry in source_geometry_list],
+                                 list(range(len(source_geometry_list))))
+
+    query_index, tree_index, distance_array, overlap_area_array = shapely_index.query_distance_and_overlap(
+        [bytes(geometry.asWkb()) for geometry in compare_geometry_list], distance)
+    shapely_result_dict = {(i, j): (d, a) for i, j, d, a in zip(query_index.tolist(), tree_index.tolist(),
+                                                                distance_array.tolist(), overlap_area_array.tolist())}
+    qgis_result_dict = {}
+    for i, geometry_compare in enumerate(compare_geometry_list):
+        for j, geometry_source in enumerate(source_geometry_list):
+            qgis_distance = geometry_compare.distance(geometry_source)
+            if qgis_distance <= distance:
+                overlap_area = geometry_compare.intersection(geometry_source).area() if qgis_distance == 0 else 0.0
+                qgis_result_dict[(i, j)] = (qgis_distance, overlap_area)
+    assert shapely_result_dict.keys() == qgis_result_dict.keys()
+    for key, (qgis_distance, qgis_overlap_area) in qgis_result_dict.items():
+        assert shapely_result_dict[key][0] == pytest.approx(qgis_distance, abs=1e-6)
+        assert shapely_result_dict[key][1] == pytest.approx(qgis_overlap_area, rel=1e-6, abs=1e-6)
@@ -1,4 +1,15 @@
+from . import async_sqlite_utils
+from . import cache_utils
+from . import column_store_utils
 from . import data_utils
+from . import geometry_utils
+from . import hex_utils
+from . import history_utils
+from . import import_utils
 from . import io_utils
+from . import kpi_utils
+from . import measurement_utils
 from . import qgis_utils
+from . import raster_utils
+from . import shapely_utils
 from . import sqlite_utils
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+
+
+class AsyncSqliteUtils(QObject):
+    """
+    异步SQLite访问层：数据库切换为WAL模式，读任务在读线程池中执行，每个读线程持有一个只读连接，互不阻塞；
+    写任务在单线程的写线程池中串行执行，使用唯一的写连接，任务结束后提交，异常时回滚
+
+    任务函数的第一个参数为数据库连接，与SqliteUtils中静态方法的签名一致，可直接传入，例如：
+    async_db.read(SqliteUtils.get_project_cgi_list, project_name, callback=...)
+    read/write返回concurrent.futures.Future，可阻塞等待结果；传入callback/error_callback时在主线程中回调，
+    未传入error_callback的任务失败时发出task_failed_signal，由界面输出至日志
+    """
+
+    # 任务完成信号，跨线程排队传递至主线程，参数为回调函数和结果
+    task_finished_signal = pyqtSignal(object, object)
+    # 未指定error_callback的任务失败信号，跨线程排队传递至主线程，参数为错误信息
+    task_failed_signal = pyqtSignal(str)
+
+    def __init__(self, db_path, reader_count=3, parent=None):
+        """
+        :param db_path: 数据库路径
+        :type db_path: str
+        :param reader_count: 读线程（只读连接）数量
+        :type reader_count: int
+        :param parent: 父对象
+        :type parent: QObject
+        """
+        super().__init__(parent)
+        self.db_path = os.path.abspath(db_path)
+        self.reader_pool = QThreadPool(self)
+        self.reader_pool.setMaxThreadCount(reader_count)
+        self.writer_pool = QThreadPool(self)
+        self.writer_pool.setMaxThreadCount(1)
+        # 线程不过期回收，使线程持有的连接可以复用
+        self.reader_pool.setExpiryTimeout(-1)
+        self.writer_pool.setExpiryTimeout(-1)
+        self.thread_local = threading.local()
+        self.conn_list = []
+        self.conn_list_lock = threading.Lock()
+        self.task_finished_signal.connect(self.task_finished)
+
+        # WAL模式持久化在数据库文件中，读连接与写连接、主线程连接可以并发
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.close()
+
+    def get_connection(self, writer):
+        """
+        获取当前线程的数据库连接，不存在时创建
+        :param writer: 是否为写连接
+        :type writer: bool
+        :return: 数据库连接
+        :rtype: Connection
+        """
+        conn = getattr(self.thread_local, 'writer_conn' if writer else 'reader_conn', None)
+        if conn is None:
+            if writer:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+                self.thread_local.writer_conn = conn
+            else:
+                conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+                self.thread_local.reader_conn = conn
+            with self.conn_list_lock:
+                self.conn_list.append(conn)
+        return conn
+
+    def submit(self, writer, func, args, kwargs, callback, error_callback):
+        """
+        提交任务至读或写线程池
+        :param writer: 是否为写任务
+        :type writer: bool
+        :param func: 任务函数，第一个参数为数据库连接
+        :type func: function
+        :param args: 任务函数的其余位置参数
+        :type args: tuple
+        :param kwargs: 任务函数的关键字参数
+        :type kwargs: dict
+        :param callback: 成功时在主线程中的回调，参数为结果
+        :type callback: function
+        :param error_callback: 失败时在主线程中的回调，参数为异常
+        :type error_callback: function
+        :return: 任务结果
+        :rtype: Future
+        """
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            conn = self.get_connection(writer)
+            try:
+                result = func(conn, *args, **kwargs)
+                if writer:
+                    conn.commit()
+            except Exception as e:
+                if writer:
+                    conn.rollback()
+                future.set_exception(e)
+                if error_callback:
+                    self.task_finished_signal.emit(error_callback, e)
+                else:
+                    self.task_failed_signal.emit(f"数据库异步任务{getattr(func, '__qualname__', func)}失败：{e}")
+                return
+            future.set_result(result)
+            if callback:
+                self.task_finished_signal.emit(callback, result)
+
+        (self.writer_pool if writer else self.reader_pool).start(run)
+        return future
+
+    def read(self, func, *args, callback=None, error_callback=None, **kwargs):
+        """
+        提交只读任务，在读线程池中使用只读连接执行
+        :param func: 任务函数，第一个参数为数据库连接
+        :type func: function
+        :param callback: 成功时在主线程中的回调，参数为结果
+        :type callback: function
+        :param error_callback: 失败时在主线程中的回调，参数为异常
+        :type error_callback: function
+        :return: 任务结果
+        :rtype: Future
+        """
+        return self.submit(False, func, args, kwargs, callback, error_callback)
+
+    def write(self, func, *args, callback=None, error_callback=None, **kwargs):
+        """
+        提交写任务，在写线程中使用唯一的写连接串行执行，完成后提交，异常时回滚
+        :param func: 任务函数，第一个参数为数据库连接
+        :type func: function
+        :param callback: 成功时在主线程中的回调，参数为结果
+        :type callback: function
+        :param error_callback: 失败时在主线程中的回调，参数为异常
+        :type error_callback: function
+        :return: 任务结果
+        :rtype: Future
+        """
+        return self.submit(True, func, args, kwargs, callback, error_callback)
+
+    # 在主线程中执行回调
+    def task_finished(self, callback, result):
+        callback(result)
+
+    def close(self):
+        """
+        等待全部任务完成并关闭全部连接
+        :return: None
+        """
+        self.reader_pool.waitForDone()
+        self.writer_pool.waitForDone()
+        with self.conn_list_lock:
+            for conn in self.conn_list:
+                conn.close()
+            self.conn_list.clear()
@@ -0,0 +1,399 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from utils.sqlite_utils import SqliteUtils
+
+
+class BubbleResultCache:
+    """
+    气泡扩散结果的磁盘缓存，独立保存在data/bubbleCache.db中，与业务数据库分离，删除该文件即可清空缓存
+    缓存键为项目几何、分析模式、扩张步长和最大半径的哈希，工参标识单独保存，读取时需与当前工参一致，任一输入变化即自然失效；
+    工参更新时可将不受变化扇区影响的结果沿用至新工参；超过容量时按最近使用时间淘汰（LRU），也可按项目、工参标识或范围主动失效
+    """
+
+    def __init__(self, db_path='data/bubbleCache.db', max_entries=200):
+        """
+        :param db_path: 缓存数据库路径
+        :type db_path: str
+        :param max_entries: 最多缓存条数
+        :type max_entries: int
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS 气泡扩散结果缓存 (
+                缓存键 TEXT PRIMARY KEY, 项目名称 TEXT, 工参标识 TEXT, 扩张步长 INTEGER, 最大半径 INTEGER,
+                最终半径 INTEGER, 内部小区 TEXT, 外部小区 TEXT,
+                范围XMIN REAL, 范围YMIN REAL, 范围XMAX REAL, 范围YMAX REAL,
+                创建时间 REAL, 最近使用时间 REAL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS 气泡扩散结果缓存_最近使用时间 ON 气泡扩散结果缓存 (最近使用时间)")
+        self.conn.commit()
+
+    # 根据气泡扩散除工参外的全部输入生成缓存键
+    @staticmethod
+    def make_key(geometry_wkb, bubble_step, max_bubble_size, mode=''):
+        """
+        根据气泡扩散除工参外的全部输入生成缓存键
+        :param geometry_wkb: 项目几何WKB
+        :type geometry_wkb: bytes
+        :param bubble_step: 气泡的扩张步长，米
+        :type bubble_step: int
+        :param max_bubble_size: 气泡的最大半径，米
+        :type max_bubble_size: int
+        :param mode: 分析模式（例如是否启用栅格覆盖索引），不同模式结果可能不同
+        :type mode: str
+        :return: 缓存键
+        :rtype: str
+        """
+        key_hash = hashlib.sha1(geometry_wkb)
+        key_hash.update(json.dumps([bubble_step, max_bubble_size, mode], ensure_ascii=False).encode())
+        return key_hash.hexdigest()
+
+    def get(self, key, parameter_identity):
+        """
+        读取缓存并刷新最近使用时间
+        :param key: 缓存键
+        :type key: str
+        :param parameter_identity: 当前工参标识（工参文件路径、大小、修改时间）
+        :type parameter_identity: str
+        :return: 命中时返回(最终半径, 内部小区列表, 外部小区列表)，未命中返回None
+        :rtype: tuple
+        """
+        result = self.conn.execute("SELECT 最终半径, 内部小区, 外部小区 FROM 气泡扩散结果缓存 WHERE 缓存键=? AND 工参标识=?",
+                                   (key, parameter_identity)).fetchone()
+        if not result:
+            return None
+        self.conn.execute("UPDATE 气泡扩散结果缓存 SET 最近使用时间=? WHERE 缓存键=?", (time.time(), key))
+        self.conn.commit()
+        return result[0], json.loads(result[1]), json.loads(result[2])
+
+    def put(self, key, project_name, parameter_identity, bubble_step, max_bubble_size, bubble_size, intersects_cgi,
+            outer_cgi, extent=None):
+        """
+        写入缓存，超过容量时淘汰最久未使用的条目
+        :param key: 缓存键
+        :type key: str
+        :param project_name: 项目名称
+        :type project_name: str
+        :param parameter_identity: 工参标识
+        :type parameter_identity: str
+        :param bubble_step: 气泡的扩张步长，米
+        :type bubble_step: int
+        :param max_bubble_size: 气泡的最大半径，米
+        :type max_bubble_size: int
+        :param bubble_size: 最终扩散半径，米
+        :type bubble_size: int
+        :param intersects_cgi: 内部小区列表
+        :type intersects_cgi: list[str]
+        :param outer_cgi: 外部小区列表
+        :type outer_cgi: list[str]
+        :param extent: 气泡可达范围(xmin, ymin, xmax, ymax)，用于工参局部变化时按范围失效
+        :type extent: tuple
+        :return: None
+        """
+        now = time.time()
+        self.conn.execute("INSERT OR REPLACE INTO 气泡扩散结果缓存 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                          (key, project_name, parameter_identity, bubble_step, max_bubble_size, bubble_size,
+                           json.dumps(intersects_cgi, ensure_ascii=False), json.dumps(outer_cgi, ensure_ascii=False))
+                          + (tuple(extent) if extent else (None, None, None, None)) + (now, now))
+        self.conn.execute("""
+            DELETE FROM 气泡扩散结果缓存 WHERE 缓存键 IN (
+                SELECT 缓存键 FROM 气泡扩散结果缓存 ORDER BY 最近使用时间 DESC LIMIT -1 OFFSET ?)""",
+                          (self.max_entries,))
+        self.conn.commit()
+
+    def invalidate(self, project_name=None):
+        """
+        主动失效缓存
+        :param project_name: 项目名称，为空则清空全部缓存
+        :type project_name: str
+        :return: 失效的条数
+        :rtype: int
+        """
+        if project_name is None:
+            cursor = self.conn.execute("DELETE FROM 气泡扩散结果缓存")
+        else:
+            cursor = self.conn.execute("DELETE FROM 气泡扩散结果缓存 WHERE 项目名称=?", (project_name,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def invalidate_by_parameter(self, parameter_identity):
+        """
+        失效非指定工参标识的全部缓存（工参更新后调用，旧工参的结果不再可能命中）
+        :param parameter_identity: 当前工参标识
+        :type parameter_identity: str
+        :return: 失效的条数
+        :rtype: int
+        """
+        cursor = self.conn.execute("DELETE FROM 气泡扩散结果缓存 WHERE 工参标识<>?", (parameter_identity,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def invalidate_by_extent(self, x_min, y_min, x_max, y_max):
+        """
+        失效气泡可达范围与指定范围相交的缓存（工参局部变化时调用）
+        :param x_min: 范围X最小值（EPSG:3857）
+        :type x_min: float
+        :param y_min: 范围Y最小值（EPSG:3857）
+        :type y_min: float
+        :param x_max: 范围X最大值（EPSG:3857）
+        :type x_max: float
+        :param y_max: 范围Y最大值（EPSG:3857）
+        :type y_max: float
+        :return: 失效的条数
+        :rtype: int
+        """
+        cursor = self.conn.execute("""
+            DELETE FROM 气泡扩散结果缓存 WHERE 范围XMIN IS NULL
+                OR (范围XMIN<=? AND 范围XMAX>=? AND 范围YMIN<=? AND 范围YMAX>=?)""", (x_max, x_min, y_max, y_min))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def carry_over(self, old_parameter_identity, new_parameter_identity, changed_extent_list, changed_cgi_set):
+        """
+        工参更新后沿用不受影响的缓存：气泡可达范围与变化扇区的外包框相交、或结果中包含受影响小区的条目失效，
+        其余旧工参的条目改为新工参标识
+        :param old_parameter_identity: 旧工参标识
+        :type old_parameter_identity: str
+        :param new_parameter_identity: 新工参标识
+        :type new_parameter_identity: str
+        :param changed_extent_list: 变化扇区新旧几何的外包框列表[(xmin, ymin, xmax, ymax)]（EPSG:3857）
+        :type changed_extent_list: list[tuple]
+        :param changed_cgi_set: 受影响的小区（变化扇区及与其同Group ID的扇区）
+        :type changed_cgi_set: set[str]
+        :return: 沿用的条数，失效的条数
+        :rtype: int, int
+        """
+        rows = self.conn.execute("""
+            SELECT 缓存键, 内部小区, 外部小区, 范围XMIN, 范围YMIN, 范围XMAX, 范围YMAX FROM 气泡扩散结果缓存
+            WHERE 工参标识=?""", (old_parameter_identity,)).fetchall()
+        invalid_key_list = []
+        valid_key_list = []
+        for key, intersects_cgi, outer_cgi, x_min, y_min, x_max, y_max in rows:
+            affected = x_min is None or any(
+                extent[0] <= x_max and extent[2] >= x_min and extent[1] <= y_max and extent[3] >= y_min
+                for extent in changed_extent_list)
+            if not affected:
+                affected = not changed_cgi_set.isdisjoint(json.loads(intersects_cgi)) or \
+                           not changed_cgi_set.isdisjoint(json.loads(outer_cgi))
+            (invalid_key_list if affected else valid_key_list).append((key,))
+        self.conn.executemany("DELETE FROM 气泡扩散结果缓存 WHERE 缓存键=?", invalid_key_list)
+        self.conn.executemany("UPDATE 气泡扩散结果缓存 SET 工参标识=? WHERE 缓存键=?",
+                              ((new_parameter_identity, key) for key, in valid_key_list))
+        self.conn.commit()
+        return len(valid_key_list), len(invalid_key_list)
+
+
+class DetailCache:
+    """
+    项目树明细面板的查询缓存（明细表内容、项目/基站的小区列表、汇总统计），按条数LRU淘汰
+    每次读取前比对数据库版本（PRAGMA data_version与本连接的total_changes），数据库被任何连接修改后整体失效；
+    点击节点未命中缓存时、展开项目或基站节点批量预取子节点明细时，均通过异步访问层的只读连接查询，
+    查询结果在主线程回调中校验版本后写入
+    """
+
+    # 缓存类型：明细表内容、小区列表、汇总统计
+    KIND_DETAIL = 0
+    KIND_CGI_LIST = 1
+    KIND_SUMMARY = 2
+
+    def __init__(self, conn, async_db, max_entries=5000):
+        """
+        :param conn: 主线程数据库连接
+        :type conn: Connection
+        :param async_db: 异步数据库访问层，用于后台预取
+        :type async_db: AsyncSqliteUtils
+        :param max_entries: 最多缓存条数
+        :type max_entries: int
+        """
+        self.conn = conn
+        self.async_db = async_db
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.data_version = self.get_data_version()
+
+    def get_data_version(self):
+        """
+        获取数据库版本，其他连接提交修改时data_version变化，本连接修改时total_changes变化
+        :return: 数据库版本
+        :rtype: tuple
+        """
+        return self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes
+
+    def check_data_version(self):
+        """
+        数据库版本变化时清空缓存
+        :return: 数据库版本是否未变化
+        :rtype: bool
+        """
+        data_version = self.get_data_version()
+        if data_version != self.data_version:
+            self.data_version = data_version
+            self.entries.clear()
+            return False
+        return True
+
+    def put(self, key, value):
+        """
+        写入缓存，超过容量时淘汰最久未使用的条目
+        :param key: 缓存键
+        :type key: tuple
+        :param value: 缓存内容
+        :type value: list
+        :return: None
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self, level, vlookup_field, callback, node_dict=None):
+        """
+        获取节点的明细表内容、小区列表和汇总统计：全部命中缓存时直接回调；未命中时通过异步访问层的只读连接查询，
+        查询完成后在主线程中回调，不阻塞界面；主连接存在未提交的修改时在主连接上查询，避免读到不一致的数据
+        :param level: 0为项目，1为基站，2为小区
+        :type level: int
+        :param vlookup_field: 项目名称、基站号或CGI
+        :type vlookup_field: str
+        :param callback: 回调，参数为明细表内容（副本，无结果为None）、小区列表（副本）和汇总统计行
+        :type callback: function
+        :param node_dict: 调用方已通过get_node_dict查询的结果，传入时直接使用
+        :type node_dict: dict{tuple:list}
+        :return: None
+        """
+        vlookup_field = str(vlookup_field)
+        key_list = [(kind, level, vlookup_field) for kind in (self.KIND_DETAIL, self.KIND_CGI_LIST, self.KIND_SUMMARY)]
+
+        def load_finished(data_version, loaded_dict):
+            self.prefetch_finished(data_version, loaded_dict)
+            detail_title_and_data, cgi_list, summary_list = (loaded_dict[key] for key in key_list)
+            callback([list(row) for row in detail_title_and_data] if detail_title_and_data is not None else None,
+                     list(cgi_list), [list(row) for row in summary_list])
+
+        self.check_data_version()
+        if node_dict is not None:
+            load_finished(self.data_version, node_dict)
+        elif all(key in self.entries for key in key_list):
+            for key in key_list:
+                self.entries.move_to_end(key)
+            load_finished(self.data_version, {key: self.entries[key] for key in key_list})
+        elif self.conn.in_transaction:
+            load_finished(self.data_version, self.get_node_dict(self.conn, level, vlookup_field))
+        else:
+            data_version = self.data_version
+            self.async_db.read(self.get_node_dict, level, vlookup_field,
+                               callback=lambda loaded_dict: load_finished(data_version, loaded_dict))
+
+    @staticmethod
+    def get_node_dict(conn, level, vlookup_field):
+        """
+        查询节点的明细表内容、小区列表和汇总统计（项目的频段构成、共享小区数，小区的归属项目数），可在读线程中执行
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param level: 0为项目，1为基站，2为小区
+        :type level: int
+        :param vlookup_field: 项目名称、基站号或CGI
+        :type vlookup_field: str
+        :return: key为缓存键，value为缓存内容
+        :rtype: dict{tuple:list}
+        """
+        vlookup_field = str(vlookup_field)
+        summary_list = []
+        if level == 0:
+            cgi_list = SqliteUtils.get_project_cgi_list(conn, vlookup_field)
+            band_mix = SqliteUtils.get_project_band_mix_dict(conn, vlookup_field).get(vlookup_field, {})
+            summary_list.append(
+                ['频段构成', '、'.join(f"{band if band else '未知频段'}:{count}" for band, count in band_mix.items())])
+            summary_list.append(['共享小区数', str(SqliteUtils.get_project_shared_cell_count(conn, vlookup_field))])
+        elif level == 1:
+            cgi_list = SqliteUtils.get_gnb_cgi_list(conn, vlookup_field)
+        else:
+            cgi_list = [vlookup_field]
+            summary_list.append(['归属项目数', str(SqliteUtils.get_cell_project_count(conn, vlookup_field))])
+        return {(DetailCache.KIND_DETAIL, level, vlookup_field): SqliteUtils().get_detail_table(conn, level, vlookup_field),
+                (DetailCache.KIND_CGI_LIST, level, vlookup_field): cgi_list,
+                (DetailCache.KIND_SUMMARY, level, vlookup_field): summary_list}
+
+    def prefetch(self, level, vlookup_field_list):
+        """
+        在后台批量预取子节点明细（基站还同时预取小区列表），不阻塞界面
+        主连接存在未提交的修改时不预取，避免只读连接读到与主连接不一致的数据
+        :param level: 1为基站，2为小区
+        :type level: int
+        :param vlookup_field_list: 基站号或CGI列表
+        :type vlookup_field_list: list[str]
+        :return: None
+        """
+        self.check_data_version()
+        if self.conn.in_transaction:
+            return
+        vlookup_field_list = [str(vlookup_field) for vlookup_field in vlookup_field_list
+                              if (self.KIND_DETAIL, level, str(vlookup_field)) not in self.entries]
+        if vlookup_field_list:
+            data_version = self.data_version
+            self.async_db.read(self.get_prefetch_dict, level, vlookup_field_list,
+                               callback=lambda prefetch_dict: self.prefetch_finished(data_version, prefetch_dict))
+
+    @staticmethod
+    def get_prefetch_dict(conn, level, vlookup_field_list):
+        """
+        预取查询，在读线程中执行
+        :param conn: 只读数据库连接
+        :type conn: Connection
+        :param level: 1为基站，2为小区
+        :type level: int
+        :param vlookup_field_list: 基站号或CGI列表
+        :type vlookup_field_list: list[str]
+        :return: key为缓存键，value为缓存内容
+        :rtype: dict{tuple:list}
+        """
+        prefetch_dict = {(DetailCache.KIND_DETAIL, level, key): value for key, value in
+                         SqliteUtils.get_detail_table_dict(conn, level, vlookup_field_list).items()}
+        if level == 1:
+            prefetch_dict.update({(DetailCache.KIND_CGI_LIST, level, key): value for key, value in
+                                  SqliteUtils.get_gnb_cgi_dict(conn, vlookup_field_list).items()})
+        return prefetch_dict
+
+    def prefetch_finished(self, data_version, prefetch_dict):
+        """
+        预取完成回调，在主线程执行，预取期间数据库未变化时写入缓存
+        :param data_version: 预取开始时的数据库版本
+        :type data_version: tuple
+        :param prefetch_dict: 预取结果
+        :type prefetch_dict: dict{tuple:list}
+        :return: None
+        """
+        if not self.check_data_version() or data_version != self.data_version:
+            return
+        for key, value in prefetch_dict.items():
+            if key not in self.entries:
+                self.put(key, value)
@@ -0,0 +1,206 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import os
+
+import numpy as np
+
+from utils.raster_utils import SectorCoverageGrid
+
+# 扇区属性列，与扇区图层字段一致
+SECTOR_ATTRIBUTE_COLUMNS = ('唯一标识', '基站号', '小区名', '站型', '行政区', '设备厂家', '频段', '带宽', 'Group ID')
+
+
+class SectorAttributeStore:
+    """
+    扇区属性列存储：扇区图层的属性按列以字典编码保存，全部列共用一个字符串池，
+    pool_data为字符串池的UTF-8字节，pool_offsets[i]:pool_offsets[i+1]为第i个字符串，
+    codes[列号, 行号]为字符串池编号，行号即要素遍历顺序，row_fid为对应的要素id；
+    cgi_sorted、cgi_order为按唯一标识排序的唯一标识和行号，用于二分查找
+    全部数组以.npy文件保存在存储目录下，加载时内存映射，按行号取值时只解码用到的字符串，工参文件变化后需重建
+    """
+
+    ARRAY_NAMES = ('pool_data', 'pool_offsets', 'codes', 'row_fid', 'cgi_sorted', 'cgi_order')
+
+    def __init__(self, store_dir):
+        """
+        :param store_dir: 存储目录，例如data/attribute_store/宏站扇区图层
+        :type store_dir: str
+        """
+        self.store_dir = store_dir
+        self.meta = {}
+        self.pool_data = None
+        self.pool_offsets = None
+        self.codes = None
+        self.row_fid = None
+        self.cgi_sorted = None
+        self.cgi_order = None
+
+    def is_loaded(self):
+        return self.codes is not None
+
+    def get_row_count(self):
+        return self.codes.shape[1] if self.is_loaded() else 0
+
+    # 判断磁盘上的列存储是否与当前工参文件一致
+    def is_valid_for(self, source_path):
+        """
+        判断磁盘上的列存储是否与当前工参文件一致
+        :param source_path: 工参文件路径
+        :type source_path: str
+        :return: 是否可直接加载
+        :rtype: bool
+        """
+        meta_path = os.path.join(self.store_dir, 'meta.json')
+        if not os.path.exists(source_path) or not os.path.exists(meta_path):
+            return False
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return False
+        expected = SectorCoverageGrid.get_source_identity(source_path)
+        expected['columns'] = list(SECTOR_ATTRIBUTE_COLUMNS)
+        return all(meta.get(key) == value for key, value in expected.items()) and all(
+            os.path.exists(os.path.join(self.store_dir, f'{name}.npy')) for name in self.ARRAY_NAMES)
+
+    # 从磁盘以内存映射方式加载列存储
+    def load(self):
+        """
+        从磁盘以内存映射方式加载列存储
+        :return: None
+        """
+        with open(os.path.join(self.store_dir, 'meta.json'), 'r', encoding='utf-8') as meta_file:
+            self.meta = json.load(meta_file)
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, np.load(os.path.join(self.store_dir, f'{name}.npy'), mmap_mode='r'))
+
+    # 由扇区属性行生成列存储并写入磁盘
+    def build(self, source_path, row_list, fid_list):
+        """
+        由扇区属性行生成列存储并写入磁盘，写入过程中先删除meta.json，中断后下次会自动重建
+        :param source_path: 工参文件路径
+        :type source_path: str
+        :param row_list: 扇区属性行，每行的值按SECTOR_ATTRIBUTE_COLUMNS排列，均已转换为字符串
+        :type row_list: list[tuple[str]]
+        :param fid_list: 与row_list对应的要素id
+        :type fid_list: list[int]
+        :return: 行数
+        :rtype: int
+        """
+        string_index_dict = {}
+        codes = np.empty((len(SECTOR_ATTRIBUTE_COLUMNS), len(row_list)), dtype=np.int32)
+        for row_index, row in enumerate(row_list):
+            for column_index, value in enumerate(row):
+                codes[column_index, row_index] = string_index_dict.setdefault(value, len(string_index_dict))
+        encoded_list = [string.encode('utf-8') for string in string_index_dict]
+        pool_offsets = np.zeros(len(encoded_list) + 1, dtype=np.int64)
+        np.cumsum([len(encoded) for encoded in encoded_list], out=pool_offsets[1:])
+        pool_data = np.frombuffer(b''.join(encoded_list), dtype=np.uint8)
+        cgi_array = np.asarray([row[0] for row in row_list], dtype=str)
+        cgi_order = np.argsort(cgi_array, kind='stable').astype(np.int64)
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        meta_path = os.path.join(self.store_dir, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        arrays = {
+            'pool_data': pool_data,
+            'pool_offsets': pool_offsets,
+            'codes': codes,
+            'row_fid': np.asarray(fid_list, dtype=np.int64),
+            'cgi_sorted': cgi_array[cgi_order],
+            'cgi_order': cgi_order,
+        }
+        # 释放旧数组的内存映射后再覆盖文件
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, None)
+        for name, array in arrays.items():
+            np.save(os.path.join(self.store_dir, f'{name}.npy'), array)
+        self.meta = SectorCoverageGrid.get_source_identity(source_path)
+        self.meta.update({'columns': list(SECTOR_ATTRIBUTE_COLUMNS), 'row_count': len(row_list),
+                          'string_count': len(encoded_list)})
+        with open(meta_path, 'w', encoding='utf-8') as meta_file:
+            json.dump(self.meta, meta_file, ensure_ascii=False)
+        self.load()
+        return len(row_list)
+
+    # 按唯一标识查找行号
+    def get_row_index(self, cgi_list):
+        """
+        按唯一标识二分查找行号，唯一标识重复时返回全部行，结果按行号（要素遍历顺序）升序排列
+        :param cgi_list: 唯一标识列表
+        :type cgi_list: list[str]
+        :return: 行号
+        :rtype: np.ndarray (int64)
+        """
+        if not cgi_list or not self.get_row_count():
+            return np.empty(0, dtype=np.int64)
+        # 查询值不能转换为存储的定长类型，否则超长的唯一标识会被截断后匹配到其他扇区
+        cgi_array = np.unique(np.asarray([str(cgi) for cgi in cgi_list], dtype=str))
+        left = np.searchsorted(self.cgi_sorted, cgi_array, side='left')
+        right = np.searchsorted(self.cgi_sorted, cgi_array, side='right')
+        found = self.cgi_sorted[np.minimum(left, len(self.cgi_sorted) - 1)] == cgi_array
+        count = np.where(found, right - left, 0)
+        if not count.any():
+            return np.empty(0, dtype=np.int64)
+        # 展开每个唯一标识对应的[left, right)区间
+        position = np.repeat(left - np.cumsum(count) + count, count) + np.arange(count.sum())
+        return np.sort(self.cgi_order[position])
+
+    # 按行号取出若干列的值
+    def get_columns(self, row_index, column_name_list=SECTOR_ATTRIBUTE_COLUMNS):
+        """
+        按行号取出若干列的值，字符串池中只解码用到的字符串
+        :param row_index: 行号数组
+        :type row_index: np.ndarray
+        :param column_name_list: 列名
+        :type column_name_list: tuple[str]
+        :return: key为列名，value为该列的值列表
+        :rtype: dict{str:list[str]}
+        """
+        column_index_list = [SECTOR_ATTRIBUTE_COLUMNS.index(column_name) for column_name in column_name_list]
+        codes = self.codes[column_index_list][:, np.asarray(row_index, dtype=np.int64)]
+        unique_codes, inverse = np.unique(codes, return_inverse=True)
+        strings = [bytes(self.pool_data[self.pool_offsets[code]:self.pool_offsets[code + 1]]).decode('utf-8')
+                   for code in unique_codes]
+        inverse = inverse.reshape(codes.shape)
+        return {column_name: [strings[i] for i in inverse[j]] for j, column_name in enumerate(column_name_list)}
+
+    # 按行号取出扇区属性行
+    def get_rows(self, row_index, column_name_list=SECTOR_ATTRIBUTE_COLUMNS):
+        """
+        按行号取出扇区属性行，用于报告表格
+        :param row_index: 行号数组
+        :type row_index: np.ndarray
+        :param column_name_list: 列名
+        :type column_name_list: tuple[str]
+        :return: 每行为key为列名的字典
+        :rtype: list[dict]
+        """
+        if not len(row_index):
+            return []
+        column_dict = self.get_columns(row_index, column_name_list)
+        return [dict(zip(column_name_list, values)) for values in zip(*column_dict.values())]
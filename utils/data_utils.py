@@ -22,6 +22,7 @@
 """
 
 import re
+import struct
 
 from qgis._core import QgsGeometry, QgsMultiPoint, QgsPoint
 
@@ -99,6 +100,19 @@ class DataUtils:
         else:
             return False
 
+    # 判断CGI格式是否合法
+    @staticmethod
+    def cgi_is_valid(cgi):
+        """
+        判断CGI格式是否合法（MCC-MNC-基站号-小区号）
+        :param cgi: CGI
+        :type cgi: str
+        :return: 是/否
+        :rtype: bool
+        """
+        pattern = r'^(\d{3})-(\d{2})-(\d{1,8})-(\d{1,3})$'
+        return re.match(pattern, str(cgi)) is not None
+
     # 判断CGI是否为广电小区
     @staticmethod
     def cgi_replace_plmn_to_46000(cgi):
@@ -157,3 +171,54 @@ class DataUtils:
             else:
                 continue
         return wkt_dict_list_point, wkt_dict_list_line, wkt_dict_list_polygon
+
+    # 将wkt转化为多类型几何的WKB，同时计算外包框，用于项目明细WKB列的回填
+    @staticmethod
+    def wkt_to_wkb_with_bbox(wkt):
+        """
+        将wkt转化为多类型几何（点/线/面统一转为多点/多线/多面）的WKB，同时计算外包框，用于项目明细WKB列的回填
+        :param wkt: wkt文本
+        :type wkt: str
+        :return: (wkb, xmin, ymin, xmax, ymax)，wkt无效时返回(b'', None, None, None, None)
+        :rtype: tuple
+        """
+        geometry = QgsGeometry.fromWkt(wkt)
+        if geometry.isEmpty() or not geometry.isGeosValid():
+            return b'', None, None, None, None
+        geometry.convertToMultiType()
+        bbox = geometry.boundingBox()
+        return bytes(geometry.asWkb()), bbox.xMinimum(), bbox.yMinimum(), bbox.xMaximum(), bbox.yMaximum()
+
+    # 对于给定的包含wkb的List（从sql中直接导出的），仅读取WKB头部的几何类型，对3类图层各返回一个list
+    @staticmethod
+    def wkb_sort_processor(wkb_dict_list):
+        """
+        对于给定的包含wkb的List（从sql中直接导出的），仅读取WKB头部的几何类型（回填时已完成合法性校验和单转多），对3类图层各返回一个list，
+        WKB为空（回填时WKT无效）或几何类型无法识别的记录单独返回，由调用方输出告警
+        :param wkb_dict_list: sql导出的包含wkb的List
+        :type wkb_dict_list: list
+        :return: wkb_dict_list_point,wkb_dict_list_line,wkb_dict_list_polygon,wkb_dict_list_invalid
+        :rtype:list[4]
+        """
+        wkb_dict_list_point = []
+        wkb_dict_list_line = []
+        wkb_dict_list_polygon = []
+        wkb_dict_list_invalid = []
+        if not wkb_dict_list:
+            return wkb_dict_list_point, wkb_dict_list_line, wkb_dict_list_polygon, wkb_dict_list_invalid
+        for wkb_dict in wkb_dict_list:
+            wkb = wkb_dict['wkb']
+            if not wkb or len(wkb) < 5:
+                wkb_dict_list_invalid.append(wkb_dict)
+                continue
+            # 第1字节为字节序，之后4字节为几何类型（ISO WKB中带Z/M的类型以千位区分）
+            geom_type = struct.unpack_from('<I' if wkb[0] == 1 else '>I', wkb, 1)[0] % 1000
+            if geom_type == 4:  # 多点
+                wkb_dict_list_point.append(wkb_dict)
+            elif geom_type == 5:  # 多线
+                wkb_dict_list_line.append(wkb_dict)
+            elif geom_type == 6:  # 多面
+                wkb_dict_list_polygon.append(wkb_dict)
+            else:
+                wkb_dict_list_invalid.append(wkb_dict)
+        return wkb_dict_list_point, wkb_dict_list_line, wkb_dict_list_polygon, wkb_dict_list_invalid
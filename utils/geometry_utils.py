@@ -0,0 +1,311 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import struct
+
+import numpy as np
+
+
+class GeometryUtils:
+    """
+    基于NumPy的几何计算工具，不依赖QGIS对象，几何统一以WKB二进制或(n,2)坐标数组传入
+    """
+
+    # 解析点/线/面（含多部件）的WKB，返回每条线或每个环的坐标数组
+    @staticmethod
+    def wkb_to_coords_list(wkb, include_interior_rings=True):
+        """
+        解析点/线/面（含多部件和几何集合，支持Z/M维度，仅保留XY）的WKB，返回每条线或每个环的坐标数组，点为单点数组
+        :param wkb: WKB二进制
+        :type wkb: bytes
+        :param include_interior_rings: 对于面，是否包含内环（洞）
+        :type include_interior_rings: bool
+        :return: 坐标数组列表，每个元素为(n,2)的数组，以及对应是否为闭合环的标记
+        :rtype: list[np.ndarray], list[bool]
+        """
+        coords_list = []
+        closed_list = []
+
+        def read_geometry(offset):
+            byte_order = '<' if wkb[offset] == 1 else '>'
+            geom_type = struct.unpack_from(byte_order + 'I', wkb, offset + 1)[0]
+            dims = 2 + (1 if geom_type // 1000 in (1, 2) else 0) + (2 if geom_type // 1000 == 3 else 0)
+            base_type = geom_type % 1000
+            offset += 5
+            if base_type == 1:  # 点
+                offset = read_ring(offset, byte_order, dims, False, point_count=1)
+            elif base_type == 2:  # 线
+                offset = read_ring(offset, byte_order, dims, False)
+            elif base_type == 3:  # 面
+                ring_count = struct.unpack_from(byte_order + 'I', wkb, offset)[0]
+                offset += 4
+                for ring_index in range(ring_count):
+                    offset = read_ring(offset, byte_order, dims, True, ring_index == 0 or include_interior_rings)
+            elif base_type in (4, 5, 6, 7):  # 多点、多线、多面、几何集合
+                part_count = struct.unpack_from(byte_order + 'I', wkb, offset)[0]
+                offset += 4
+                for _ in range(part_count):
+                    offset = read_geometry(offset)
+            else:
+                raise ValueError(f'不支持的WKB几何类型{geom_type}')
+            return offset
+
+        def read_ring(offset, byte_order, dims, closed, keep=True, point_count=None):
+            if point_count is None:
+                point_count = struct.unpack_from(byte_order + 'I', wkb, offset)[0]
+                offset += 4
+            if keep and point_count > 0:
+                coords = np.frombuffer(wkb, dtype=np.dtype(byte_order + 'f8'), count=point_count * dims,
+                                       offset=offset).reshape(point_count, dims)[:, :2]
+                coords_list.append(coords.astype(float))
+                closed_list.append(closed)
+            return offset + point_count * dims * 8
+
+        read_geometry(0)
+        return coords_list, closed_list
+
+    # 对一条折线按固定间距一次性计算全部采样点（累计长度+二分查找），避免逐点插值
+    @staticmethod
+    def densify_coords(coords, point_interval, include_end=True):
+        """
+        对一条折线按固定间距一次性计算全部采样点，通过线段长度累计和（cumsum）与二分查找（searchsorted）定位，
+        总复杂度为O(n+m)，n为顶点数，m为采样点数
+        :param coords: 折线坐标
+        :type coords: np.ndarray (n,2)
+        :param point_interval: 采样间距（坐标系单位）
+        :type point_interval: float
+        :param include_end: 是否追加终点（闭合环的终点与起点重合，应传False）
+        :type include_end: bool
+        :return: 采样点坐标
+        :rtype: np.ndarray (m,2)
+        """
+        coords = np.asarray(coords, dtype=float)
+        if len(coords) < 2:
+            return coords.copy()
+        segments = np.diff(coords, axis=0)
+        segment_lengths = np.hypot(segments[:, 0], segments[:, 1])
+        cumulative_lengths = np.concatenate(([0.0], np.cumsum(segment_lengths)))
+        total_length = cumulative_lengths[-1]
+        if total_length == 0:
+            return coords[:1].copy()
+        distances = np.arange(0, total_length, point_interval)
+        if include_end:
+            distances = np.append(distances, total_length)
+        segment_index = np.clip(np.searchsorted(cumulative_lengths, distances, side='right') - 1, 0,
+                                len(segment_lengths) - 1)
+        ratio = np.divide(distances - cumulative_lengths[segment_index], segment_lengths[segment_index],
+                          out=np.zeros_like(distances), where=segment_lengths[segment_index] > 0)
+        return coords[segment_index] + segments[segment_index] * ratio[:, None]
+
+    # 对线/面几何（含多部件和内环）进行离散化，支持按点数自适应调整间距
+    @staticmethod
+    def densify_wkb(wkb, point_interval, include_interior_rings=True, min_points=None, max_points=None):
+        """
+        对线/面几何（含多线、多面和内环）进行离散化，返回全部采样点
+        自适应间距：总长度按point_interval采样点数超过max_points时放大间距，不足min_points时缩小间距
+        :param wkb: 线或面的WKB二进制
+        :type wkb: bytes
+        :param point_interval: 采样间距（坐标系单位）
+        :type point_interval: float
+        :param include_interior_rings: 对于面，是否在内环上采样
+        :type include_interior_rings: bool
+        :param min_points: 最少采样点数，为空则不限制
+        :type min_points: int
+        :param max_points: 最多采样点数，为空则不限制
+        :type max_points: int
+        :return: 采样点坐标
+        :rtype: np.ndarray (m,2)
+        """
+        coords_list, closed_list = GeometryUtils.wkb_to_coords_list(wkb, include_interior_rings)
+        if not coords_list:
+            return np.empty((0, 2))
+        total_length = sum(float(np.hypot(*np.diff(coords, axis=0).T).sum()) for coords in coords_list)
+        if max_points and total_length / point_interval > max_points:
+            point_interval = total_length / max_points
+        if min_points and total_length > 0 and total_length / point_interval < min_points:
+            point_interval = total_length / min_points
+        points_list = [GeometryUtils.densify_coords(coords, point_interval, include_end=not closed)
+                       for coords, closed in zip(coords_list, closed_list)]
+        return np.concatenate(points_list)
+
+    # 批量判定点是否落在由若干环组成的面内（奇偶规则，支持内环和多部件）
+    @staticmethod
+    def points_in_rings(x, y, coords_list):
+        """
+        批量判定点是否落在由若干环组成的面内，采用奇偶规则（射线法），内环（洞）和多部件无需区分
+        :param x: 点的X坐标
+        :type x: np.ndarray (n,)
+        :param y: 点的Y坐标
+        :type y: np.ndarray (n,)
+        :param coords_list: 环的坐标数组列表，通常为wkb_to_coords_list的返回值
+        :type coords_list: list[np.ndarray]
+        :return: 每个点是否在面内
+        :rtype: np.ndarray (n,) bool
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        inside = np.zeros(x.shape, dtype=bool)
+        for coords in coords_list:
+            if len(coords) < 3:
+                continue
+            x1, y1 = coords[:-1, 0], coords[:-1, 1]
+            x2, y2 = coords[1:, 0], coords[1:, 1]
+            for edge_index in range(len(x1)):
+                crossing = (y1[edge_index] > y) != (y2[edge_index] > y)
+                if not crossing.any():
+                    continue
+                x_cross = x1[edge_index] + (y[crossing] - y1[edge_index]) * (x2[edge_index] - x1[edge_index]) / (
+                        y2[edge_index] - y1[edge_index])
+                inside[crossing] ^= x[crossing] < x_cross
+        return inside
+
+    # 批量计算点到若干线/环的最小距离
+    @staticmethod
+    def points_to_coords_distance(x, y, coords_list):
+        """
+        批量计算点到若干线/环（单点数组视为点）的最小距离，逐线段向量化计算，适合点多、顶点少的情形
+        :param x: 点的X坐标
+        :type x: np.ndarray (n,)
+        :param y: 点的Y坐标
+        :type y: np.ndarray (n,)
+        :param coords_list: 坐标数组列表，通常为wkb_to_coords_list的返回值
+        :type coords_list: list[np.ndarray]
+        :return: 每个点的最小距离，coords_list为空时为inf
+        :rtype: np.ndarray (n,)
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        min_distance_square = np.full(x.shape, np.inf)
+        for coords in coords_list:
+            if len(coords) == 1:
+                np.minimum(min_distance_square, (x - coords[0, 0]) ** 2 + (y - coords[0, 1]) ** 2,
+                           out=min_distance_square)
+                continue
+            for (x1, y1), (x2, y2) in zip(coords[:-1], coords[1:]):
+                dx, dy = x2 - x1, y2 - y1
+                length_square = dx * dx + dy * dy
+                # 投影参数截断至[0,1]，即取线段上的最近点
+                t = np.clip(((x - x1) * dx + (y - y1) * dy) / length_square, 0.0, 1.0) if length_square > 0 else 0.0
+                np.minimum(min_distance_square, (x - x1 - t * dx) ** 2 + (y - y1 - t * dy) ** 2,
+                           out=min_distance_square)
+        return np.sqrt(min_distance_square)
+
+    # 根据站点经纬度、方位角、波瓣宽度和半径批量生成扇区多边形的环
+    @staticmethod
+    def sector_wedge_rings(lon, lat, azimuth, beamwidth, radius, arc_point_count=16):
+        """
+        根据站点经纬度、方位角、波瓣宽度和半径一次性批量生成扇区多边形的外环（EPSG:4326），
+        站点附近按局部等距近似将米换算为经纬度；波瓣宽度不小于360度时生成以站点为圆心的圆（用于室分小区）
+        所有环的点数相同（站点 + 弧上arc_point_count个点 + 闭合点），便于整体向量化
+        :param lon: 经度
+        :type lon: np.ndarray (n,)
+        :param lat: 纬度
+        :type lat: np.ndarray (n,)
+        :param azimuth: 方位角（度，正北为0，顺时针）
+        :type azimuth: np.ndarray (n,)
+        :param beamwidth: 波瓣宽度（度）
+        :type beamwidth: np.ndarray (n,)
+        :param radius: 半径（米）
+        :type radius: np.ndarray (n,)
+        :param arc_point_count: 弧上的点数
+        :type arc_point_count: int
+        :return: 扇区外环坐标
+        :rtype: np.ndarray (n, arc_point_count + 2, 2)
+        """
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        azimuth = np.asarray(azimuth, dtype=float)
+        beamwidth = np.minimum(np.asarray(beamwidth, dtype=float), 360.0)
+        radius = np.asarray(radius, dtype=float)
+        circle = beamwidth >= 360.0
+
+        # 弧上各点的方位角，圆形时首尾重合
+        step = np.linspace(-0.5, 0.5, arc_point_count)
+        angle = np.radians(azimuth[:, None] + beamwidth[:, None] * step[None, :])
+        meter_per_degree_lon = 111320.0 * np.cos(np.radians(lat))[:, None]
+        arc_lon = lon[:, None] + radius[:, None] * np.sin(angle) / meter_per_degree_lon
+        arc_lat = lat[:, None] + radius[:, None] * np.cos(angle) / 110574.0
+
+        rings = np.empty((len(lon), arc_point_count + 2, 2))
+        rings[:, 1:-1, 0] = arc_lon
+        rings[:, 1:-1, 1] = arc_lat
+        # 扇形的起止点为站点，圆形的起止点为弧的首点
+        rings[:, 0, 0] = np.where(circle, arc_lon[:, 0], lon)
+        rings[:, 0, 1] = np.where(circle, arc_lat[:, 0], lat)
+        rings[:, -1] = rings[:, 0]
+        return rings
+
+    # 将点数相同的一组多边形外环批量编码为WKB
+    @staticmethod
+    def polygon_rings_to_wkb_list(rings):
+        """
+        将点数相同的一组多边形外环批量编码为WKB（小端序，Polygon），整体写入一块内存后按定长切分
+        :param rings: 多边形外环坐标
+        :type rings: np.ndarray (n, m, 2)
+        :return: WKB列表
+        :rtype: list[bytes]
+        """
+        rings = np.ascontiguousarray(rings, dtype='<f8')
+        point_count = rings.shape[1]
+        wkb_dtype = np.dtype([('byte_order', 'u1'), ('geometry_type', '<u4'), ('ring_count', '<u4'),
+                              ('point_count', '<u4'), ('coords', '<f8', (point_count, 2))])
+        wkb_array = np.empty(len(rings), dtype=wkb_dtype)
+        wkb_array['byte_order'] = 1
+        wkb_array['geometry_type'] = 3
+        wkb_array['ring_count'] = 1
+        wkb_array['point_count'] = point_count
+        wkb_array['coords'] = rings
+        wkb_bytes = wkb_array.tobytes()
+        return [wkb_bytes[i:i + wkb_dtype.itemsize] for i in range(0, len(wkb_bytes), wkb_dtype.itemsize)]
+
+    # 将经纬度批量转换为UTM投影坐标
+    @staticmethod
+    def lonlat_to_utm(lon, lat, zone=50):
+        """
+        将WGS84经纬度批量转换为北半球UTM投影坐标（默认为50带，即EPSG:32650），
+        使用Krüger级数展开的横轴墨卡托正算，带内误差在毫米级，不依赖QGIS，可在工作线程中对大批量点使用
+        :param lon: 经度
+        :type lon: np.ndarray
+        :param lat: 纬度
+        :type lat: np.ndarray
+        :param zone: UTM带号
+        :type zone: int
+        :return: X坐标、Y坐标（米）
+        :rtype: np.ndarray, np.ndarray
+        """
+        flattening = 1 / 298.257223563
+        n = flattening / (2 - flattening)
+        rectifying_radius = 6378137.0 / (1 + n) * (1 + n ** 2 / 4 + n ** 4 / 64)
+        alpha = (n / 2 - 2 * n ** 2 / 3 + 5 * n ** 3 / 16, 13 * n ** 2 / 48 - 3 * n ** 3 / 5, 61 * n ** 3 / 240)
+        lat_rad = np.radians(np.asarray(lat, dtype=float))
+        lon_diff = np.radians(np.asarray(lon, dtype=float) - (zone * 6 - 183))
+        e_factor = 2 * np.sqrt(n) / (1 + n)
+        t = np.sinh(np.arctanh(np.sin(lat_rad)) - e_factor * np.arctanh(e_factor * np.sin(lat_rad)))
+        xi = np.arctan2(t, np.cos(lon_diff))
+        eta = np.arctanh(np.sin(lon_diff) / np.sqrt(1 + t ** 2))
+        easting = eta.copy()
+        northing = xi.copy()
+        for j, alpha_j in enumerate(alpha, start=1):
+            easting += alpha_j * np.cos(2 * j * xi) * np.sinh(2 * j * eta)
+            northing += alpha_j * np.sin(2 * j * xi) * np.cosh(2 * j * eta)
+        return 500000.0 + 0.9996 * rectifying_radius * easting, 0.9996 * rectifying_radius * northing
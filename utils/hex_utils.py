@@ -0,0 +1,246 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import math
+
+import numpy as np
+
+from utils.geometry_utils import GeometryUtils
+
+
+class HexUtils:
+    """
+    分层六边形格网（H3风格，尖顶六边形，轴向坐标q、r），在米制坐标系（EPSG:32650）下计算，不依赖外部库
+    六边形编号为int64：分辨率占高8位，q、r加偏移后各占28位，可直接存入SQLite的INTEGER列进行整数关联
+    各分辨率为独立格网，上级格网通过六边形中心点所在的粗分辨率格网确定（与H3相同，父子关系为近似嵌套）
+    """
+
+    # 分辨率对应的六边形边长（外接圆半径，米）
+    RESOLUTION_EDGE = {0: 4000.0, 1: 1000.0, 2: 250.0}
+    AXIS_OFFSET = 1 << 27
+    AXIS_MASK = (1 << 28) - 1
+
+    # 将轴向坐标编码为六边形编号
+    @staticmethod
+    def encode(resolution, q, r):
+        """
+        将轴向坐标编码为六边形编号
+        :param resolution: 分辨率
+        :type resolution: int
+        :param q: 轴向坐标q
+        :type q: np.ndarray
+        :param r: 轴向坐标r
+        :type r: np.ndarray
+        :return: 六边形编号
+        :rtype: np.ndarray (int64)
+        """
+        q = np.asarray(q, dtype=np.int64) + HexUtils.AXIS_OFFSET
+        r = np.asarray(r, dtype=np.int64) + HexUtils.AXIS_OFFSET
+        return (np.int64(resolution) << 56) | (q << 28) | r
+
+    # 将六边形编号解码为分辨率和轴向坐标
+    @staticmethod
+    def decode(cell_id):
+        """
+        将六边形编号解码为分辨率和轴向坐标
+        :param cell_id: 六边形编号
+        :type cell_id: np.ndarray
+        :return: 分辨率、q、r
+        :rtype: np.ndarray, np.ndarray, np.ndarray
+        """
+        cell_id = np.asarray(cell_id, dtype=np.int64)
+        resolution = cell_id >> 56
+        q = ((cell_id >> 28) & HexUtils.AXIS_MASK) - HexUtils.AXIS_OFFSET
+        r = (cell_id & HexUtils.AXIS_MASK) - HexUtils.AXIS_OFFSET
+        return resolution, q, r
+
+    # 计算点所在的六边形编号
+    @staticmethod
+    def point_to_cell(x, y, resolution):
+        """
+        计算点所在的六边形编号（立方坐标取整）
+        :param x: X坐标（米）
+        :type x: np.ndarray
+        :param y: Y坐标（米）
+        :type y: np.ndarray
+        :param resolution: 分辨率
+        :type resolution: int
+        :return: 六边形编号
+        :rtype: np.ndarray (int64)
+        """
+        edge = HexUtils.RESOLUTION_EDGE[resolution]
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        q_frac = (math.sqrt(3) / 3 * x - y / 3) / edge
+        r_frac = (2 / 3 * y) / edge
+        s_frac = -q_frac - r_frac
+        q = np.round(q_frac)
+        r = np.round(r_frac)
+        s = np.round(s_frac)
+        q_diff = np.abs(q - q_frac)
+        r_diff = np.abs(r - r_frac)
+        s_diff = np.abs(s - s_frac)
+        fix_q = (q_diff > r_diff) & (q_diff > s_diff)
+        fix_r = ~fix_q & (r_diff > s_diff)
+        q = np.where(fix_q, -r - s, q)
+        r = np.where(fix_r, -q - s, r)
+        return HexUtils.encode(resolution, q, r)
+
+    # 计算六边形中心点坐标
+    @staticmethod
+    def cell_to_center(cell_id):
+        """
+        计算六边形中心点坐标
+        :param cell_id: 六边形编号（需为同一分辨率）
+        :type cell_id: np.ndarray
+        :return: 中心点X坐标、Y坐标
+        :rtype: np.ndarray, np.ndarray
+        """
+        resolution, q, r = HexUtils.decode(cell_id)
+        edge = HexUtils.RESOLUTION_EDGE[int(np.ravel(resolution)[0])] if np.size(resolution) else 0.0
+        return edge * math.sqrt(3) * (q + r / 2), edge * 1.5 * r
+
+    # 获取六边形在粗分辨率下的上级六边形
+    @staticmethod
+    def cell_to_parent(cell_id, parent_resolution):
+        """
+        获取六边形在粗分辨率下的上级六边形（中心点所在的粗分辨率六边形）
+        :param cell_id: 六边形编号
+        :type cell_id: np.ndarray
+        :param parent_resolution: 上级分辨率
+        :type parent_resolution: int
+        :return: 上级六边形编号
+        :rtype: np.ndarray (int64)
+        """
+        center_x, center_y = HexUtils.cell_to_center(cell_id)
+        return HexUtils.point_to_cell(center_x, center_y, parent_resolution)
+
+    # 计算两组同分辨率六边形之间的格网距离
+    @staticmethod
+    def grid_distance(cell_id_a, cell_id_b):
+        """
+        计算两组同分辨率六边形之间的格网距离（步数），支持广播
+        :param cell_id_a: 六边形编号
+        :type cell_id_a: np.ndarray
+        :param cell_id_b: 六边形编号
+        :type cell_id_b: np.ndarray
+        :return: 格网距离
+        :rtype: np.ndarray (int64)
+        """
+        _, q_a, r_a = HexUtils.decode(cell_id_a)
+        _, q_b, r_b = HexUtils.decode(cell_id_b)
+        dq = q_a - q_b
+        dr = r_a - r_b
+        return np.maximum(np.maximum(np.abs(dq), np.abs(dr)), np.abs(dq + dr))
+
+    # 获取六边形k环内的全部六边形
+    @staticmethod
+    def k_ring(cell_id_list, k):
+        """
+        获取一组六边形k环内（格网距离不超过k）的全部六边形
+        :param cell_id_list: 六边形编号（需为同一分辨率）
+        :type cell_id_list: np.ndarray
+        :param k: 环数
+        :type k: int
+        :return: 六边形编号（升序、去重）
+        :rtype: np.ndarray (int64)
+        """
+        resolution, q, r = HexUtils.decode(np.atleast_1d(cell_id_list))
+        if not len(q):
+            return np.empty(0, dtype=np.int64)
+        dq, dr = np.meshgrid(np.arange(-k, k + 1), np.arange(-k, k + 1))
+        within = np.abs(dq + dr) <= k
+        dq = dq[within]
+        dr = dr[within]
+        return np.unique(HexUtils.encode(int(resolution[0]), (q[:, None] + dq).ravel(), (r[:, None] + dr).ravel()))
+
+    # 将几何（若干环或线）覆盖为六边形编号
+    @staticmethod
+    def coords_list_to_cells(coords_list, closed_list, resolution):
+        """
+        将几何覆盖为六边形编号：中心点在面内的六边形，加上边界或线按半个边长采样经过的六边形，
+        返回的每个六边形都与几何相交，仅擦过六边形角部的边界可能被忽略
+        :param coords_list: 环或线的坐标数组列表（米制坐标系）
+        :type coords_list: list[np.ndarray]
+        :param closed_list: 与coords_list对应的是否为闭合环的标记
+        :type closed_list: list[bool]
+        :param resolution: 分辨率
+        :type resolution: int
+        :return: 六边形编号（升序、去重）
+        :rtype: np.ndarray (int64)
+        """
+        if not coords_list:
+            return np.empty(0, dtype=np.int64)
+        edge = HexUtils.RESOLUTION_EDGE[resolution]
+        border_points = np.vstack([GeometryUtils.densify_coords(coords, edge / 2) for coords in coords_list])
+        cell_chunks = [HexUtils.point_to_cell(border_points[:, 0], border_points[:, 1], resolution)]
+        ring_list = [coords for coords, closed in zip(coords_list, closed_list) if closed]
+        if ring_list:
+            all_coords = np.vstack(ring_list)
+            x_min, y_min = all_coords.min(axis=0)
+            x_max, y_max = all_coords.max(axis=0)
+            r_min = int(math.floor(y_min / (1.5 * edge))) - 1
+            r_max = int(math.ceil(y_max / (1.5 * edge))) + 1
+            q_min = int(math.floor(x_min / (math.sqrt(3) * edge) - r_max / 2)) - 1
+            q_max = int(math.ceil(x_max / (math.sqrt(3) * edge) - r_min / 2)) + 1
+            q, r = np.meshgrid(np.arange(q_min, q_max + 1), np.arange(r_min, r_max + 1))
+            q = q.ravel()
+            r = r.ravel()
+            center_x = edge * math.sqrt(3) * (q + r / 2)
+            center_y = edge * 1.5 * r
+            inside = GeometryUtils.points_in_rings(center_x, center_y, ring_list)
+            cell_chunks.append(HexUtils.encode(resolution, q[inside], r[inside]))
+        return np.unique(np.concatenate(cell_chunks))
+
+    # 将WKB几何覆盖为各分辨率的六边形编号
+    @staticmethod
+    def wkb_to_cells(wkb, resolution_list=None):
+        """
+        将WKB几何（米制坐标系）覆盖为各分辨率的六边形编号
+        :param wkb: WKB二进制
+        :type wkb: bytes
+        :param resolution_list: 分辨率列表，为空则使用全部分辨率
+        :type resolution_list: list[int]
+        :return: key为分辨率，value为六边形编号
+        :rtype: dict{int:np.ndarray}
+        """
+        coords_list, closed_list = GeometryUtils.wkb_to_coords_list(wkb)
+        if resolution_list is None:
+            resolution_list = list(HexUtils.RESOLUTION_EDGE)
+        return {resolution: HexUtils.coords_list_to_cells(coords_list, closed_list, resolution)
+                for resolution in resolution_list}
+
+    # 计算格网距离为k的两个六边形内几何间距离的上界
+    @staticmethod
+    def max_distance_of_grid_distance(k, resolution):
+        """
+        计算分别与格网距离为k的两个六边形相交的两个几何之间距离的上界：中心距不超过k*√3*边长，每个几何到所在六边形中心不超过一个边长
+        :param k: 格网距离
+        :type k: int
+        :param resolution: 分辨率
+        :type resolution: int
+        :return: 距离上界（米）
+        :rtype: float
+        """
+        edge = HexUtils.RESOLUTION_EDGE[resolution]
+        return k * math.sqrt(3) * edge + 2 * edge
@@ -0,0 +1,262 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import datetime
+import json
+
+from utils.data_utils import DataUtils
+
+
+class ParameterHistoryStore:
+    """
+    工参历史版本库：每一期工参登记为一个版本，只保存相对上一版本新增、删除、修改的扇区（首个版本为全部扇区），
+    扇区几何和属性按哈希字典编码，内容相同的几何、属性只保存一次，不需要保留历史工参文件
+    任一版本的工参可由各扇区在该版本之前的最后一次变更还原；按唯一标识或小区号可查询扇区的变更时间线（如退网时间）
+    版本只能按工参日期、序号顺序追加
+    """
+
+    def __init__(self, conn):
+        """
+        :param conn: 数据库连接
+        :type conn: Connection
+        """
+        self.conn = conn
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 工参历史版本 (
+                版本号 INTEGER PRIMARY KEY AUTOINCREMENT, 图层名称 TEXT, 日期 TEXT, 序号 INTEGER, 内容哈希 TEXT,
+                扇区数量 INTEGER, 新增 INTEGER, 删除 INTEGER, 修改 INTEGER, 登记时间 TEXT)""")
+        cursor.execute("CREATE TABLE IF NOT EXISTS 工参历史几何 (几何哈希 TEXT PRIMARY KEY, WKB BLOB)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS 工参历史属性 (属性哈希 TEXT PRIMARY KEY, 属性 TEXT)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 工参历史变更 (
+                图层名称 TEXT, 唯一标识 TEXT, 版本号 INTEGER, 小区号 TEXT, 变更类型 TEXT, 几何哈希 TEXT, 属性哈希 TEXT,
+                PRIMARY KEY (图层名称, 唯一标识, 版本号))""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 工参历史变更_小区号 ON 工参历史变更 (小区号)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 工参历史变更_版本号 ON 工参历史变更 (图层名称, 版本号)")
+        conn.commit()
+
+    # 获取图层的版本列表
+    def get_version_list(self, layer_name):
+        """
+        获取图层的全部版本，按版本号升序排列
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :return: 每项的key为工参历史版本表的字段名
+        :rtype: list[dict]
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM 工参历史版本 WHERE 图层名称=? ORDER BY 版本号", (layer_name,))
+        column_names = [description[0] for description in cursor.description]
+        return [dict(zip(column_names, result)) for result in cursor.fetchall()]
+
+    # 获取某日期时在用的版本
+    def get_version_by_date(self, layer_name, date):
+        """
+        获取某日期时在用的版本，即工参日期不晚于该日期的最后一个版本
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :param date: 日期，形如‘20250519’
+        :type date: str
+        :return: 版本号，该日期前没有版本时为None
+        :rtype: int
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MAX(版本号) FROM 工参历史版本 WHERE 图层名称=? AND 日期<=?", (layer_name, date))
+        return cursor.fetchone()[0]
+
+    # 还原某版本的扇区状态
+    def get_state(self, layer_name, version=None):
+        """
+        还原某版本的扇区状态：每个扇区取该版本之前（含）的最后一次变更，最后一次为删除的扇区不在该版本中
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :param version: 版本号，为空则为最新版本
+        :type version: int
+        :return: key为唯一标识，value为(几何哈希, 属性哈希)
+        :rtype: dict{str:tuple}
+        """
+        cursor = self.conn.cursor()
+        # SQLite中与MAX()同时查询的其他列取自最大值所在的行
+        cursor.execute("""
+            SELECT 唯一标识, MAX(版本号), 变更类型, 几何哈希, 属性哈希 FROM 工参历史变更
+            WHERE 图层名称=? AND 版本号<=? GROUP BY 唯一标识""",
+                       (layer_name, version if version is not None else 2 ** 62))
+        return {result[0]: (result[3], result[4]) for result in cursor.fetchall() if result[2] != '删除'}
+
+    # 还原某版本的全部扇区
+    def reconstruct(self, layer_name, version=None):
+        """
+        还原某版本的全部扇区（几何和属性）
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :param version: 版本号，为空则为最新版本
+        :type version: int
+        :return: key为唯一标识，value为(几何WKB, 属性字典)
+        :rtype: dict{str:tuple[bytes, dict]}
+        """
+        state_dict = self.get_state(layer_name, version)
+        geometry_dict = self.get_dictionary('工参历史几何', 'WKB', {value[0] for value in state_dict.values()})
+        attribute_dict = self.get_dictionary('工参历史属性', '属性', {value[1] for value in state_dict.values()})
+        return {cgi: (geometry_dict.get(geometry_hash), json.loads(attribute_dict.get(attribute_hash) or '{}'))
+                for cgi, (geometry_hash, attribute_hash) in state_dict.items()}
+
+    def get_dictionary(self, table_name, value_column, hash_set):
+        """
+        按哈希批量读取几何或属性字典
+        :return: key为哈希，value为WKB或属性JSON
+        :rtype: dict
+        """
+        hash_column = '几何哈希' if table_name == '工参历史几何' else '属性哈希'
+        hash_list = list(hash_set)
+        result_dict = {}
+        cursor = self.conn.cursor()
+        for i in range(0, len(hash_list), 500):
+            chunk = hash_list[i:i + 500]
+            cursor.execute(f"SELECT {hash_column}, {value_column} FROM {table_name} "
+                           f"WHERE {hash_column} IN ({', '.join(['?'] * len(chunk))})", chunk)
+            result_dict.update(cursor.fetchall())
+        return result_dict
+
+    # 比较两个版本
+    def get_diff(self, layer_name, from_version, to_version=None):
+        """
+        比较两个版本，得到新增、删除、修改的扇区，例如上月的版本与最新版本比较
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :param from_version: 起始版本号
+        :type from_version: int
+        :param to_version: 结束版本号，为空则为最新版本
+        :type to_version: int
+        :return: 新增、删除、修改的唯一标识集合
+        :rtype: tuple[set, set, set]
+        """
+        from_state_dict = self.get_state(layer_name, from_version)
+        to_state_dict = self.get_state(layer_name, to_version)
+        added_cgi_set = to_state_dict.keys() - from_state_dict.keys()
+        removed_cgi_set = from_state_dict.keys() - to_state_dict.keys()
+        modified_cgi_set = {cgi for cgi in to_state_dict.keys() & from_state_dict.keys()
+                            if to_state_dict[cgi] != from_state_dict[cgi]}
+        return added_cgi_set, removed_cgi_set, modified_cgi_set
+
+    # 登记一期工参
+    def record_snapshot(self, layer_name, date, sequence, content_hash, sector_dict, load_sector):
+        """
+        登记一期工参：与最新版本的扇区状态比较，只保存新增、删除、修改的扇区，变化扇区的几何和属性写入字典
+        内容哈希与最新版本相同，或工参日期、序号不晚于最新版本时不登记
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :param date: 工参日期
+        :type date: str
+        :param sequence: 工参序号（时分）
+        :type sequence: int
+        :param content_hash: 工参文件内容哈希
+        :type content_hash: str
+        :param sector_dict: 该期工参的扇区，key为唯一标识，value为(几何哈希, 属性哈希)
+        :type sector_dict: dict{str:tuple}
+        :param load_sector: 读取单个扇区几何WKB和属性字典的函数，参数为唯一标识，仅对变化的扇区调用
+        :type load_sector: function
+        :return: (版本号, 新增数, 删除数, 修改数)，未登记时为None
+        :rtype: tuple
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 日期, 序号, 内容哈希 FROM 工参历史版本 WHERE 图层名称=? ORDER BY 版本号 DESC LIMIT 1",
+                       (layer_name,))
+        latest = cursor.fetchone()
+        if latest and (latest[2] == content_hash or (latest[0], latest[1]) >= (date, sequence)):
+            return None
+        state_dict = self.get_state(layer_name)
+        added_cgi_list = [cgi for cgi in sector_dict if cgi not in state_dict]
+        removed_cgi_list = [cgi for cgi in state_dict if cgi not in sector_dict]
+        modified_cgi_list = [cgi for cgi in sector_dict if cgi in state_dict and sector_dict[cgi] != state_dict[cgi]]
+
+        geometry_row_list = []
+        attribute_row_list = []
+        for cgi in added_cgi_list + modified_cgi_list:
+            wkb, attribute_dict = load_sector(cgi)
+            geometry_row_list.append((sector_dict[cgi][0], wkb))
+            attribute_row_list.append((sector_dict[cgi][1], json.dumps(attribute_dict, ensure_ascii=False, default=str)))
+        try:
+            cursor.execute("INSERT INTO 工参历史版本 (图层名称, 日期, 序号, 内容哈希, 扇区数量, 新增, 删除, 修改, 登记时间) "
+                           "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           (layer_name, date, sequence, content_hash, len(sector_dict), len(added_cgi_list),
+                            len(removed_cgi_list), len(modified_cgi_list),
+                            datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            version = cursor.lastrowid
+            cursor.executemany("INSERT OR IGNORE INTO 工参历史几何 VALUES (?, ?)", geometry_row_list)
+            cursor.executemany("INSERT OR IGNORE INTO 工参历史属性 VALUES (?, ?)", attribute_row_list)
+            change_row_list = []
+            for change_type, cgi_list in (('新增', added_cgi_list), ('修改', modified_cgi_list)):
+                change_row_list.extend((layer_name, cgi, version, DataUtils.cgi_remove_plmn(str(cgi)), change_type)
+                                       + tuple(sector_dict[cgi]) for cgi in cgi_list)
+            change_row_list.extend((layer_name, cgi, version, DataUtils.cgi_remove_plmn(str(cgi)), '删除', None, None)
+                                   for cgi in removed_cgi_list)
+            cursor.executemany("INSERT INTO 工参历史变更 VALUES (?, ?, ?, ?, ?, ?, ?)", change_row_list)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return version, len(added_cgi_list), len(removed_cgi_list), len(modified_cgi_list)
+
+    # 查询扇区的变更时间线
+    def get_timeline(self, cgi):
+        """
+        查询扇区的变更时间线，CGI的PLMN不同时按小区号匹配
+        :param cgi: CGI或小区号
+        :type cgi: str
+        :return: 按版本先后排列，每项包括图层名称、唯一标识、版本号、日期、序号、变更类型和属性字典
+        :rtype: list[dict]
+        """
+        cell_id = DataUtils.cgi_remove_plmn(str(cgi)) or str(cgi)
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT c.图层名称, c.唯一标识, c.版本号, v.日期, v.序号, c.变更类型, a.属性 FROM 工参历史变更 c
+            JOIN 工参历史版本 v ON v.版本号=c.版本号 LEFT JOIN 工参历史属性 a ON a.属性哈希=c.属性哈希
+            WHERE c.小区号=? ORDER BY c.版本号""", (cell_id,))
+        return [{'图层名称': result[0], '唯一标识': result[1], '版本号': result[2], '日期': result[3], '序号': result[4],
+                 '变更类型': result[5], '属性': json.loads(result[6]) if result[6] else {}}
+                for result in cursor.fetchall()]
+
+    # 查询一组小区的退网日期
+    def get_removed_date_dict(self, cgi_list):
+        """
+        查询一组小区的退网日期：按小区号匹配，最后一次变更为删除的小区，其删除所在版本的工参日期即为退网日期
+        :param cgi_list: CGI列表
+        :type cgi_list: list[str]
+        :return: key为CGI，value为退网日期；仍在网或无历史记录的小区不在结果中
+        :rtype: dict{str:str}
+        """
+        cell_id_dict = {DataUtils.cgi_remove_plmn(str(cgi)) or str(cgi): cgi for cgi in cgi_list}
+        cell_id_list = list(cell_id_dict)
+        last_change_dict = {}
+        cursor = self.conn.cursor()
+        for i in range(0, len(cell_id_list), 500):
+            chunk = cell_id_list[i:i + 500]
+            cursor.execute(f"""
+                SELECT c.小区号, c.变更类型, v.日期 FROM 工参历史变更 c JOIN 工参历史版本 v ON v.版本号=c.版本号
+                WHERE c.小区号 IN ({', '.join(['?'] * len(chunk))}) ORDER BY c.版本号""", chunk)
+            for cell_id, change_type, date in cursor.fetchall():
+                last_change_dict[cell_id] = (change_type, date)
+        return {cell_id_dict[cell_id]: date for cell_id, (change_type, date) in last_change_dict.items()
+                if change_type == '删除'}
@@ -0,0 +1,296 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import csv
+import math
+import os
+import time
+
+from utils.data_utils import DataUtils
+from utils.sqlite_utils import PROJECT_GEOMETRY_COLUMNS
+
+# openpyxl为可选依赖，未安装时仅支持CSV导入
+try:
+    import openpyxl
+
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    openpyxl = None
+    OPENPYXL_AVAILABLE = False
+
+# 可导入的明细表及其业务主键（同一基站、小区可归属多个项目，因此以所属项目区分）
+IMPORT_TABLE_DEFINITIONS = {
+    '项目明细': ('项目名称',),
+    '基站明细': ('基站号', '项目名称'),
+    '小区明细': ('CGI', '项目名称'),
+}
+
+
+class ImportUtils:
+    """
+    工参和项目清单的批量导入：流式读取CSV/XLSX，按业务主键与现有数据比对，
+    在单个事务中以executemany分批新增、修改（可选删除），导入期间暂时删除目标表中触发器不使用的索引，导入完成后重建
+    """
+
+    # 流式读取CSV/XLSX文件，逐行返回
+    @staticmethod
+    def read_rows(file_path):
+        """
+        流式读取CSV/XLSX文件，第一行为表头，逐行返回（CSV依次尝试utf-8和gbk编码）
+        :param file_path: 文件路径
+        :type file_path: str
+        :return: 逐行返回的单元格列表
+        :rtype: generator[list]
+        """
+        if os.path.splitext(file_path)[1].lower() in ('.xlsx', '.xlsm'):
+            if not OPENPYXL_AVAILABLE:
+                raise RuntimeError("未安装openpyxl，无法导入xlsx文件，请另存为CSV后导入")
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                for row in workbook.worksheets[0].iter_rows(values_only=True):
+                    yield ['' if value is None else value for value in row]
+            finally:
+                workbook.close()
+            return
+        encoding = 'utf-8-sig'
+        with open(file_path, 'rb') as f:
+            head = f.read(1 << 16)
+        try:
+            head.decode('utf-8-sig')
+        except UnicodeDecodeError as e:
+            # 读取截断处可能切开多字节字符，仅在此之前出现的解码错误才判定为gbk
+            if e.start < len(head) - 3:
+                encoding = 'gbk'
+        with open(file_path, 'r', encoding=encoding, newline='') as f:
+            yield from csv.reader(f)
+
+    # 根据表头判断导入的目标表
+    @staticmethod
+    def guess_table_name(header):
+        """
+        根据表头判断导入的目标表
+        :param header: 表头
+        :type header: list[str]
+        :return: 目标表名，无法判断返回空字符串
+        :rtype: str
+        """
+        header = [str(column).strip() for column in header]
+        if 'CGI' in header:
+            return '小区明细'
+        if '基站号' in header and '基站名' in header:
+            return '基站明细'
+        if '项目名称' in header and '项目场景' in header:
+            return '项目明细'
+        return ''
+
+    # 统一数值和文本的比较形式
+    @staticmethod
+    def normalize_value(value):
+        """
+        统一数值和文本的比较形式（文件中读出的'117.0'与数据库中的117视为相同）
+        :param value: 单元格或数据库中的值
+        :type value: object
+        :return: 用于比较的文本
+        :rtype: str
+        """
+        if value is None:
+            return ''
+        text = str(value).strip()
+        try:
+            number = float(text)
+        except ValueError:
+            return text
+        if math.isfinite(number):
+            return repr(int(number)) if number.is_integer() else repr(number)
+        return text
+
+    # 校验一行数据
+    @staticmethod
+    def validate_row(table_name, row_dict):
+        """
+        校验一行数据：业务主键不能为空，CGI需符合MCC-MNC-基站号-小区号格式
+        :param table_name: 目标表名
+        :type table_name: str
+        :param row_dict: key为字段名，value为值
+        :type row_dict: dict
+        :return: 错误原因，合法时返回空字符串
+        :rtype: str
+        """
+        for key_column in IMPORT_TABLE_DEFINITIONS[table_name]:
+            if row_dict.get(key_column, '') in ('', None):
+                return f"{key_column}为空"
+        if 'CGI' in row_dict and not DataUtils.cgi_is_valid(str(row_dict['CGI']).strip()):
+            return f"CGI格式错误：{row_dict['CGI']}"
+        return ''
+
+    # 判断索引是否可能被触发器使用
+    @staticmethod
+    def index_used_by_trigger(cursor, index_name, trigger_sql_list):
+        """
+        判断索引是否可能被触发器中对目标表的查询使用：索引的全部列均出现在某个引用目标表的触发器中时视为被使用（按文本保守判断）
+        :param cursor: 数据库游标
+        :type cursor: Cursor
+        :param index_name: 索引名称
+        :type index_name: str
+        :param trigger_sql_list: 引用目标表的触发器SQL
+        :type trigger_sql_list: list[str]
+        :return: 是否可能被触发器使用
+        :rtype: bool
+        """
+        cursor.execute(f'PRAGMA index_info("{index_name}")')
+        column_list = [result[2] for result in cursor.fetchall() if result[2]]
+        return bool(column_list) and any(all(column in trigger_sql for column in column_list)
+                                         for trigger_sql in trigger_sql_list)
+
+    # 批量导入工参或项目清单
+    @staticmethod
+    def import_table(conn, file_path, table_name='', remove_missing=False, batch_size=5000):
+        """
+        批量导入工参或项目清单：流式读取文件，按业务主键与现有数据比对，在单个事务中分批新增、修改，
+        remove_missing为True时删除文件中不存在的行（文件为该表的全量清单时使用）
+        导入期间暂时删除目标表中触发器不使用的索引，导入完成后重建；触发器维护的汇总表、检索表随导入同步更新
+        :param conn: 数据库连接（建议使用异步访问层的写连接）
+        :type conn: Connection
+        :param file_path: CSV/XLSX文件路径，第一行为表头，表头需包含目标表的字段名
+        :type file_path: str
+        :param table_name: 目标表名，为空则根据表头判断
+        :type table_name: str
+        :param remove_missing: 是否删除文件中不存在的行
+        :type remove_missing: bool
+        :param batch_size: 每批executemany的行数
+        :type batch_size: int
+        :return: 导入报告，包括表名、读取行数、新增、修改、删除、未变化、文件中不存在、无效行、耗时和每秒行数
+        :rtype: dict
+        """
+        start_time = time.perf_counter()
+        row_iter = ImportUtils.read_rows(file_path)
+        header = [str(column).strip() for column in next(row_iter, [])]
+        if not table_name:
+            table_name = ImportUtils.guess_table_name(header)
+        if table_name not in IMPORT_TABLE_DEFINITIONS:
+            raise ValueError("无法根据表头判断导入的目标表，表头需包含项目明细、基站明细或小区明细的字段名")
+
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        table_column_list = [row[1] for row in cursor.fetchall()]
+        # 序号由导入自动编号，WKB及外包框由程序根据WKT回填，不从文件导入
+        import_column_list = [column for column in table_column_list
+                              if column != '序号' and column not in PROJECT_GEOMETRY_COLUMNS and column in header]
+        key_column_list = IMPORT_TABLE_DEFINITIONS[table_name]
+        missing_key_column_list = [column for column in key_column_list if column not in import_column_list]
+        if missing_key_column_list:
+            raise ValueError(f"表头缺少{table_name}的关键字段：{'、'.join(missing_key_column_list)}")
+        header_index_list = [header.index(column) for column in import_column_list]
+        key_index_list = [import_column_list.index(column) for column in key_column_list]
+
+        # 现有数据，key为业务主键，value为(rowid, 比较用的值)
+        cursor.execute(f"SELECT rowid, {', '.join(import_column_list)} FROM {table_name}")
+        existing_dict = {}
+        for row in cursor.fetchall():
+            normalized_row = tuple(ImportUtils.normalize_value(value) for value in row[1:])
+            existing_dict.setdefault(tuple(normalized_row[index] for index in key_index_list), (row[0], normalized_row))
+
+        report = {'表名': table_name, '读取行数': 0, '新增': 0, '修改': 0, '删除': 0, '未变化': 0, '文件中不存在': 0,
+                  '无效行': []}
+        # 表中有序号列时，新增行按现有最大序号顺延编号
+        insert_column_list = import_column_list + (['序号'] if '序号' in table_column_list else [])
+        insert_sql = f"INSERT INTO {table_name} ({', '.join(insert_column_list)}) VALUES ({', '.join('?' * len(insert_column_list))})"
+        update_sql = f"UPDATE {table_name} SET {', '.join(f'{column}=?' for column in import_column_list)} WHERE rowid=?"
+        next_serial = None
+        if '序号' in table_column_list:
+            cursor.execute(f"SELECT MAX(序号) FROM {table_name}")
+            next_serial = int(cursor.fetchone()[0] or 0) + 1
+
+        # 单个事务内完成导入，暂时删除目标表的索引；触发器中查询目标表所用的索引（例如汇总表按(CGI, 项目名称)去重计数）需保留，
+        # 否则每插入一行触发器都要全表扫描，导入退化为平方复杂度
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+                       (table_name,))
+        index_list = cursor.fetchall()
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type='trigger' AND sql LIKE ?", (f'%{table_name}%',))
+        trigger_sql_list = [result[0] for result in cursor.fetchall()]
+        index_list = [(index_name, index_sql) for index_name, index_sql in index_list
+                      if not ImportUtils.index_used_by_trigger(cursor, index_name, trigger_sql_list)]
+        cursor.execute("BEGIN")
+        try:
+            for index_name, _ in index_list:
+                cursor.execute(f'DROP INDEX "{index_name}"')
+            seen_key_set = set()
+            insert_batch = []
+            update_batch = []
+            for line_number, row in enumerate(row_iter, start=2):
+                if not any(str(value).strip() for value in row):
+                    continue
+                report['读取行数'] += 1
+                value_list = [row[index] if index < len(row) else '' for index in header_index_list]
+                value_list = [value.strip() if isinstance(value, str) else value for value in value_list]
+                error = ImportUtils.validate_row(table_name, dict(zip(import_column_list, value_list)))
+                normalized_row = tuple(ImportUtils.normalize_value(value) for value in value_list)
+                key = tuple(normalized_row[index] for index in key_index_list)
+                if not error and key in seen_key_set:
+                    error = f"与前文重复：{'、'.join(key)}"
+                if error:
+                    report['无效行'].append((line_number, error))
+                    continue
+                seen_key_set.add(key)
+                value_list = [None if value == '' else value for value in value_list]
+                existing = existing_dict.get(key)
+                if existing is None:
+                    if next_serial is not None:
+                        value_list.append(next_serial)
+                        next_serial += 1
+                    insert_batch.append(value_list)
+                    report['新增'] += 1
+                elif existing[1] != normalized_row:
+                    update_batch.append(value_list + [existing[0]])
+                    report['修改'] += 1
+                else:
+                    report['未变化'] += 1
+                if len(insert_batch) >= batch_size:
+                    cursor.executemany(insert_sql, insert_batch)
+                    insert_batch = []
+                if len(update_batch) >= batch_size:
+                    cursor.executemany(update_sql, update_batch)
+                    update_batch = []
+            if insert_batch:
+                cursor.executemany(insert_sql, insert_batch)
+            if update_batch:
+                cursor.executemany(update_sql, update_batch)
+
+            removed_rowid_list = [(rowid,) for key, (rowid, _) in existing_dict.items() if key not in seen_key_set]
+            report['文件中不存在'] = len(removed_rowid_list)
+            if remove_missing:
+                cursor.executemany(f"DELETE FROM {table_name} WHERE rowid=?", removed_rowid_list)
+                report['删除'] = len(removed_rowid_list)
+
+            for _, index_sql in index_list:
+                cursor.execute(index_sql)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        report['耗时'] = time.perf_counter() - start_time
+        report['行每秒'] = report['读取行数'] / report['耗时'] if report['耗时'] > 0 else 0.0
+        return report
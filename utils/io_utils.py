@@ -21,23 +21,34 @@
  along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import datetime
+import hashlib
 import os
 import re
+import struct
+import time
 
 from cryptography.fernet import Fernet
 
+from utils.sqlite_utils import SqliteUtils
+
 
 class IOUtils:
     # 用于搜索工参文件夹中最新的一个工参
     @staticmethod
-    def find_latest_para_file(prefix):
+    def find_latest_para_file(prefix, conn=None):
         """
-        用于搜索工参文件夹中最新的一个工参
+        用于搜索工参文件夹中最新的一个工参，传入conn时直接查询工参快照目录，不扫描文件夹
         :param prefix: 前缀，例如‘宏站扇区图层’
         :type prefix: str
+        :param conn: 数据库连接，工参快照目录需已通过update_parameter_catalog登记
+        :type conn: Connection
         :return:最新日期的文件对应路径
         :rtype:str
         """
+        if conn is not None:
+            snapshot = SqliteUtils.get_parameter_snapshot(conn, prefix)
+            return (snapshot['路径'], snapshot['日期']) if snapshot else (None, None)
         find_dir = 'resources/layer'  # Linux/macOS 根目录，Windows 需改为 'C:\\' 等
         pattern = r'^' + prefix + r'(\d{8})_(\d{0,4}).shp$'
         max_number = -1
@@ -59,6 +70,92 @@ class IOUtils:
 
         return latest_file, latest_date
 
+    # 增量更新工参快照目录
+    @staticmethod
+    def update_parameter_catalog(conn, find_dir='resources/layer', settle_seconds=0):
+        """
+        增量更新工参快照目录：仅对新增或大小、修改时间变化的工参文件读取dbf文件头中的要素数量并计算内容哈希，
+        文件夹中已不存在的工参文件从目录中删除；最近settle_seconds秒内仍有修改的文件视为正在复制，暂不计算哈希
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param find_dir: 工参文件夹
+        :type find_dir: str
+        :param settle_seconds: 文件最后修改后需稳定的秒数，为0时不等待
+        :type settle_seconds: float
+        :return: (新增或变化的快照数, 删除的快照数, 正在复制暂未登记的文件数)
+        :rtype: tuple[int, int, int]
+        """
+        SqliteUtils.create_parameter_catalog_table(conn)
+        stat_dict = SqliteUtils.get_parameter_catalog_stat_dict(conn)
+        snapshot_list = []
+        path_set = set()
+        pending_count = 0
+        try:
+            entry_list = list(os.scandir(find_dir))
+        except (FileNotFoundError, PermissionError):
+            print(f"无法访问 {find_dir}")
+            entry_list = []
+        for entry in entry_list:
+            match = re.match(r'^(.+?)(\d{8})_(\d{0,4})\.shp$', entry.name)
+            if not match or not entry.is_file():
+                continue
+            path = entry.path
+            part_path_list = [os.path.splitext(path)[0] + extension for extension in ('.shp', '.shx', '.dbf')]
+            if not all(os.path.exists(part_path) for part_path in part_path_list):
+                continue
+            path_set.add(path)
+            file_size = sum(os.path.getsize(part_path) for part_path in part_path_list)
+            modified_time = max(os.stat(part_path).st_mtime_ns for part_path in part_path_list)
+            if stat_dict.get(path) == (file_size, modified_time):
+                continue
+            if settle_seconds and time.time_ns() - modified_time < settle_seconds * 1e9:
+                pending_count += 1
+                continue
+            snapshot_list.append((path, match.group(1), match.group(2), int(match.group(3) or 0), file_size, modified_time,
+                                  IOUtils.read_dbf_record_count(part_path_list[2]),
+                                  IOUtils.get_file_list_hash(part_path_list),
+                                  datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        removed_path_list = [path for path in stat_dict if path not in path_set]
+        if snapshot_list or removed_path_list:
+            SqliteUtils.update_parameter_catalog(conn, snapshot_list, removed_path_list)
+        return len(snapshot_list), len(removed_path_list), pending_count
+
+    # 读取dbf文件头中的记录数
+    @staticmethod
+    def read_dbf_record_count(dbf_path):
+        """
+        读取dbf文件头中的记录数（即shp的要素数量），无需打开图层
+        :param dbf_path: dbf文件路径
+        :type dbf_path: str
+        :return: 记录数，读取失败时为-1
+        :rtype: int
+        """
+        try:
+            with open(dbf_path, 'rb') as f:
+                header = f.read(8)
+        except OSError:
+            return -1
+        return struct.unpack('<I', header[4:8])[0] if len(header) == 8 else -1
+
+    # 计算一组文件的内容哈希
+    @staticmethod
+    def get_file_list_hash(path_list, chunk_size=1 << 20):
+        """
+        按顺序分块读取一组文件，计算整体的sha1内容哈希
+        :param path_list: 文件路径列表
+        :type path_list: list[str]
+        :param chunk_size: 每次读取的字节数
+        :type chunk_size: int
+        :return: 内容哈希
+        :rtype: str
+        """
+        sha1 = hashlib.sha1()
+        for path in path_list:
+            with open(path, 'rb') as f:
+                while chunk := f.read(chunk_size):
+                    sha1.update(chunk)
+        return sha1.hexdigest()
+
     @staticmethod
     def docxtpl_docx_output_handler(docxtpl_instance, docx_template_render_context,output_path,output_filename):
         try:
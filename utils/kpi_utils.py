@@ -0,0 +1,487 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import datetime
+import itertools
+import re
+import time
+
+import numpy as np
+
+from utils.data_utils import DataUtils
+from utils.import_utils import ImportUtils
+
+# 小区KPI指标，小时数据按此顺序保存
+KPI_COLUMNS = ('PRB利用率', 'RRC用户数', '吞吐量')
+# KPI文件中可识别的列名（不区分大小写），依次匹配
+KPI_FIELD_ALIASES = {
+    '时间': ('时间', '开始时间', '日期', '统计时间', 'time', 'date', 'start time', 'starttime'),
+    '小时': ('小时', 'hour'),
+    'CGI': ('cgi', 'ecgi', 'ncgi', '小区cgi', '唯一标识'),
+    'PRB利用率': ('prb利用率', '下行prb利用率', '下行prb平均利用率', 'dl prb利用率', 'dl prb utilization', 'prb'),
+    'RRC用户数': ('rrc用户数', 'rrc连接用户数', '平均rrc连接用户数', '最大rrc连接用户数', 'rrc connected users', 'rrc'),
+    '吞吐量': ('吞吐量', '下行吞吐量', '下行平均吞吐量', '小区下行吞吐量', 'dl throughput', 'throughput'),
+}
+# 时间文本的格式，依次尝试
+KPI_TIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y/%m/%d %H:%M:%S', '%Y/%m/%d %H:%M', '%Y-%m-%d',
+                    '%Y/%m/%d', '%Y%m%d%H', '%Y%m%d')
+# 忙时PRB利用率高负荷门限（%）
+KPI_HIGH_LOAD_PRB = 70.0
+
+
+class KpiUtils:
+    """
+    小区KPI时序库：导入小时或天粒度的小区KPI（PRB利用率、RRC用户数、吞吐量），CGI字典编码为整数小区编号，
+    小时数据按(小区编号, 日期)分区，每个小区每天一行，24小时×3个指标以float32数组保存为BLOB；
+    导入时同步预汇聚为天（忙时及忙时指标）和周（忙时指标的均值、最大值）两级汇总，
+    忙时负荷查询只读取天或周汇总表，三张表均以(小区编号, 日期/周)为主键的WITHOUT ROWID表保存
+    """
+
+    # 建立小区KPI表
+    @staticmethod
+    def create_kpi_tables(conn):
+        """
+        建立小区KPI的小区字典、小时数据、天汇总和周汇总表，该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS 小区KPI小区 (小区编号 INTEGER PRIMARY KEY, CGI TEXT UNIQUE, 小区号 TEXT)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 小区KPI小区_小区号 ON 小区KPI小区 (小区号)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 小区KPI小时 (
+                小区编号 INTEGER, 日期 INTEGER, 小时数据 BLOB, PRIMARY KEY (小区编号, 日期)) WITHOUT ROWID""")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 小区KPI日 (
+                小区编号 INTEGER, 日期 INTEGER, 周 INTEGER, 忙时 INTEGER, 忙时PRB利用率 REAL, 忙时RRC用户数 REAL,
+                忙时吞吐量 REAL, 平均PRB利用率 REAL, 最大RRC用户数 REAL, 小时数 INTEGER,
+                PRIMARY KEY (小区编号, 日期)) WITHOUT ROWID""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 小区KPI日_周 ON 小区KPI日 (周)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 小区KPI周 (
+                小区编号 INTEGER, 周 INTEGER, 天数 INTEGER, 平均忙时PRB利用率 REAL, 最大忙时PRB利用率 REAL,
+                平均忙时RRC用户数 REAL, 最大忙时RRC用户数 REAL, 平均忙时吞吐量 REAL,
+                PRIMARY KEY (小区编号, 周)) WITHOUT ROWID""")
+        conn.commit()
+
+    # 根据表头识别KPI列
+    @staticmethod
+    def get_column_index_dict(header):
+        """
+        根据表头识别时间、小时、CGI和各KPI所在的列
+        :param header: 表头
+        :type header: list[str]
+        :return: key为标准列名，value为列序号，未识别的列不在结果中
+        :rtype: dict{str:int}
+        """
+        normalized_header = [str(column).strip().lower() for column in header]
+        column_index_dict = {}
+        for column_name, alias_tuple in KPI_FIELD_ALIASES.items():
+            for alias in alias_tuple:
+                if alias in normalized_header:
+                    column_index_dict[column_name] = normalized_header.index(alias)
+                    break
+        return column_index_dict
+
+    # 判断时间值是否包含时刻
+    @staticmethod
+    def has_time_part(value):
+        """
+        判断时间值是否包含时刻（用于识别小时粒度的文件）
+        :param value: 单元格的值
+        :type value: object
+        :return: 是否包含时刻
+        :rtype: bool
+        """
+        if isinstance(value, datetime.datetime):
+            return (value.hour, value.minute) != (0, 0)
+        text = str(value).strip()
+        return ':' in text or len(re.sub(r'\D', '', text.split('.')[0])) >= 10
+
+    # 解析时间值
+    @staticmethod
+    def parse_time(value):
+        """
+        解析时间值，支持datetime对象及KPI_TIME_FORMATS中的文本格式
+        :param value: 单元格的值
+        :type value: object
+        :return: (日期, 小时)，日期形如20250519，无法解析时返回None
+        :rtype: tuple[int, int]
+        """
+        if isinstance(value, datetime.datetime):
+            return value.year * 10000 + value.month * 100 + value.day, value.hour
+        if isinstance(value, datetime.date):
+            return value.year * 10000 + value.month * 100 + value.day, 0
+        text = str(value).strip()
+        # 表格中的数值型时间（如2025051908.0）去掉小数部分
+        if re.fullmatch(r'\d+\.0+', text):
+            text = text.split('.')[0]
+        for time_format in KPI_TIME_FORMATS:
+            try:
+                parsed = datetime.datetime.strptime(text, time_format)
+            except ValueError:
+                continue
+            return parsed.year * 10000 + parsed.month * 100 + parsed.day, parsed.hour
+        return None
+
+    @staticmethod
+    def to_float(value):
+        """
+        将单元格转换为浮点数，空值或无法转换（如'-'、'NIL'）的为nan，百分号文本按百分数处理
+        """
+        try:
+            return float(str(value).strip().rstrip('%'))
+        except ValueError:
+            return float('nan')
+
+    # 获取日期所在周的周一
+    @staticmethod
+    def get_week(date):
+        """
+        获取日期所在周的周一，作为周汇总的键
+        :param date: 日期，形如20250519
+        :type date: int
+        :return: 周一的日期，形如20250519
+        :rtype: int
+        """
+        day = datetime.date(date // 10000, date // 100 % 100, date % 100)
+        monday = day - datetime.timedelta(days=day.weekday())
+        return monday.year * 10000 + monday.month * 100 + monday.day
+
+    # 导入小区KPI文件
+    @staticmethod
+    def import_kpi(conn, file_path, flush_size=50000):
+        """
+        流式导入小区KPI文件（CSV/XLSX，每行为一个小区一个小时或一天），与库中同一小区同一天的数据逐小时合并，
+        并重新汇聚受影响的天和周；表头含小时列，或时间值含时刻时按小时粒度导入，否则按天粒度导入
+        （天粒度数据只写入天汇总表，同一天已有小时数据时以小时数据为准）
+        :param conn: 数据库连接（建议使用异步访问层的写连接）
+        :type conn: Connection
+        :param file_path: CSV/XLSX文件路径，表头需包含时间、CGI及至少一个KPI（PRB利用率%、RRC用户数、吞吐量Mbps）
+        :type file_path: str
+        :param flush_size: 缓存的小区天数达到该值时写入数据库
+        :type flush_size: int
+        :return: 导入报告，包括粒度、读取行数、有效行数、无效行数、小区数、天数、周数、耗时和每秒行数
+        :rtype: dict
+        """
+        start_time = time.perf_counter()
+        KpiUtils.create_kpi_tables(conn)
+        row_iter = ImportUtils.read_rows(file_path)
+        column_index_dict = KpiUtils.get_column_index_dict(next(row_iter, []))
+        if '时间' not in column_index_dict or 'CGI' not in column_index_dict:
+            raise ValueError("表头缺少小区KPI的关键字段：时间、CGI")
+        kpi_index_list = [column_index_dict.get(column_name) for column_name in KPI_COLUMNS]
+        if all(index is None for index in kpi_index_list):
+            raise ValueError(f"表头缺少小区KPI指标，至少需要{'、'.join(KPI_COLUMNS)}中的一项")
+        time_index = column_index_dict['时间']
+        hour_index = column_index_dict.get('小时')
+        cgi_index = column_index_dict['CGI']
+
+        # 根据文件开头的若干行判断粒度
+        head_row_list = list(itertools.islice(row_iter, 2000))
+        hourly = hour_index is not None or any(
+            KpiUtils.has_time_part(row[time_index]) for row in head_row_list if len(row) > time_index)
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT CGI, 小区编号 FROM 小区KPI小区")
+        cell_code_dict = dict(cursor.fetchall())
+        time_cache = {}
+        # 小时数据缓存，key为(小区编号, 日期)，value为24×3个值的列表；天粒度数据缓存，value为3个值的列表
+        hour_buffer = {}
+        day_buffer = {}
+        report = {'粒度': '小时' if hourly else '天', '读取行数': 0, '有效行数': 0, '无效行数': 0}
+        cell_code_set = set()
+        date_set = set()
+        week_set = set()
+        nan = float('nan')
+        for row in itertools.chain(head_row_list, row_iter):
+            if not any(str(value).strip() for value in row):
+                continue
+            report['读取行数'] += 1
+            time_value = row[time_index] if time_index < len(row) else ''
+            parsed_time = time_cache.get(time_value) if isinstance(time_value, (str, datetime.date)) else None
+            if parsed_time is None:
+                parsed_time = KpiUtils.parse_time(time_value)
+                if isinstance(time_value, (str, datetime.date)):
+                    time_cache[time_value] = parsed_time
+            cgi = str(row[cgi_index]).strip() if cgi_index < len(row) else ''
+            value_list = [KpiUtils.to_float(row[index]) if index is not None and index < len(row) else nan
+                          for index in kpi_index_list]
+            if not parsed_time or not cgi or all(value != value for value in value_list):
+                report['无效行数'] += 1
+                continue
+            date, hour = parsed_time
+            if hour_index is not None:
+                try:
+                    hour = int(float(row[hour_index]))
+                except (TypeError, ValueError, IndexError):
+                    hour = -1
+                if not 0 <= hour <= 23:
+                    report['无效行数'] += 1
+                    continue
+            report['有效行数'] += 1
+            cell_code = cell_code_dict.get(cgi)
+            if cell_code is None:
+                cursor.execute("INSERT INTO 小区KPI小区 (CGI, 小区号) VALUES (?, ?)", (cgi, DataUtils.cgi_remove_plmn(cgi)))
+                cell_code = cell_code_dict[cgi] = cursor.lastrowid
+            cell_code_set.add(cell_code)
+            date_set.add(date)
+            if hourly:
+                hour_value_list = hour_buffer.get((cell_code, date))
+                if hour_value_list is None:
+                    hour_value_list = hour_buffer[(cell_code, date)] = [nan] * (24 * len(KPI_COLUMNS))
+                offset = hour * len(KPI_COLUMNS)
+            else:
+                hour_value_list = day_buffer.get((cell_code, date))
+                if hour_value_list is None:
+                    hour_value_list = day_buffer[(cell_code, date)] = [nan] * len(KPI_COLUMNS)
+                offset = 0
+            for i, value in enumerate(value_list):
+                if value == value:
+                    hour_value_list[offset + i] = value
+            if len(hour_buffer) + len(day_buffer) >= flush_size:
+                week_set.update(KpiUtils.flush_hour_buffer(cursor, hour_buffer))
+                week_set.update(KpiUtils.flush_day_buffer(cursor, day_buffer))
+                hour_buffer, day_buffer = {}, {}
+        week_set.update(KpiUtils.flush_hour_buffer(cursor, hour_buffer))
+        week_set.update(KpiUtils.flush_day_buffer(cursor, day_buffer))
+        KpiUtils.rollup_week(cursor, week_set)
+        conn.commit()
+
+        report.update({'小区数': len(cell_code_set), '天数': len(date_set), '周数': len(week_set)})
+        report['耗时'] = time.perf_counter() - start_time
+        report['行每秒'] = report['读取行数'] / report['耗时'] if report['耗时'] > 0 else 0.0
+        return report
+
+    # 按(小区编号, 日期)主键批量读取已有数据
+    @staticmethod
+    def select_by_key(cursor, table_name, column_list, key_list, chunk_size=400):
+        """
+        按(小区编号, 日期)主键批量读取已有数据，每块键以VALUES常量表与数据表按主键连接，逐键走主键查找，避免按日期全表扫描
+        :param cursor: 数据库游标
+        :type cursor: Cursor
+        :param table_name: 表名（小区KPI小时或小区KPI日）
+        :type table_name: str
+        :param column_list: 需读取的列
+        :type column_list: list[str]
+        :param key_list: (小区编号, 日期)列表
+        :type key_list: list[tuple]
+        :param chunk_size: 每块键数量，每个键占用2个绑定参数
+        :type chunk_size: int
+        :return: 库中已存在的行，每行为小区编号、日期及需读取的列
+        :rtype: list[tuple]
+        """
+        row_list = []
+        column_text = ''.join(f', t.{column}' for column in column_list)
+        for i in range(0, len(key_list), chunk_size):
+            chunk = key_list[i:i + chunk_size]
+            cursor.execute(f"""
+                SELECT t.小区编号, t.日期{column_text} FROM (VALUES {', '.join(['(?, ?)'] * len(chunk))}) AS k
+                JOIN {table_name} AS t ON t.小区编号=k.column1 AND t.日期=k.column2""",
+                           [value for key in chunk for value in key])
+            row_list.extend(cursor.fetchall())
+        return row_list
+
+    # 将小时数据缓存与库中数据合并后写入，并汇聚为天
+    @staticmethod
+    def flush_hour_buffer(cursor, hour_buffer):
+        """
+        将小时数据缓存与库中同一小区同一天的数据逐小时合并（新数据优先），写入小时数据表并重新汇聚天汇总
+        :param cursor: 数据库游标
+        :type cursor: Cursor
+        :param hour_buffer: key为(小区编号, 日期)，value为24×3个值的列表
+        :type hour_buffer: dict{tuple:list}
+        :return: 受影响的周
+        :rtype: set[int]
+        """
+        if not hour_buffer:
+            return set()
+        key_list = list(hour_buffer)
+        hour_array = np.asarray([hour_buffer[key] for key in key_list], dtype=np.float32).reshape(
+            len(key_list), 24, len(KPI_COLUMNS))
+        # 按(小区编号, 日期)主键读取库中已有的小时数据
+        key_index_dict = {key: i for i, key in enumerate(key_list)}
+        for cell_code, date, hour_data in KpiUtils.select_by_key(cursor, '小区KPI小时', ['小时数据'], key_list):
+            index = key_index_dict[(cell_code, date)]
+            existing = np.frombuffer(hour_data, dtype=np.float32).reshape(24, len(KPI_COLUMNS))
+            hour_array[index] = np.where(np.isnan(hour_array[index]), existing, hour_array[index])
+        cursor.executemany("INSERT OR REPLACE INTO 小区KPI小时 VALUES (?, ?, ?)",
+                           ((key[0], key[1], hour_array[i].tobytes()) for i, key in enumerate(key_list)))
+
+        # 忙时取PRB利用率最高的小时，没有PRB利用率时依次取RRC用户数、吞吐量最高的小时
+        missing = np.isnan(hour_array)
+        busy_key = hour_array[:, :, 0]
+        for column_index in range(1, len(KPI_COLUMNS)):
+            busy_key = np.where(missing[:, :, :column_index].all(axis=(1, 2))[:, None], hour_array[:, :, column_index],
+                                busy_key)
+        busy_hour = np.where(np.isnan(busy_key), -np.inf, busy_key).argmax(axis=1)
+        busy_value = hour_array[np.arange(len(key_list)), busy_hour]
+        prb_count = (~missing[:, :, 0]).sum(axis=1)
+        prb_mean = np.divide(np.where(missing[:, :, 0], 0, hour_array[:, :, 0]).sum(axis=1), prb_count,
+                             out=np.full(len(key_list), np.nan), where=prb_count > 0)
+        rrc_max = np.where(missing[:, :, 1], -np.inf, hour_array[:, :, 1]).max(axis=1)
+        hour_count = (~missing.all(axis=2)).sum(axis=1)
+
+        def to_value(value):
+            value = float(value)
+            return round(value, 3) if np.isfinite(value) else None
+
+        week_dict = {}
+        day_row_list = []
+        for i, (cell_code, date) in enumerate(key_list):
+            week = week_dict.get(date)
+            if week is None:
+                week = week_dict[date] = KpiUtils.get_week(date)
+            day_row_list.append((cell_code, date, week, int(busy_hour[i]), to_value(busy_value[i, 0]),
+                                 to_value(busy_value[i, 1]), to_value(busy_value[i, 2]), to_value(prb_mean[i]),
+                                 to_value(rrc_max[i]), int(hour_count[i])))
+        cursor.executemany("INSERT OR REPLACE INTO 小区KPI日 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", day_row_list)
+        return set(week_dict.values())
+
+    # 将天粒度数据缓存与库中数据合并后写入天汇总
+    @staticmethod
+    def flush_day_buffer(cursor, day_buffer):
+        """
+        将天粒度数据缓存与库中同一小区同一天的天粒度数据合并（新数据优先）后写入天汇总，已有小时数据的天不写入
+        :param cursor: 数据库游标
+        :type cursor: Cursor
+        :param day_buffer: key为(小区编号, 日期)，value为3个值的列表
+        :type day_buffer: dict{tuple:list}
+        :return: 受影响的周
+        :rtype: set[int]
+        """
+        if not day_buffer:
+            return set()
+        existing_dict = {(result[0], result[1]): result[2:] for result in KpiUtils.select_by_key(
+            cursor, '小区KPI日', ['小时数', '忙时PRB利用率', '忙时RRC用户数', '忙时吞吐量'], list(day_buffer))}
+        week_dict = {}
+        day_row_list = []
+        for (cell_code, date), value_list in day_buffer.items():
+            existing = existing_dict.get((cell_code, date))
+            if existing and existing[0]:
+                continue
+            if existing:
+                value_list = [existing_value if value != value else value
+                              for value, existing_value in zip(value_list, existing[1:])]
+            value_list = [None if value is None or value != value else value for value in value_list]
+            week = week_dict.get(date)
+            if week is None:
+                week = week_dict[date] = KpiUtils.get_week(date)
+            day_row_list.append((cell_code, date, week, None, value_list[0], value_list[1], value_list[2],
+                                 value_list[0], value_list[1], 0))
+        cursor.executemany("INSERT OR REPLACE INTO 小区KPI日 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", day_row_list)
+        return set(week_dict.values())
+
+    # 由天汇总重新汇聚周汇总
+    @staticmethod
+    def rollup_week(cursor, week_set):
+        """
+        由天汇总重新汇聚受影响的周：忙时指标取各天的均值和最大值
+        :param cursor: 数据库游标
+        :type cursor: Cursor
+        :param week_set: 受影响的周
+        :type week_set: set[int]
+        :return: None
+        """
+        for week in sorted(week_set):
+            cursor.execute("DELETE FROM 小区KPI周 WHERE 周=?", (week,))
+            cursor.execute("""
+                INSERT INTO 小区KPI周
+                SELECT 小区编号, 周, COUNT(*), AVG(忙时PRB利用率), MAX(忙时PRB利用率), AVG(忙时RRC用户数),
+                       MAX(忙时RRC用户数), AVG(忙时吞吐量)
+                FROM 小区KPI日 WHERE 周=? GROUP BY 小区编号""", (week,))
+
+    # 获取一组小区的忙时负荷
+    @staticmethod
+    def get_busy_hour_load(conn, cgi_list, days=7, end_date=None):
+        """
+        获取一组小区最近一段时间的忙时负荷，按小区号匹配（忽略PLMN）；
+        跨度不超过31天时读取天汇总，否则读取周汇总（按周内天数加权）
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param cgi_list: CGI列表
+        :type cgi_list: list[str]
+        :param days: 统计天数
+        :type days: int
+        :param end_date: 截止日期，形如20250519，为空则取库中最新日期
+        :type end_date: int
+        :return: key为CGI，value为忙时PRB利用率、最大忙时PRB利用率、忙时RRC用户数、最大忙时RRC用户数、忙时吞吐量和天数，
+                 无KPI数据的小区不在结果中
+        :rtype: dict{str:dict}
+        """
+        KpiUtils.create_kpi_tables(conn)
+        cursor = conn.cursor()
+        if end_date is None:
+            cursor.execute("SELECT MAX(日期) FROM 小区KPI日")
+            end_date = cursor.fetchone()[0]
+            if end_date is None:
+                return {}
+        end_day = datetime.date(end_date // 10000, end_date // 100 % 100, end_date % 100)
+        start_day = end_day - datetime.timedelta(days=days - 1)
+        start_date = start_day.year * 10000 + start_day.month * 100 + start_day.day
+        if days <= 31:
+            sql = """
+                SELECT 小区编号, AVG(忙时PRB利用率), MAX(忙时PRB利用率), AVG(忙时RRC用户数), MAX(忙时RRC用户数),
+                       AVG(忙时吞吐量), COUNT(*)
+                FROM 小区KPI日 WHERE 小区编号 IN ({}) AND 日期 BETWEEN ? AND ? GROUP BY 小区编号"""
+        else:
+            # 周汇总以周一为键，起始日期所在的整周计入统计
+            start_date = KpiUtils.get_week(start_date)
+            sql = """
+                SELECT 小区编号,
+                       SUM(平均忙时PRB利用率 * 天数) / SUM(CASE WHEN 平均忙时PRB利用率 IS NULL THEN 0 ELSE 天数 END),
+                       MAX(最大忙时PRB利用率),
+                       SUM(平均忙时RRC用户数 * 天数) / SUM(CASE WHEN 平均忙时RRC用户数 IS NULL THEN 0 ELSE 天数 END),
+                       MAX(最大忙时RRC用户数),
+                       SUM(平均忙时吞吐量 * 天数) / SUM(CASE WHEN 平均忙时吞吐量 IS NULL THEN 0 ELSE 天数 END), SUM(天数)
+                FROM 小区KPI周 WHERE 小区编号 IN ({}) AND 周 BETWEEN ? AND ? GROUP BY 小区编号"""
+
+        cell_id_dict = {DataUtils.cgi_remove_plmn(str(cgi)) or str(cgi): cgi for cgi in cgi_list}
+        cell_id_list = list(cell_id_dict)
+        code_cgi_dict = {}
+        for i in range(0, len(cell_id_list), 500):
+            chunk = cell_id_list[i:i + 500]
+            cursor.execute(f"SELECT 小区编号, 小区号, CGI FROM 小区KPI小区 WHERE 小区号 IN ({', '.join(['?'] * len(chunk))})",
+                           chunk)
+            for cell_code, cell_id, cgi in cursor.fetchall():
+                code_cgi_dict[cell_code] = cell_id_dict.get(cell_id, cgi)
+        # 小区号无法解析的CGI按原值匹配
+        unparsed_cgi_list = [cgi for cell_id, cgi in cell_id_dict.items() if cell_id == str(cgi)]
+        for i in range(0, len(unparsed_cgi_list), 500):
+            chunk = unparsed_cgi_list[i:i + 500]
+            cursor.execute(f"SELECT 小区编号, CGI FROM 小区KPI小区 WHERE CGI IN ({', '.join(['?'] * len(chunk))})",
+                           chunk)
+            code_cgi_dict.update(cursor.fetchall())
+
+        busy_hour_load_dict = {}
+        code_list = list(code_cgi_dict)
+        for i in range(0, len(code_list), 500):
+            chunk = code_list[i:i + 500]
+            cursor.execute(sql.format(', '.join(['?'] * len(chunk))), chunk + [start_date, end_date])
+            for result in cursor.fetchall():
+                busy_hour_load_dict[code_cgi_dict[result[0]]] = dict(zip(
+                    ('忙时PRB利用率', '最大忙时PRB利用率', '忙时RRC用户数', '最大忙时RRC用户数', '忙时吞吐量', '天数'),
+                    result[1:]))
+        return busy_hour_load_dict
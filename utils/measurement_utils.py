@@ -0,0 +1,504 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+import datetime
+import os
+import time
+
+import numpy as np
+
+from utils.data_utils import DataUtils
+from utils.geometry_utils import GeometryUtils
+from utils.hex_utils import HexUtils
+from utils.import_utils import ImportUtils
+
+# 路测/MDT文件中可识别的列名（不区分大小写），依次匹配
+MEASUREMENT_FIELD_ALIASES = {
+    '经度': ('经度', 'lon', 'lng', 'longitude'),
+    '纬度': ('纬度', 'lat', 'latitude'),
+    'CGI': ('服务小区', 'cgi', 'ecgi', 'ncgi', 'servingcgi', 'serving cgi', '服务小区cgi'),
+    'RSRP': ('rsrp', 'ss-rsrp', 'ssrsrp', 'ss_rsrp'),
+    'SINR': ('sinr', 'ss-sinr', 'sssinr', 'ss_sinr'),
+}
+# 弱覆盖门限（dBm）
+WEAK_COVERAGE_RSRP = -110.0
+# 小区RSRP直方图范围（1dB一档），用于分位数统计
+RSRP_HISTOGRAM_MIN = -140
+RSRP_HISTOGRAM_MAX = -40
+
+
+class MeasurementUtils:
+    """
+    路测/MDT测量点的流式导入与空间汇聚：分块读取测量点，以NumPy向量化转换至EPSG:32650并汇聚到六边形格网，
+    按(六边形, 服务小区)保存点数、RSRP/SINR总和及弱覆盖点数，按服务小区保存点数、均值和RSRP分位数；
+    汇聚结果通过六边形编号与项目六边形索引关联，通过服务小区CGI与扇区、小区明细关联
+    """
+
+    # 建立测量数据表
+    @staticmethod
+    def create_measurement_tables(conn):
+        """
+        建立测量批次、测量格网汇总和测量小区汇总表，该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 测量批次 (
+                批次号 INTEGER PRIMARY KEY AUTOINCREMENT, 文件路径 TEXT, 导入时间 TEXT, 读取点数 INTEGER,
+                有效点数 INTEGER, 分辨率 INTEGER)""")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 测量格网汇总 (
+                批次号 INTEGER, 分辨率 INTEGER, 六边形编号 INTEGER, 服务小区 TEXT, 点数 INTEGER,
+                RSRP总和 REAL, RSRP点数 INTEGER, SINR总和 REAL, SINR点数 INTEGER, 弱覆盖点数 INTEGER)""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 测量格网汇总_六边形编号 ON 测量格网汇总 (分辨率, 六边形编号)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 测量格网汇总_服务小区 ON 测量格网汇总 (服务小区)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 测量小区汇总 (
+                批次号 INTEGER, 服务小区 TEXT, 小区号 TEXT, 点数 INTEGER, 平均RSRP REAL, RSRP_P10 REAL, RSRP_P50 REAL,
+                RSRP_P90 REAL, 平均SINR REAL, 弱覆盖比例 REAL, PRIMARY KEY (批次号, 服务小区))""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 测量小区汇总_小区号 ON 测量小区汇总 (小区号)")
+        conn.commit()
+
+    # 判断是否已导入测量数据
+    @staticmethod
+    def has_measurement(conn):
+        """
+        判断是否已导入测量数据，测量表尚未建立时不建表，直接返回False
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 是否存在测量批次
+        :rtype: bool
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='测量批次'")
+        if not cursor.fetchone():
+            return False
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM 测量批次)")
+        return bool(cursor.fetchone()[0])
+
+    # 根据表头识别测量列
+    @staticmethod
+    def get_column_index_dict(header):
+        """
+        根据表头识别经度、纬度、服务小区、RSRP和SINR所在的列
+        :param header: 表头
+        :type header: list[str]
+        :return: key为标准列名，value为列序号，未识别的列不在结果中
+        :rtype: dict{str:int}
+        """
+        normalized_header = [str(column).strip().lower() for column in header]
+        column_index_dict = {}
+        for column_name, alias_tuple in MEASUREMENT_FIELD_ALIASES.items():
+            for alias in alias_tuple:
+                if alias in normalized_header:
+                    column_index_dict[column_name] = normalized_header.index(alias)
+                    break
+        return column_index_dict
+
+    # 流式读取测量文件，分块返回数组
+    @staticmethod
+    def read_chunks(file_path, chunk_size=200000):
+        """
+        流式读取测量文件（CSV/XLSX），每chunk_size行转换为一组数组返回，经纬度无效的点已剔除
+        :param file_path: 文件路径
+        :type file_path: str
+        :param chunk_size: 每块行数
+        :type chunk_size: int
+        :return: 逐块返回(读取行数, 经度, 纬度, 服务小区, RSRP, SINR)，缺失的RSRP/SINR为nan
+        :rtype: generator[tuple]
+        """
+        row_iter = ImportUtils.read_rows(file_path)
+        column_index_dict = MeasurementUtils.get_column_index_dict(next(row_iter, []))
+        missing_column_list = [column_name for column_name in ('经度', '纬度', 'CGI') if column_name not in column_index_dict]
+        if missing_column_list:
+            raise ValueError(f"表头缺少测量数据的关键字段：{'、'.join(missing_column_list)}")
+        column_name_list = [column_name for column_name in MEASUREMENT_FIELD_ALIASES if column_name in column_index_dict]
+        index_list = [column_index_dict[column_name] for column_name in column_name_list]
+        max_index = max(index_list)
+        while True:
+            value_list = [[row[index] for index in index_list] for row in
+                          (row for _, row in zip(range(chunk_size), row_iter)) if len(row) > max_index]
+            if not value_list:
+                return
+            column_dict = dict(zip(column_name_list, zip(*value_list)))
+            lon = MeasurementUtils.to_float_array(column_dict['经度'])
+            lat = MeasurementUtils.to_float_array(column_dict['纬度'])
+            cgi = np.asarray([str(value).strip() for value in column_dict['CGI']], dtype=object)
+            rsrp = MeasurementUtils.to_float_array(column_dict['RSRP']) if 'RSRP' in column_dict \
+                else np.full(len(lon), np.nan)
+            sinr = MeasurementUtils.to_float_array(column_dict['SINR']) if 'SINR' in column_dict \
+                else np.full(len(lon), np.nan)
+            valid = np.isfinite(lon) & np.isfinite(lat) & (np.abs(lon) <= 180) & (np.abs(lat) <= 90) & (cgi != '')
+            yield len(value_list), lon[valid], lat[valid], cgi[valid], rsrp[valid], sinr[valid]
+
+    @staticmethod
+    def to_float_array(value_tuple):
+        """
+        将一列单元格转换为浮点数组，无法转换的为nan
+        """
+        try:
+            return np.asarray(value_tuple, dtype=float)
+        except ValueError:
+            array = np.full(len(value_tuple), np.nan)
+            for i, value in enumerate(value_tuple):
+                try:
+                    array[i] = float(value)
+                except (TypeError, ValueError):
+                    pass
+            return array
+
+    # 流式导入测量文件并汇聚
+    @staticmethod
+    def import_measurement(conn, file_path, resolution=2, chunk_size=200000):
+        """
+        流式导入路测/MDT文件：分块读取并转换至EPSG:32650，按(六边形, 服务小区)和服务小区汇聚后写入数据库，
+        原始测量点不入库，作为一个测量批次保存
+        :param conn: 数据库连接（建议使用异步访问层的写连接）
+        :type conn: Connection
+        :param file_path: CSV/XLSX文件路径，表头需包含经度、纬度、服务小区（CGI），可选RSRP、SINR
+        :type file_path: str
+        :param resolution: 六边形分辨率，与项目六边形索引一致才能关联项目
+        :type resolution: int
+        :param chunk_size: 每块行数
+        :type chunk_size: int
+        :return: 导入报告，包括批次号、读取点数、有效点数、格网数、服务小区数、耗时和每秒点数
+        :rtype: dict
+        """
+        start_time = time.perf_counter()
+        MeasurementUtils.create_measurement_tables(conn)
+        cgi_index_dict = {}
+        read_count = 0
+        valid_count = 0
+        # 各块的部分汇聚结果，最后整体再汇聚一次
+        partial_key_list = []
+        partial_value_list = []
+        histogram = np.zeros((0, RSRP_HISTOGRAM_MAX - RSRP_HISTOGRAM_MIN + 1), dtype=np.int64)
+        cell_sum = np.zeros((0, 6))
+        for chunk_read_count, lon, lat, cgi, rsrp, sinr in MeasurementUtils.read_chunks(file_path, chunk_size):
+            read_count += chunk_read_count
+            valid_count += len(lon)
+            if not len(lon):
+                continue
+            # 服务小区编码为全局整数编号
+            chunk_cgi, chunk_inverse = np.unique(cgi, return_inverse=True)
+            cgi_code = np.asarray([cgi_index_dict.setdefault(value, len(cgi_index_dict)) for value in chunk_cgi],
+                                  dtype=np.int64)[chunk_inverse]
+            x, y = GeometryUtils.lonlat_to_utm(lon, lat)
+            hex_cell = HexUtils.point_to_cell(x, y, resolution)
+
+            rsrp_valid = np.isfinite(rsrp)
+            sinr_valid = np.isfinite(sinr)
+            rsrp_value = np.where(rsrp_valid, rsrp, 0.0)
+            sinr_value = np.where(sinr_valid, sinr, 0.0)
+            weak = rsrp_valid & (rsrp < WEAK_COVERAGE_RSRP)
+            keys = np.stack([hex_cell, cgi_code], axis=1)
+            unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            partial_key_list.append(unique_keys)
+            partial_value_list.append(np.stack([np.bincount(inverse, weights, len(unique_keys)) for weights in
+                                                (None, rsrp_value, rsrp_valid, sinr_value, sinr_valid, weak)], axis=1))
+
+            # 服务小区的点数、RSRP/SINR总和、弱覆盖点数和RSRP直方图
+            cgi_count = len(cgi_index_dict)
+            if histogram.shape[0] < cgi_count:
+                histogram = np.vstack([histogram, np.zeros((cgi_count - histogram.shape[0], histogram.shape[1]),
+                                                           dtype=np.int64)])
+                cell_sum = np.vstack([cell_sum, np.zeros((cgi_count - cell_sum.shape[0], 6))])
+            rsrp_bin = np.clip(np.round(rsrp[rsrp_valid]).astype(np.int64), RSRP_HISTOGRAM_MIN, RSRP_HISTOGRAM_MAX)
+            np.add.at(histogram, (cgi_code[rsrp_valid], rsrp_bin - RSRP_HISTOGRAM_MIN), 1)
+            cell_sum += np.stack([np.bincount(cgi_code, weights, cgi_count) for weights in
+                                  (None, rsrp_value, rsrp_valid, sinr_value, sinr_valid, weak)], axis=1)
+
+        cgi_list = list(cgi_index_dict)
+        grid_row_list = []
+        if partial_key_list:
+            all_keys = np.vstack(partial_key_list)
+            all_values = np.vstack(partial_value_list)
+            unique_keys, inverse = np.unique(all_keys, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            grid_values = np.stack([np.bincount(inverse, all_values[:, i], len(unique_keys))
+                                    for i in range(all_values.shape[1])], axis=1)
+            grid_row_list = [(resolution, int(key[0]), cgi_list[key[1]], int(value[0]), float(value[1]), int(value[2]),
+                              float(value[3]), int(value[4]), int(value[5]))
+                             for key, value in zip(unique_keys.tolist(), grid_values.tolist())]
+
+        cell_row_list = []
+        rsrp_axis = np.arange(RSRP_HISTOGRAM_MIN, RSRP_HISTOGRAM_MAX + 1)
+        for code, cgi in enumerate(cgi_list):
+            rsrp_count = cell_sum[code, 2]
+            if rsrp_count:
+                # 分位数取自1dB一档的直方图
+                cumulative = np.cumsum(histogram[code]) / rsrp_count
+                p10, p50, p90 = (float(rsrp_axis[np.searchsorted(cumulative, q)]) for q in (0.1, 0.5, 0.9))
+                mean_rsrp = float(cell_sum[code, 1] / rsrp_count)
+                weak_ratio = float(cell_sum[code, 5] / rsrp_count)
+            else:
+                p10 = p50 = p90 = mean_rsrp = weak_ratio = None
+            mean_sinr = float(cell_sum[code, 3] / cell_sum[code, 4]) if cell_sum[code, 4] else None
+            cell_row_list.append((cgi, DataUtils.cgi_remove_plmn(cgi), int(cell_sum[code, 0]), mean_rsrp, p10, p50, p90,
+                                  mean_sinr, weak_ratio))
+
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO 测量批次 (文件路径, 导入时间, 读取点数, 有效点数, 分辨率) VALUES (?, ?, ?, ?, ?)",
+                       (os.path.abspath(file_path), datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'), read_count,
+                        valid_count, resolution))
+        batch_id = cursor.lastrowid
+        cursor.executemany("INSERT INTO 测量格网汇总 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           ((batch_id,) + row for row in grid_row_list))
+        cursor.executemany("INSERT INTO 测量小区汇总 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           ((batch_id,) + row for row in cell_row_list))
+        conn.commit()
+        elapsed = time.perf_counter() - start_time
+        return {'批次号': batch_id, '读取点数': read_count, '有效点数': valid_count, '格网数': len(grid_row_list),
+                '服务小区数': len(cgi_list), '耗时': elapsed, '点每秒': read_count / elapsed if elapsed > 0 else 0.0}
+
+    # 获取项目范围内实测的服务小区分布
+    @staticmethod
+    def get_project_serving_cell_list(conn, project_name, batch_id=None):
+        """
+        通过六边形编号关联项目六边形索引，获取项目范围（项目覆盖的六边形）内实测的服务小区分布，按点数降序排列
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_name: 项目名称
+        :type project_name: str
+        :param batch_id: 测量批次号，为空则汇总全部批次
+        :type batch_id: int
+        :return: 每项包括服务小区、点数、占比、平均RSRP、平均SINR、弱覆盖点数
+        :rtype: list[dict]
+        """
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT g.服务小区, SUM(g.点数), SUM(g.RSRP总和), SUM(g.RSRP点数), SUM(g.SINR总和), SUM(g.SINR点数),
+                   SUM(g.弱覆盖点数)
+            FROM 测量格网汇总 g JOIN 项目六边形索引 p ON p.分辨率=g.分辨率 AND p.六边形编号=g.六边形编号
+            WHERE p.项目名称=? {'AND g.批次号=?' if batch_id is not None else ''}
+            GROUP BY g.服务小区 ORDER BY SUM(g.点数) DESC""",
+                       (project_name, batch_id) if batch_id is not None else (project_name,))
+        result_list = cursor.fetchall()
+        total_count = sum(result[1] for result in result_list)
+        return [{'服务小区': result[0], '点数': result[1], '占比': result[1] / total_count,
+                 '平均RSRP': result[2] / result[3] if result[3] else None,
+                 '平均SINR': result[4] / result[5] if result[5] else None, '弱覆盖点数': result[6]}
+                for result in result_list]
+
+    # 获取一组小区的实测汇总
+    @staticmethod
+    def get_cell_measurement_dict(conn, cgi_list, batch_id=None):
+        """
+        获取一组小区的实测汇总，按小区号匹配（忽略PLMN），未指定批次时取最新一个包含该小区的批次
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param cgi_list: CGI列表
+        :type cgi_list: list[str]
+        :param batch_id: 测量批次号
+        :type batch_id: int
+        :return: key为CGI，value为点数、平均RSRP、RSRP_P10、RSRP_P50、RSRP_P90、平均SINR、弱覆盖比例和批次号
+        :rtype: dict{str:dict}
+        """
+        cell_id_dict = {DataUtils.cgi_remove_plmn(str(cgi)) or str(cgi): cgi for cgi in cgi_list}
+        cell_id_list = list(cell_id_dict)
+        measurement_dict = {}
+        cursor = conn.cursor()
+        for i in range(0, len(cell_id_list), 500):
+            chunk = cell_id_list[i:i + 500]
+            cursor.execute(f"""
+                SELECT 小区号, 点数, 平均RSRP, RSRP_P10, RSRP_P50, RSRP_P90, 平均SINR, 弱覆盖比例, 批次号 FROM 测量小区汇总
+                WHERE 小区号 IN ({', '.join(['?'] * len(chunk))}) {'AND 批次号=?' if batch_id is not None else ''}
+                ORDER BY 批次号""", chunk + ([batch_id] if batch_id is not None else []))
+            for result in cursor.fetchall():
+                measurement_dict[cell_id_dict[result[0]]] = dict(zip(
+                    ('点数', '平均RSRP', 'RSRP_P10', 'RSRP_P50', 'RSRP_P90', '平均SINR', '弱覆盖比例', '批次号'), result[1:]))
+        return measurement_dict
+
+    # 将气泡评估的风险小区与实测服务小区交叉核对
+    @staticmethod
+    def cross_check_risk_list(serving_cell_list, intersects_cgi_list, outer_cgi_list, min_share=0.01):
+        """
+        将气泡评估的高、中风险小区与项目范围内实测的服务小区交叉核对（按小区号匹配）
+        :param serving_cell_list: 项目范围内实测的服务小区分布（get_project_serving_cell_list的返回值）
+        :type serving_cell_list: list[dict]
+        :param intersects_cgi_list: 高风险（气泡内）小区
+        :type intersects_cgi_list: list[str]
+        :param outer_cgi_list: 中风险（气泡外圈）小区
+        :type outer_cgi_list: list[str]
+        :param min_share: 计入核对的最小占用占比
+        :type min_share: float
+        :return: 实测占用且为高风险、实测占用且为中风险、实测占用但不在风险列表中的服务小区，以及高风险中未实测占用的小区
+        :rtype: tuple[list[dict], list[dict], list[dict], list[str]]
+        """
+        high_cell_id_set = {DataUtils.cgi_remove_plmn(str(cgi)) for cgi in intersects_cgi_list}
+        middle_cell_id_set = {DataUtils.cgi_remove_plmn(str(cgi)) for cgi in outer_cgi_list}
+        measured_high_list, measured_middle_list, measured_other_list = [], [], []
+        measured_cell_id_set = set()
+        for serving_cell in serving_cell_list:
+            cell_id = DataUtils.cgi_remove_plmn(str(serving_cell['服务小区']))
+            measured_cell_id_set.add(cell_id)
+            if serving_cell['占比'] < min_share:
+                continue
+            if cell_id in high_cell_id_set:
+                measured_high_list.append(serving_cell)
+            elif cell_id in middle_cell_id_set:
+                measured_middle_list.append(serving_cell)
+            else:
+                measured_other_list.append(serving_cell)
+        unmeasured_high_list = [cgi for cgi in intersects_cgi_list
+                                if DataUtils.cgi_remove_plmn(str(cgi)) not in measured_cell_id_set]
+        return measured_high_list, measured_middle_list, measured_other_list, unmeasured_high_list
+
+    # 获取测量批次对应的原始文件
+    @staticmethod
+    def get_batch_file_list(conn, batch_id=None):
+        """
+        获取测量批次对应且仍存在的原始测量文件（同一文件多次导入只返回一次）
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param batch_id: 测量批次号，为空则返回全部批次
+        :type batch_id: int
+        :return: 文件路径列表，按批次号排列
+        :rtype: list[str]
+        """
+        if not MeasurementUtils.has_measurement(conn):
+            return []
+        cursor = conn.cursor()
+        if batch_id is None:
+            cursor.execute("SELECT 文件路径 FROM 测量批次 ORDER BY 批次号")
+        else:
+            cursor.execute("SELECT 文件路径 FROM 测量批次 WHERE 批次号=?", (batch_id,))
+        return [file_path for file_path in dict.fromkeys(result[0] for result in cursor.fetchall())
+                if os.path.exists(file_path)]
+
+    # 流式扫描原始测量点，统计项目范围内及周边的服务小区分布
+    @staticmethod
+    def evaluate_project_points(file_path_list, project_wkb, project_cgi_list, near_distance=200.0, min_share=0.01,
+                                chunk_size=200000):
+        """
+        流式扫描原始测量点，逐块转换至EPSG:32650后先按项目外包框（外扩near_distance）粗筛，
+        再对候选点做点在面内判定，面外的点计算到项目边界的距离，不超过near_distance的计为项目周边点；
+        统计项目内及周边的服务小区分布，并按小区号（忽略PLMN）与项目2B小区列表比对，
+        不访问数据库，可在工作线程中执行
+        :param file_path_list: 原始测量文件路径列表
+        :type file_path_list: list[str]
+        :param project_wkb: 项目几何（EPSG:32650）的WKB，支持点、线、面
+        :type project_wkb: bytes
+        :param project_cgi_list: 项目2B小区列表（小区明细中的CGI）
+        :type project_cgi_list: list[str]
+        :param near_distance: 项目周边范围（米）
+        :type near_distance: float
+        :param min_share: 计入未纳入项目小区的最小占用占比
+        :type min_share: float
+        :param chunk_size: 每块行数
+        :type chunk_size: int
+        :return: 评估结果，包括读取点数、项目内点数、项目周边点数、服务小区列表和未纳入项目的服务小区列表，
+                 服务小区按点数降序排列，每项包括服务小区、项目内点数、周边点数、点数、占比、平均RSRP、平均SINR、
+                 弱覆盖比例和是否已纳入项目
+        :rtype: dict
+        """
+        coords_list, closed_list = GeometryUtils.wkb_to_coords_list(project_wkb)
+        ring_list = [coords for coords, closed in zip(coords_list, closed_list) if closed]
+        all_coords = np.vstack(coords_list)
+        x_min, y_min = all_coords.min(axis=0) - near_distance
+        x_max, y_max = all_coords.max(axis=0) + near_distance
+
+        read_count = 0
+        # key为服务小区，value为[项目内点数, 周边点数, RSRP总和, RSRP点数, SINR总和, SINR点数, 弱覆盖点数]
+        cell_sum_dict = {}
+        for file_path in file_path_list:
+            for chunk_read_count, lon, lat, cgi, rsrp, sinr in MeasurementUtils.read_chunks(file_path, chunk_size):
+                read_count += chunk_read_count
+                if not len(lon):
+                    continue
+                x, y = GeometryUtils.lonlat_to_utm(lon, lat)
+                candidate = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+                if not candidate.any():
+                    continue
+                x, y, cgi, rsrp, sinr = x[candidate], y[candidate], cgi[candidate], rsrp[candidate], sinr[candidate]
+                inside = GeometryUtils.points_in_rings(x, y, ring_list) if ring_list else np.zeros(len(x), dtype=bool)
+                near = np.zeros(len(x), dtype=bool)
+                near[~inside] = GeometryUtils.points_to_coords_distance(x[~inside], y[~inside],
+                                                                         coords_list) <= near_distance
+                selected = inside | near
+                if not selected.any():
+                    continue
+                inside, cgi, rsrp, sinr = inside[selected], cgi[selected], rsrp[selected], sinr[selected]
+                rsrp_valid = np.isfinite(rsrp)
+                sinr_valid = np.isfinite(sinr)
+                chunk_cgi, inverse = np.unique(cgi, return_inverse=True)
+                chunk_sum = np.stack([np.bincount(inverse, weights, len(chunk_cgi)) for weights in
+                                      (inside, ~inside, np.where(rsrp_valid, rsrp, 0.0), rsrp_valid,
+                                       np.where(sinr_valid, sinr, 0.0), sinr_valid,
+                                       rsrp_valid & (rsrp < WEAK_COVERAGE_RSRP))], axis=1)
+                for serving_cgi, value in zip(chunk_cgi.tolist(), chunk_sum):
+                    cell_sum = cell_sum_dict.get(serving_cgi)
+                    if cell_sum is None:
+                        cell_sum_dict[serving_cgi] = value
+                    else:
+                        cell_sum += value
+
+        project_cell_id_set = {DataUtils.cgi_remove_plmn(str(cgi)) or str(cgi) for cgi in project_cgi_list}
+        total_count = int(sum(value[0] + value[1] for value in cell_sum_dict.values()))
+        serving_cell_list = []
+        for serving_cgi, value in cell_sum_dict.items():
+            point_count = int(value[0] + value[1])
+            serving_cell_list.append({
+                '服务小区': serving_cgi, '项目内点数': int(value[0]), '周边点数': int(value[1]), '点数': point_count,
+                '占比': point_count / total_count, '平均RSRP': float(value[2] / value[3]) if value[3] else None,
+                '平均SINR': float(value[4] / value[5]) if value[5] else None,
+                '弱覆盖比例': float(value[6] / value[3]) if value[3] else None,
+                '已纳入项目': (DataUtils.cgi_remove_plmn(serving_cgi) or serving_cgi) in project_cell_id_set})
+        serving_cell_list.sort(key=lambda item: item['点数'], reverse=True)
+        return {'读取点数': read_count,
+                '项目内点数': int(sum(value[0] for value in cell_sum_dict.values())),
+                '项目周边点数': int(sum(value[1] for value in cell_sum_dict.values())),
+                '服务小区列表': serving_cell_list,
+                '未纳入项目小区列表': [item for item in serving_cell_list
+                                        if not item['已纳入项目'] and item['占比'] >= min_share]}
+
+    # 读取已导入测量批次的原始文件并流式扫描项目范围内及周边的测量点
+    @staticmethod
+    def evaluate_project_measurement(conn, project_wkb, project_cgi_list, near_distance=200.0, min_share=0.01):
+        """
+        读取已导入测量批次对应的原始文件，调用evaluate_project_points流式扫描项目范围内及周边的测量点，
+        第一个参数为数据库连接，可通过异步访问层在读线程中执行
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_wkb: 项目几何（EPSG:32650）的WKB
+        :type project_wkb: bytes
+        :param project_cgi_list: 项目2B小区列表
+        :type project_cgi_list: list[str]
+        :param near_distance: 项目周边范围（米）
+        :type near_distance: float
+        :param min_share: 计入未纳入项目小区的最小占用占比
+        :type min_share: float
+        :return: evaluate_project_points的评估结果，并增加文件数；无可用原始文件时文件数为0
+        :rtype: dict
+        """
+        file_path_list = MeasurementUtils.get_batch_file_list(conn)
+        if not file_path_list:
+            return {'文件数': 0}
+        result = MeasurementUtils.evaluate_project_points(file_path_list, project_wkb, project_cgi_list,
+                                                          near_distance, min_share)
+        result['文件数'] = len(file_path_list)
+        return result
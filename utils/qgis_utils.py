@@ -21,20 +21,54 @@
  along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import csv
+import datetime
+import hashlib
+import json
 import math
+import os
+import tempfile
 
-from PyQt6.QtCore import Qt, QBuffer, QIODevice, QVariant, QTimer, pyqtSignal, QEventLoop, QSize
+import numpy as np
+from PyQt6.QtCore import Qt, QBuffer, QIODevice, QVariant, QTimer, pyqtSignal, QEventLoop, QSize, QFileSystemWatcher, QUrl
 from PyQt6.QtGui import QImage, QPainter, QColor, QFont
 from PyQt6.QtWidgets import QTableWidgetItem, QMainWindow, QMessageBox
 from qgis._core import QgsMapLayer, QgsExpression, QgsFeatureRequest, QgsVectorLayer, QgsField, QgsFeature, \
     QgsSimpleFillSymbolLayer, QgsFillSymbol, QgsSingleSymbolRenderer, QgsSpatialIndex, QgsCoordinateTransform, \
     QgsCoordinateReferenceSystem, QgsGeometry, QgsRectangle, QgsPointXY, QgsPalLayerSettings, QgsTextFormat, \
-    QgsTextBufferSettings, QgsVectorLayerSimpleLabeling, QgsDistanceArea, QgsWkbTypes, QgsUnitTypes, QgsFields
+    QgsTextBufferSettings, QgsVectorLayerSimpleLabeling, QgsDistanceArea, QgsWkbTypes, QgsUnitTypes, QgsFields, \
+    QgsVectorFileWriter, QgsTask, QgsApplication, QgsCategorizedSymbolRenderer, QgsRendererCategory, \
+    QgsCoordinateTransformContext
 from qgis._gui import QgsVertexMarker, QgsMapTool, QgsRubberBand, QgsMapToolEmitPoint, QgsMapToolPan, QgsMapToolIdentify
 
+from utils.cache_utils import BubbleResultCache
+from utils.column_store_utils import SECTOR_ATTRIBUTE_COLUMNS, SectorAttributeStore
 from utils.data_utils import DataUtils
+from utils.geometry_utils import GeometryUtils
+from utils.hex_utils import HexUtils
+from utils.history_utils import ParameterHistoryStore
+from utils.import_utils import ImportUtils
+from utils.io_utils import IOUtils
+from utils.raster_utils import SCIPY_AVAILABLE, ProjectDistanceField, SectorCoverageGrid
+from utils.shapely_utils import SHAPELY_AVAILABLE, ShapelyIndex, ShapelyUtils
 from utils.sqlite_utils import SqliteUtils
 
+# 扇区图层生成时各频段的默认波瓣宽度（度）和覆盖半径（米），工参中未提供时使用
+SECTOR_BAND_DEFAULTS = {
+    '2.6G': (65, 350),
+    '700M': (65, 700),
+    '4.9G': (65, 250),
+}
+SECTOR_OTHER_BAND_DEFAULT = (65, 350)
+# 气泡扩散的默认最大半径（米），项目冲突矩阵的距离阈值与新项目冲突评估相同，为其3倍
+BUBBLE_MAX_SIZE_DEFAULT = 3000
+# 室分小区以站点为圆心生成圆形，默认半径（米）
+SECTOR_INDOOR_RADIUS_DEFAULT = 50
+# 扇区图层的字段，与外部制作的宏站、室分扇区图层一致
+SECTOR_LAYER_FIELDS = (('唯一标识', QVariant.String), ('基站号', QVariant.Int), ('小区名', QVariant.String),
+                       ('站型', QVariant.String), ('行政区', QVariant.String), ('设备厂家', QVariant.String),
+                       ('频段', QVariant.String), ('带宽', QVariant.String), ('Group ID', QVariant.Int))
+
 
 class CustomAzimuthMeasurementTool(QgsMapTool):
     def __init__(self, mainWindow, qgsProjectInstance):
@@ -421,6 +455,374 @@ class CustomPolygonMapTool(QgsMapToolEmitPoint):
         super().deactivate()
 
 
+class ProjectGeometryCache:
+    """
+    项目几何缓存，一次性遍历3个项目图层，按项目名称缓存项目几何（图层坐标系）和EPSG:32650米制几何，
+    距离计算时使用预处理后的几何引擎；项目图层被新增或删除（重建）时自动失效
+    """
+    project_layer_name_list = ['ToB项目图层_面', "ToB项目图层_线", "ToB项目图层_点"]
+
+    def __init__(self, qgsProjectInstance, transformer_to_metric):
+        self.qgsProjectInstance = qgsProjectInstance
+        self.transformer_to_metric = transformer_to_metric
+        # 项目名称 -> [图层坐标系几何, 米制几何, 几何引擎（首次计算距离时创建）]
+        self.project_geometry_dict = None
+        # 缓存失效次数，依赖项目几何的派生数据（如项目六边形索引）据此判断项目图层是否重建过
+        self.generation = 0
+        self.qgsProjectInstance.layersAdded.connect(self.on_layers_added)
+        self.qgsProjectInstance.layersWillBeRemoved.connect(self.on_layers_will_be_removed)
+
+    def invalidate(self):
+        """
+        清空缓存，下次查询时重新遍历项目图层
+        :return: None
+        """
+        self.project_geometry_dict = None
+        self.generation += 1
+
+    def on_layers_added(self, layers):
+        if any(layer.name() in self.project_layer_name_list for layer in layers):
+            self.invalidate()
+
+    def on_layers_will_be_removed(self, layer_ids):
+        for layer_id in layer_ids:
+            layer = self.qgsProjectInstance.mapLayer(layer_id)
+            if layer and layer.name() in self.project_layer_name_list:
+                self.invalidate()
+                return
+
+    def build(self):
+        """
+        遍历3个项目图层（按面、线、点的顺序，同名项目以先出现的为准），建立项目名称到几何的缓存
+        :return: None
+        """
+        self.project_geometry_dict = {}
+        for project_layer_name in self.project_layer_name_list:
+            layers = self.qgsProjectInstance.mapLayersByName(project_layer_name)
+            if not layers:
+                continue
+            for feature in layers[0].getFeatures():
+                project_name = feature['项目名称']
+                if project_name in self.project_geometry_dict:
+                    continue
+                geometry = feature.geometry()
+                if geometry.isEmpty():
+                    continue
+                geometry_metric = QgsGeometry(geometry)
+                geometry_metric.transform(self.transformer_to_metric)
+                self.project_geometry_dict[project_name] = [geometry, geometry_metric, None]
+
+    def get_geometry(self, project_name, metric=False):
+        """
+        根据项目名称返回项目几何的副本，未匹配则返回空
+        :param project_name: 项目名称
+        :type project_name: str
+        :param metric: 是否返回EPSG:32650米制几何，否则返回图层坐标系几何
+        :type metric: bool
+        :return: 项目几何
+        :rtype: QgsGeometry
+        """
+        if self.project_geometry_dict is None:
+            self.build()
+        cache_item = self.project_geometry_dict.get(project_name)
+        if not cache_item:
+            return None
+        return QgsGeometry(cache_item[1] if metric else cache_item[0])
+
+    def get_project_name_list(self):
+        """
+        获取缓存中全部有几何的项目名称
+        :return: 项目名称列表
+        :rtype: list[str]
+        """
+        if self.project_geometry_dict is None:
+            self.build()
+        return list(self.project_geometry_dict)
+
+    def get_distance(self, geometry_metric, project_name):
+        """
+        计算EPSG:32650几何与项目之间的最小距离（米），使用预处理后的几何引擎
+        :param geometry_metric: EPSG:32650几何
+        :type geometry_metric: QgsGeometry
+        :param project_name: 项目名称
+        :type project_name: str
+        :return: 距离（米），项目无地理化信息时返回None
+        :rtype: float
+        """
+        if self.project_geometry_dict is None:
+            self.build()
+        cache_item = self.project_geometry_dict.get(project_name)
+        if not cache_item:
+            return None
+        if cache_item[2] is None:
+            cache_item[2] = QgsGeometry.createGeometryEngine(cache_item[1].constGet())
+            cache_item[2].prepareGeometry()
+        return cache_item[2].distance(geometry_metric.constGet())
+
+
+class SectorLayerLoadTask(QgsTask):
+    """
+    后台加载新工参的扇区图层：在工作线程中打开图层、校验字段并计算扇区指纹，完成后将图层移交主线程，
+    由QGISCanvasUtils在主线程中替换工程中的同名图层
+    """
+
+    def __init__(self, layer_name, source_path, canvas_util):
+        """
+        :param layer_name: 图层名称，宏站扇区图层或室分扇区图层
+        :type layer_name: str
+        :param source_path: 新工参文件路径
+        :type source_path: str
+        :param canvas_util: 接收加载结果的QGISCanvasUtils
+        :type canvas_util: QGISCanvasUtils
+        """
+        super().__init__(f'加载{layer_name}', QgsTask.CanCancel)
+        self.layer_name = layer_name
+        self.source_path = source_path
+        self.canvas_util = canvas_util
+        self.layer = None
+        self.fingerprint_result = None
+        self.error = ''
+        self.last_logged_progress = 0
+
+    def run(self):
+        layer = QgsVectorLayer(self.source_path, self.layer_name, "ogr")
+        if not layer.isValid():
+            self.error = f"无法打开{self.source_path}"
+            return False
+        missing_field_list = [field_name for field_name in ('唯一标识', 'Group ID')
+                              if layer.fields().indexFromName(field_name) < 0]
+        if missing_field_list:
+            self.error = f"{self.source_path}缺少字段：{'、'.join(missing_field_list)}"
+            return False
+        self.fingerprint_result = QGISCanvasUtils.get_sector_fingerprint(layer, self)
+        if self.isCanceled():
+            return False
+        # 图层在工作线程中创建，需移交主线程后才能加入工程
+        layer.moveToThread(QgsApplication.instance().thread())
+        self.layer = layer
+        return True
+
+    def finished(self, result):
+        self.canvas_util.sector_layer_load_finished(self, result)
+
+
+class SectorHexIndexTask(QgsTask):
+    """
+    后台重建扇区图层的六边形索引：在工作线程中重新打开工参文件，将扇区转换至EPSG:32650并计算各分辨率的六边形编号，
+    完成后由QGISCanvasUtils通过异步访问层的写连接写入数据库
+    """
+
+    def __init__(self, layer_name, source_path, source, transform_context, canvas_util):
+        """
+        :param layer_name: 扇区图层名称
+        :type layer_name: str
+        :param source_path: 工参文件路径
+        :type source_path: str
+        :param source: 工参文件标识，随索引一起保存
+        :type source: str
+        :param transform_context: 坐标转换上下文
+        :type transform_context: QgsCoordinateTransformContext
+        :param canvas_util: 接收计算结果的QGISCanvasUtils
+        :type canvas_util: QGISCanvasUtils
+        """
+        super().__init__(f'重建{layer_name}六边形索引', QgsTask.CanCancel)
+        self.layer_name = layer_name
+        self.source_path = source_path
+        self.source = source
+        self.transform_context = transform_context
+        self.canvas_util = canvas_util
+        self.hex_row_list = []
+        self.error = ''
+
+    def run(self):
+        layer = QgsVectorLayer(self.source_path, self.layer_name, "ogr")
+        if not layer.isValid():
+            self.error = f"无法打开{self.source_path}"
+            return False
+        transformer_to_32650 = QgsCoordinateTransform(layer.crs(), QgsCoordinateReferenceSystem("EPSG:32650"),
+                                                      self.transform_context)
+        feature_count = max(layer.featureCount(), 1)
+        for index, feature in enumerate(layer.getFeatures()):
+            if index % 1000 == 0:
+                if self.isCanceled():
+                    return False
+                self.setProgress(100 * index / feature_count)
+            geometry = feature.geometry()
+            if geometry.isEmpty():
+                continue
+            geometry.transform(transformer_to_32650)
+            for resolution, hex_cells in HexUtils.wkb_to_cells(bytes(geometry.asWkb())).items():
+                self.hex_row_list.extend((feature['唯一标识'], resolution, int(hex_cell)) for hex_cell in hex_cells)
+        return True
+
+    def finished(self, result):
+        self.canvas_util.sector_hex_index_task_finished(self, result)
+
+
+class SectorLayerBuildTask(QgsTask):
+    """
+    后台由工参生成扇区图层：在工作线程中读取工参、生成扇区几何并写入shp，完成后由QGISCanvasUtils在主线程中输出结果，
+    并触发一次新工参检查，由既有的后台加载流程替换当前扇区图层
+    """
+
+    def __init__(self, parameter_path, transform_context, canvas_util):
+        """
+        :param parameter_path: 工参文件路径
+        :type parameter_path: str
+        :param transform_context: 坐标转换上下文
+        :type transform_context: QgsCoordinateTransformContext
+        :param canvas_util: 接收生成结果的QGISCanvasUtils
+        :type canvas_util: QGISCanvasUtils
+        """
+        super().__init__(f'由{os.path.basename(parameter_path)}生成扇区图层', QgsTask.CanCancel)
+        self.parameter_path = parameter_path
+        self.transform_context = transform_context
+        self.canvas_util = canvas_util
+        self.output_path_list = []
+        self.sector_count_list = []
+        self.skipped_count = 0
+        self.error = ''
+        self.start_time = datetime.datetime.now()
+
+    def run(self):
+        try:
+            result = QGISCanvasUtils.build_sector_layers(self.parameter_path, self.transform_context, task=self)
+        except Exception as e:
+            self.error = str(e)
+            return False
+        if result is None:
+            return False
+        self.output_path_list, self.sector_count_list, self.skipped_count = result
+        return True
+
+    def finished(self, result):
+        self.canvas_util.sector_layer_build_finished(self, result)
+
+
+class DroppedLayerLoadTask(QgsTask):
+    """
+    后台加载拖入的图层：在工作线程中打开并校验图层、计算范围，较大的GeoJSON/CSV边读取边转换为带空间索引的临时GeoPackage，
+    完成后将图层移交主线程，由QGISCanvasUtils加入工程
+    """
+
+    # 超过该大小（字节）的GeoJSON/CSV转换为临时GeoPackage
+    CONVERT_SIZE_THRESHOLD = 50 * 1024 * 1024
+    # CSV中可识别的经纬度列名
+    CSV_COORDINATE_FIELDS = (('经度', '纬度'), ('lon', 'lat'), ('lng', 'lat'), ('longitude', 'latitude'), ('x', 'y'))
+
+    def __init__(self, file_path, canvas_util):
+        """
+        :param file_path: 拖入的文件路径
+        :type file_path: str
+        :param canvas_util: 接收加载结果的QGISCanvasUtils
+        :type canvas_util: QGISCanvasUtils
+        """
+        super().__init__(f'加载{os.path.basename(file_path)}', QgsTask.CanCancel)
+        self.file_path = file_path
+        self.canvas_util = canvas_util
+        self.layer_name = os.path.basename(file_path)
+        self.layer = None
+        self.extent = None
+        self.converted_path = ''
+        self.error = ''
+
+    def run(self):
+        extension = os.path.splitext(self.file_path)[1].lower()
+        if extension == '.csv':
+            layer = QgsVectorLayer(self.get_csv_uri(self.file_path), self.layer_name, "delimitedtext")
+        else:
+            layer = QgsVectorLayer(self.file_path, self.layer_name, "ogr")
+        if not layer.isValid():
+            self.error = f"无法打开{self.file_path}"
+            return False
+        if extension in ('.geojson', '.csv') and layer.isSpatial() and \
+                os.path.getsize(self.file_path) > self.CONVERT_SIZE_THRESHOLD:
+            layer = self.convert_to_geopackage(layer)
+            if layer is None:
+                return False
+        if self.isCanceled():
+            return False
+        self.extent = layer.extent() if layer.isSpatial() else None
+        # 图层在工作线程中创建，需移交主线程后才能加入工程
+        layer.moveToThread(QgsApplication.instance().thread())
+        self.layer = layer
+        return True
+
+    def finished(self, result):
+        self.canvas_util.dropped_layer_load_finished(self, result)
+
+    # 生成CSV文件的delimitedtext数据源
+    def get_csv_uri(self, file_path):
+        """
+        生成CSV文件的delimitedtext数据源：表头中有经纬度列时按EPSG:4326点图层加载，否则按无几何的属性表加载
+        :param file_path: CSV文件路径
+        :type file_path: str
+        :return: 数据源
+        :rtype: str
+        """
+        encoding = 'UTF-8'
+        with open(file_path, 'rb') as f:
+            header_line = f.readline()
+        try:
+            header = header_line.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            encoding = 'GBK'
+            header = header_line.decode('gbk', errors='ignore')
+        field_dict = {field.strip().lower(): field.strip() for field in next(csv.reader([header]), [])}
+        uri = f"{QUrl.fromLocalFile(file_path).toString()}?delimiter=,&encoding={encoding}&spatialIndex=yes"
+        for x_field, y_field in self.CSV_COORDINATE_FIELDS:
+            if x_field in field_dict and y_field in field_dict:
+                return f"{uri}&xField={field_dict[x_field]}&yField={field_dict[y_field]}&crs=EPSG:4326"
+        return f"{uri}&geomType=none"
+
+    # 边读取边转换为临时GeoPackage
+    def convert_to_geopackage(self, layer):
+        """
+        逐要素读取图层并写入临时GeoPackage（GeoPackage默认建立R*Tree空间索引），按读取进度汇报任务进度
+        :param layer: 源图层
+        :type layer: QgsVectorLayer
+        :return: 临时GeoPackage图层，失败或取消时为None
+        :rtype: QgsVectorLayer
+        """
+        output_dir = os.path.join(tempfile.gettempdir(), 'ToBWirelessManager')
+        os.makedirs(output_dir, exist_ok=True)
+        stat = os.stat(self.file_path)
+        source_key = hashlib.sha1(f'{os.path.abspath(self.file_path)}|{stat.st_size}|{stat.st_mtime_ns}'.encode()).hexdigest()
+        self.converted_path = os.path.join(output_dir, f'{os.path.splitext(self.layer_name)[0]}_{source_key[:12]}.gpkg')
+        gpkg_layer_name = os.path.splitext(self.layer_name)[0]
+        # 同一文件再次拖入时直接使用已转换的GeoPackage
+        if os.path.exists(self.converted_path):
+            converted_layer = QgsVectorLayer(f'{self.converted_path}|layername={gpkg_layer_name}', self.layer_name, "ogr")
+            if converted_layer.isValid():
+                return converted_layer
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = 'GPKG'
+        options.layerName = gpkg_layer_name
+        options.fileEncoding = 'UTF-8'
+        partial_path = os.path.splitext(self.converted_path)[0] + '.part.gpkg'
+        writer = QgsVectorFileWriter.create(partial_path, layer.fields(), layer.wkbType(), layer.crs(),
+                                            QgsCoordinateTransformContext(), options)
+        if writer.hasError() != QgsVectorFileWriter.NoError:
+            self.error = writer.errorMessage()
+            return None
+        feature_count = max(layer.featureCount(), 1)
+        feature_buffer = []
+        for index, feature in enumerate(layer.getFeatures()):
+            feature_buffer.append(feature)
+            if len(feature_buffer) >= 5000:
+                writer.addFeatures(feature_buffer)
+                feature_buffer = []
+                if self.isCanceled():
+                    del writer
+                    os.remove(partial_path)
+                    return None
+                self.setProgress(min(99.0, 100 * index / feature_count))
+        writer.addFeatures(feature_buffer)
+        del writer
+        os.replace(partial_path, self.converted_path)
+        return QgsVectorLayer(f'{self.converted_path}|layername={gpkg_layer_name}', self.layer_name, "ogr")
+
+
 class QGISCanvasUtils(QMainWindow):
 
     # 因为气泡扩张算法用到了异步调用，需要配置信号与槽，用于接收方法结束后的数据
@@ -447,6 +849,44 @@ class QGISCanvasUtils(QMainWindow):
         self.transformer_4326_to_32650 = QgsCoordinateTransform(QgsCoordinateReferenceSystem("EPSG:4326"),
                                                                QgsCoordinateReferenceSystem("EPSG:32650"),
                                                                self.qgsProjectInstance)
+        self.project_geometry_cache = ProjectGeometryCache(self.qgsProjectInstance, self.transformer_3857_to_32650)
+        # 分析方法的几何计算后端，'shapely'为数组化批量计算，'qgis'为逐要素计算（Shapely 2不可用时回退）
+        self.geometry_backend = 'shapely' if SHAPELY_AVAILABLE else 'qgis'
+        # 图层Shapely索引缓存，key为(图层id, 属性列名元组)，value为(建立索引时的图层数据版本, 索引)
+        self.shapely_layer_index_dict = {}
+        # 已连接数据变化信号的图层id，要素增删或几何、属性修改时清空该图层的索引缓存
+        self.shapely_layer_watch_set = set()
+        # 栅格覆盖索引模式，开启后扇区相关的相交判定改为查询扇区覆盖栅格（结果为精确结果的超集）
+        self.sector_grid_mode = False
+        self.sector_grid_cell_size = 25
+        self.sector_coverage_grid_dict = {}
+        # 扇区属性列存储，按图层名称缓存
+        self.sector_attribute_store_dict = {}
+        # 距离场模式，开启后冗余度评估通过项目距离场（欧氏距离变换）批量获取扇区距离，scipy不可用时不生效
+        self.distance_field_mode = False
+        self.distance_field_cell_size = 20
+        # 项目六边形索引最近一次更新时的数据库版本，版本未变化时无需检查
+        self.project_hex_index_version = None
+        # 气泡扩散结果缓存，现有项目重复评估时直接使用缓存结果
+        self.bubble_result_cache = BubbleResultCache()
+        # 工参历史版本库，按版本保存扇区变化，用于查询退网时间和历史比对
+        self.parameter_history = ParameterHistoryStore(self.conn)
+        # 工参目录监视，新工参文件在后台加载后替换图层；复制文件期间目录会连续变化，延时合并后再检查
+        self.parameter_file_watcher = None
+        self.parameter_watch_timer = QTimer(self)
+        self.parameter_watch_timer.setSingleShot(True)
+        self.parameter_watch_timer.setInterval(10000)
+        self.parameter_watch_timer.timeout.connect(self.check_new_parameter_file)
+        self.parameter_file_size_dict = {}
+        # 工参快照目录正在写连接中后台更新
+        self.parameter_catalog_updating = False
+        self.sector_layer_load_task_dict = {}
+        # 扇区六边形索引的后台重建任务，key为图层名称
+        self.sector_hex_index_task_dict = {}
+        # 拖入图层的后台加载任务
+        self.dropped_layer_load_task_list = []
+        # 由工参生成扇区图层的后台任务
+        self.sector_layer_build_task_list = []
 
     # 基于给定的sector_cgi_list，搜索宏站和室分图层中所有的匹配元素，并进行高亮
     def add_temp_sector_layer_in_canvas(self, layer_name, sector_cgi_list, properties_fill, zoom_to_layer=False):
@@ -548,7 +988,8 @@ class QGISCanvasUtils(QMainWindow):
         return marker_to_add
 
     # 气泡扩张算法主函数，根据输入的项目信息，通过气泡扩张获取区域内和区域周边的主服务小区列表
-    def algorithm_bubble_expand(self, evaluate_project_name, new_project_flag, bubble_step=40, max_bubble_size=3000):
+    def algorithm_bubble_expand(self, evaluate_project_name, new_project_flag, bubble_step=40,
+                                max_bubble_size=BUBBLE_MAX_SIZE_DEFAULT):
         """
         气泡扩张算法主函数，根据输入的项目信息，通过气泡扩张获取区域内和区域周边的主服务小区列表
         :param evaluate_project_name: 评估的项目名称，如果是新项目，则不起作用
@@ -572,6 +1013,23 @@ class QGISCanvasUtils(QMainWindow):
         layer_bts = self.qgsProjectInstance.mapLayersByName("宏站扇区图层")[0]
         # layer_dbs = self.qgsProjectInstance.mapLayersByName("室分扇区图层")[0]
 
+        # 现有项目的项目几何、工参、分析模式和参数均未变化时，直接使用缓存结果，在相交计算和离散化之前查询，命中时不再处理项目几何
+        bubble_cache_key = ''
+        if not new_project_flag:
+            geometry_project = self.project_geometry_cache.get_geometry(evaluate_project_name)
+            if geometry_project:
+                parameter_identity = self.get_parameter_identity()
+                bubble_cache_key = self.bubble_result_cache.make_key(bytes(geometry_project.asWkb()), bubble_step,
+                                                                     max_bubble_size,
+                                                                     'grid' if self.sector_grid_mode else '')
+                bubble_cache_result = self.bubble_result_cache.get(bubble_cache_key, parameter_identity)
+                if bubble_cache_result and self.set_canvas_extend_to_project(evaluate_project_name):
+                    self.mainWindow.log_text_field_update(
+                        f"项目几何与工参均未变化，使用气泡扩散缓存结果，最终扩散距离{bubble_cache_result[0]}米")
+                    self.bubble_expand_finished_signal.emit(evaluate_project_name, *bubble_cache_result)
+                    return
+                bubble_extent = geometry_project.boundingBox().buffered(max_bubble_size * 1.3)
+
         # 先获取区域内所有的小区列表(仅对面状场景）
         evaluate_project_type = self.sql_util.get_project_type(self.conn, evaluate_project_name)
 
@@ -671,7 +1129,11 @@ class QGISCanvasUtils(QMainWindow):
                     self.mapCanvas.refresh()
 
                     # 新建一个方法，与polygon_intersects类似，但是返回一个key是相交的小区号，value是相交的bubble num的list
-                    cellid_bubble_intersect_dict = self.get_sector_dict_intersects_bubble('宏站扇区图层', '临时气泡图层')
+                    if self.sector_grid_mode:
+                        cellid_bubble_intersect_dict = self.get_sector_dict_intersects_bubble_by_grid('宏站扇区图层',
+                                                                                                      points, bubble_size)
+                    else:
+                        cellid_bubble_intersect_dict = self.get_sector_dict_intersects_bubble('宏站扇区图层', '临时气泡图层')
 
                     # 判断返回的列表里，不属于inner cellid的部分，删除对应的bubble，同时将该ci加入列表中
                     bubble_to_del_num = []
@@ -740,6 +1202,12 @@ class QGISCanvasUtils(QMainWindow):
                         # print(outer_cellid_without_plmn)
                         # print(outer_cgi)
                         # print(outer_group_id)
+                        if bubble_cache_key:
+                            self.bubble_result_cache.put(bubble_cache_key, evaluate_project_name, parameter_identity,
+                                                         bubble_step, max_bubble_size, int(bubble_size / 1.3),
+                                                         intersects_cgi, outer_cgi,
+                                                         (bubble_extent.xMinimum(), bubble_extent.yMinimum(),
+                                                          bubble_extent.xMaximum(), bubble_extent.yMaximum()))
                         self.bubble_expand_finished_signal.emit(evaluate_project_name, int(bubble_size / 1.3), intersects_cgi, outer_cgi)
 
                 # 创建定时器
@@ -759,7 +1227,7 @@ class QGISCanvasUtils(QMainWindow):
     def create_layer_from_wkt(self, wkt_dict_list, wkt_type, layer_name):
         """
         对于给定的wkt字典组成的列表，根据已知的wkt格式，生成对应图层
-        :param wkt_dict_list: wkt字典组成的列表，列表内每个元素为一个dict，该dict至少包含一个key为wkt的键值对
+        :param wkt_dict_list: wkt字典组成的列表，列表内每个元素为一个dict，该dict至少包含一个key为wkt或wkb的键值对，存在wkb时直接读取二进制几何
         :type wkt_dict_list: list
         :param wkt_type: 1.Point,2.LineString,3.Polygon,4.MultiPoint,5.MultiLineString,6.MultiPolygon建议仅使用4,5,6，对于1,2,3将无条件转化
         :type wkt_type: int
@@ -788,14 +1256,18 @@ class QGISCanvasUtils(QMainWindow):
             provider = layer.dataProvider()
             fields_to_add = []
             for field_name in wkt_dict_list[0].keys() :
-                if field_name != 'wkt':
+                if field_name not in ('wkt', 'wkb'):
                     fields_to_add.append(QgsField(field_name, QVariant.String))
             provider.addAttributes(fields_to_add)
             layer.updateFields()
             layer.startEditing()
 
             for wkt_dict in wkt_dict_list :
-                geometry = QgsGeometry.fromWkt(wkt_dict['wkt'])
+                if 'wkb' in wkt_dict:
+                    geometry = QgsGeometry()
+                    geometry.fromWkb(wkt_dict['wkb'])
+                else:
+                    geometry = QgsGeometry.fromWkt(wkt_dict['wkt'])
                 if geometry.isEmpty() or not geometry.isGeosValid():
                     #print(f'无效的WKT格式或几何形状{wkt_dict['项目名称']}')
                     self.log_text_field_update(f'项目[{wkt_dict['项目名称']}]无法生成有效的WKT几何形状',2)
@@ -807,7 +1279,7 @@ class QGISCanvasUtils(QMainWindow):
 
                 attributes = []
                 for key in wkt_dict.keys():
-                    if key != 'wkt':
+                    if key not in ('wkt', 'wkb'):
                         attributes.append(str(wkt_dict[key]))
                 #print(attributes)
                 feature.setAttributes(attributes)
@@ -932,19 +1404,7 @@ class QGISCanvasUtils(QMainWindow):
         :return:项目地理信息
         :rtype:QgsGeometry
         """
-        project_layer_name_list = ['ToB项目图层_面',"ToB项目图层_线","ToB项目图层_点"]
-        for project_layer_name in project_layer_name_list:
-            layer = self.qgsProjectInstance.mapLayersByName(project_layer_name)[0]
-            if layer:
-                expression = QgsExpression(f'"项目名称" = \'{project_name}\'')
-                request = QgsFeatureRequest(expression)
-                features = list(layer.getFeatures(request))
-                if features:
-                    geometry = features[0].geometry()
-                    return geometry
-                else:
-                    continue
-        return None
+        return self.project_geometry_cache.get_geometry(project_name)
 
 
     # 判定两个图层的相交部分，将source_polygon中与compare_polygon中相交的多边形的feature封装为一个list返回
@@ -983,6 +1443,35 @@ class QGISCanvasUtils(QMainWindow):
         else:
             features_compare = layer_compare_polygon.getFeatures()
 
+        if self.sector_grid_mode and layer_name_of_source_polygon in ('宏站扇区图层', '室分扇区图层'):
+            sector_grid = self.get_sector_coverage_grid(layer_name_of_source_polygon)
+            source_fid_list = []
+            for feature_compare in features_compare:
+                geometry_compare = feature_compare.geometry()
+                if layer_compare_polygon.crs().authid() == 'EPSG:4326':
+                    geometry_compare.transform(self.transformer_4326_to_3857)
+                sector_ids = sector_grid.query_polygon(bytes(geometry_compare.asWkb()))
+                source_fid_list.extend(sector_grid.sector_fid[sector_ids].tolist())
+            request_source = QgsFeatureRequest().setFilterFids(list(set(source_fid_list)))
+            feature_source_dict = {feature.id(): feature for feature in layer_source_polygon.getFeatures(request_source)}
+            return [feature_source_dict[source_fid] for source_fid in source_fid_list if source_fid in feature_source_dict]
+
+        if self.geometry_backend == 'shapely':
+            compare_wkb_list = []
+            for feature_compare in features_compare:
+                geometry_compare = feature_compare.geometry()
+                if crs_trans_flag == 2:
+                    geometry_compare.transform(self.transformer_3857_to_4326)
+                elif crs_trans_flag == 1:
+                    geometry_compare.transform(self.transformer_4326_to_3857)
+                compare_wkb_list.append(bytes(geometry_compare.asWkb()))
+            shapely_index_source = self.get_shapely_layer_index(layer_source_polygon)
+            _, source_index = shapely_index_source.query(compare_wkb_list)
+            source_fid_list = shapely_index_source.keys[source_index].tolist()
+            request_source = QgsFeatureRequest().setFilterFids(list(set(source_fid_list)))
+            feature_source_dict = {feature.id(): feature for feature in layer_source_polygon.getFeatures(request_source)}
+            return [feature_source_dict[source_fid] for source_fid in source_fid_list]
+
         # 建立快速索引
         spatial_index_source = QgsSpatialIndex(layer_source_polygon.getFeatures())
 
@@ -1099,27 +1588,9 @@ class QGISCanvasUtils(QMainWindow):
         request = QgsFeatureRequest(expression)
         features_project = list(layer.getFeatures(request))
         if features_project:
-            geometry = features_project[0].geometry()
-            if geometry.isMultipart():
-                polygons = geometry.asMultiPolygon()
-            else:
-                polygons = [geometry.asPolygon()]
-                #print(polygons)
-            points = []
-            for polygon in polygons:
-                boundary = polygon[0]
-                line_geom = QgsGeometry.fromPolylineXY(boundary)
-                total_length = line_geom.length()
-                distance = 0
-                while distance < total_length:
-                    # 在指定距离处获取点
-                    point = line_geom.interpolate(distance)
-                    points.append(point)
-                    # 移动到下一个间隔
-                    distance += point_interval
-                # 添加最后一个点（确保包含终点）
-                points.append(line_geom.interpolate(total_length))
-            return points
+            # 外环和内环（多面的每个部件）一次性向量化采样
+            points_array = GeometryUtils.densify_wkb(bytes(features_project[0].geometry().asWkb()), point_interval)
+            return [QgsGeometry.fromPointXY(QgsPointXY(x, y)) for x, y in points_array]
         else:
             return None
 
@@ -1143,15 +1614,9 @@ class QGISCanvasUtils(QMainWindow):
         request = QgsFeatureRequest(expression)
         features_project = list(layer.getFeatures(request))
         if features_project:
-            line_geom = features_project[0].geometry()
-            line_length = line_geom.length()
-            points = []
-            distance = 0
-            while distance < line_length:
-                point = line_geom.interpolate(distance)
-                points.append(point)
-                distance += 100  # 增加100米
-            return points
+            # 多线的每个部件一次性向量化采样，包含各部件终点
+            points_array = GeometryUtils.densify_wkb(bytes(features_project[0].geometry().asWkb()), point_interval)
+            return [QgsGeometry.fromPointXY(QgsPointXY(x, y)) for x, y in points_array]
         else:
             return None
 
@@ -1184,13 +1649,848 @@ class QGISCanvasUtils(QMainWindow):
             return None
 
     def get_distance_from_polygon_to_project(self, geometry_polygon, project_name):
-        geometry_project = self.get_project_geometry_by_name(project_name)
-        if geometry_project:
-            geometry_project.transform(self.transformer_3857_to_32650)
-            return int(geometry_polygon.distance(geometry_project))
+        """
+        计算EPSG:32650几何与项目之间的最小距离，项目几何来自项目几何缓存
+        :param geometry_polygon: EPSG:32650几何
+        :type geometry_polygon: QgsGeometry
+        :param project_name: 项目名称
+        :type project_name: str
+        :return: 距离（米），项目无地理化信息时返回-1
+        :rtype: int
+        """
+        distance = self.project_geometry_cache.get_distance(geometry_polygon, project_name)
+        if distance is not None:
+            return int(distance)
+        else:
+            return -1
+
+    def get_distance_list_from_polygons_to_project(self, geometry_polygon_list, project_name):
+        """
+        批量计算一组EPSG:32650几何与项目之间的最小距离，Shapely后端下以数组方式一次性计算
+        :param geometry_polygon_list: 一组EPSG:32650几何
+        :type geometry_polygon_list: list[QgsGeometry]
+        :param project_name: 项目名称
+        :type project_name: str
+        :return: 距离（米）列表，项目无地理化信息时均为-1
+        :rtype: list[int]
+        """
+        if self.geometry_backend == 'shapely':
+            geometry_project = self.project_geometry_cache.get_geometry(project_name, True)
+            if not geometry_project:
+                return [-1] * len(geometry_polygon_list)
+            distance_list = ShapelyUtils.distance_list_to_geometry(
+                [bytes(geometry_polygon.asWkb()) for geometry_polygon in geometry_polygon_list],
+                bytes(geometry_project.asWkb()))
+            return [int(distance) for distance in distance_list]
+        return [self.get_distance_from_polygon_to_project(geometry_polygon, project_name)
+                for geometry_polygon in geometry_polygon_list]
+
+    def get_distance_list_from_polygons_to_project_by_field(self, geometry_polygon_list, project_name, threshold):
+        """
+        距离场模式下批量计算一组EPSG:32650几何与项目之间的最小距离：项目只栅格化一次并做欧氏距离变换，
+        扇区距离从其所在格网读取；与阈值之差在容差内或超出距离场窗口的几何回退到精确计算，保证按阈值分类的结果与精确计算一致
+        :param geometry_polygon_list: 一组EPSG:32650几何
+        :type geometry_polygon_list: list[QgsGeometry]
+        :param project_name: 项目名称
+        :type project_name: str
+        :param threshold: 冗余判定阈值（米）
+        :type threshold: float
+        :return: 距离（米）列表，项目无地理化信息时均为-1
+        :rtype: list[int]
+        """
+        geometry_project = self.project_geometry_cache.get_geometry(project_name, True)
+        if not SCIPY_AVAILABLE or not geometry_project or not geometry_polygon_list:
+            return self.get_distance_list_from_polygons_to_project(geometry_polygon_list, project_name)
+        tolerance = ProjectDistanceField.get_tolerance(self.distance_field_cell_size)
+        distance_field = ProjectDistanceField(bytes(geometry_project.asWkb()), threshold + 2 * tolerance,
+                                              self.distance_field_cell_size)
+        distance_list, exact_index_list = distance_field.get_distance_list(
+            [bytes(geometry_polygon.asWkb()) for geometry_polygon in geometry_polygon_list], threshold)
+        exact_distance_list = self.get_distance_list_from_polygons_to_project(
+            [geometry_polygon_list[i] for i in exact_index_list], project_name)
+        for i, exact_distance in zip(exact_index_list, exact_distance_list):
+            distance_list[i] = exact_distance
+        self.mainWindow.log_text_field_update(
+            f"距离场评估完成，{len(geometry_polygon_list)}个扇区中{len(exact_index_list)}个处于容差带或窗口外，已按精确方法复核")
+        return [int(distance) for distance in distance_list]
+
+    def update_project_hex_index(self, callback=None):
+        """
+        为尚未建立六边形索引的项目（新增项目或几何被修改过的项目）建立六边形索引，几何取自项目几何缓存（EPSG:32650），
+        待建索引项目的查询与索引的写入均通过异步访问层完成，不在主线程连接上等待写锁；完成后在主线程中回调
+        :param callback: 索引更新完成（或无需更新、写入失败）后的回调，参数为本次建立索引的项目数量
+        :type callback: function
+        :return: None
+        """
+        # 其他连接提交修改时data_version变化，本连接修改时total_changes变化，项目图层重建时项目几何缓存的generation变化
+        data_version = (self.conn.execute("PRAGMA data_version").fetchone()[0], self.conn.total_changes,
+                        self.project_geometry_cache.generation)
+        if data_version == self.project_hex_index_version:
+            if callback:
+                callback(0)
+            return
+        self.sql_util.create_hex_index_tables(self.conn)
+        self.mainWindow.async_db.read(
+            SqliteUtils.get_project_list_without_hex_index,
+            callback=lambda project_list: self.update_project_hex_index_write(data_version, project_list, callback),
+            error_callback=lambda error: self.update_project_hex_index_failed(error, callback))
+
+    # 计算待建索引项目的六边形索引，通过异步访问层的写连接写入数据库
+    def update_project_hex_index_write(self, data_version, project_list, callback):
+        """
+        在主线程中计算待建索引项目的六边形索引（项目几何缓存只能在主线程访问），通过异步访问层的写连接写入数据库，
+        写入完成后记录开始检查时的数据库版本（本次写入会使版本再变化一次，下次检查时查询为空即可确认）
+        :param data_version: 开始检查时的数据库版本
+        :type data_version: tuple
+        :param project_list: 尚未建立六边形索引的项目
+        :type project_list: list[str]
+        :param callback: 完成后的回调，参数为本次建立索引的项目数量
+        :type callback: function
+        :return: None
+        """
+        hex_row_list_dict = {}
+        for project_name in project_list:
+            geometry_project = self.project_geometry_cache.get_geometry(project_name, True)
+            if not geometry_project or geometry_project.isEmpty():
+                continue
+            hex_cells_dict = HexUtils.wkb_to_cells(bytes(geometry_project.asWkb()))
+            hex_row_list_dict[project_name] = [(resolution, int(hex_cell)) for resolution, hex_cells in
+                                               hex_cells_dict.items() for hex_cell in hex_cells]
+
+        def write_finished(_):
+            self.project_hex_index_version = data_version
+            if callback:
+                callback(len(hex_row_list_dict))
+
+        if not hex_row_list_dict:
+            write_finished(None)
+            return
+        self.mainWindow.async_db.write(SqliteUtils.replace_project_hex_index, hex_row_list_dict,
+                                       callback=write_finished,
+                                       error_callback=lambda error: self.update_project_hex_index_failed(error, callback))
+
+    # 项目六边形索引更新失败，记录日志后继续回调，调用方按无索引处理
+    def update_project_hex_index_failed(self, error, callback):
+        self.mainWindow.log_text_field_update(f"项目六边形索引更新失败：{error}", 3)
+        if callback:
+            callback(0)
+
+    def update_sector_hex_index(self, layer_name_of_sector_polygon):
+        """
+        检查扇区图层的六边形索引是否与当前工参一致，不一致时提交后台重建任务（工参比对的增量更新无法覆盖时，例如首次建立索引），
+        重建期间不阻塞界面，调用方应跳过依赖该索引的预筛选
+        :param layer_name_of_sector_polygon: 扇区图层名称
+        :type layer_name_of_sector_polygon: str
+        :return: 索引是否可用
+        :rtype: bool
+        """
+        layers = self.qgsProjectInstance.mapLayersByName(layer_name_of_sector_polygon)
+        if not layers:
+            return False
+        self.sql_util.create_hex_index_tables(self.conn)
+        source_path = layers[0].source().split('|')[0]
+        if not os.path.exists(source_path):
+            return False
+        source = json.dumps(SectorCoverageGrid.get_source_identity(source_path), ensure_ascii=False)
+        if self.sql_util.get_sector_hex_index_source(self.conn, layer_name_of_sector_polygon) == source:
+            return True
+        running_task = self.sector_hex_index_task_dict.get(layer_name_of_sector_polygon)
+        if running_task is not None and running_task.source == source:
+            return False
+        task = SectorHexIndexTask(layer_name_of_sector_polygon, source_path, source,
+                                  self.qgsProjectInstance.transformContext(), self)
+        self.sector_hex_index_task_dict[layer_name_of_sector_polygon] = task
+        QgsApplication.taskManager().addTask(task)
+        self.mainWindow.log_text_field_update(f"正在后台重建{layer_name_of_sector_polygon}六边形索引")
+        return False
+
+    # 扇区六边形索引后台计算完成，通过异步访问层的写连接写入数据库
+    def sector_hex_index_task_finished(self, task, result):
+        """
+        扇区六边形索引后台计算完成后，通过异步访问层的写连接在一个事务内替换该图层的索引
+        :param task: 后台重建任务
+        :type task: SectorHexIndexTask
+        :param result: 是否计算成功
+        :type result: bool
+        :return: None
+        """
+        if self.sector_hex_index_task_dict.get(task.layer_name) is task:
+            del self.sector_hex_index_task_dict[task.layer_name]
+        if not result:
+            self.mainWindow.log_text_field_update(f"{task.layer_name}六边形索引重建失败：{task.error or '任务已取消'}", 3)
+            return
+        self.mainWindow.async_db.write(
+            SqliteUtils.replace_sector_hex_index, task.layer_name, task.source, task.hex_row_list,
+            callback=lambda _: self.mainWindow.log_text_field_update(
+                f"已完成{task.layer_name}六边形索引重建，共{len(task.hex_row_list)}条"),
+            error_callback=lambda error: self.mainWindow.log_text_field_update(
+                f"{task.layer_name}六边形索引写入失败：{error}", 3))
+
+    # 计算扇区图层的扇区指纹
+    @staticmethod
+    def get_sector_fingerprint(layer_sector_polygon, task=None):
+        """
+        计算扇区图层的扇区指纹（几何哈希、属性哈希、Group ID和外包框），不访问数据库，可在工作线程中执行
+        :param layer_sector_polygon: 扇区图层
+        :type layer_sector_polygon: QgsVectorLayer
+        :param task: 所在的后台任务，用于汇报进度和响应取消
+        :type task: QgsTask
+        :return: (扇区指纹字典，key为唯一标识；要素字典，value为(要素id, 几何)；唯一标识是否重复)
+        :rtype: tuple[dict, dict, bool]
+        """
+        fingerprint_dict = {}
+        feature_dict = {}
+        duplicate_flag = False
+        feature_count = max(layer_sector_polygon.featureCount(), 1)
+        for index, feature in enumerate(layer_sector_polygon.getFeatures()):
+            if task is not None and index % 1000 == 0:
+                if task.isCanceled():
+                    break
+                task.setProgress(100 * index / feature_count)
+            geometry = feature.geometry()
+            if geometry.isEmpty():
+                continue
+            cgi = feature['唯一标识']
+            if cgi in fingerprint_dict:
+                duplicate_flag = True
+            group_id = feature['Group ID']
+            if not group_id or (isinstance(group_id, (int, float)) and group_id < 0):
+                group_id = 0
+            wkb = bytes(geometry.asWkb())
+            bbox = geometry.boundingBox()
+            fingerprint_dict[cgi] = (
+                hashlib.sha1(wkb).hexdigest(),
+                hashlib.sha1(json.dumps(feature.attributes(), ensure_ascii=False, default=str).encode()).hexdigest(),
+                f'{group_id}', bbox.xMinimum(), bbox.yMinimum(), bbox.xMaximum(), bbox.yMaximum())
+            feature_dict[cgi] = (feature.id(), geometry)
+        return fingerprint_dict, feature_dict, duplicate_flag
+
+    # 工参文件更新后与上一版工参比对
+    def update_sector_parameter_diff(self, fingerprint_result_dict=None):
+        """
+        工参文件更新后与上一版工参按唯一标识及几何、属性哈希进行比对，得到新增、删除、修改的扇区并输出日志，
+        之后仅对受影响的扇区增量更新六边形索引和覆盖栅格索引，并将不受影响的气泡扩散缓存结果沿用至新工参
+        扇区指纹保存在数据库中，首次运行时仅建立指纹；唯一标识重复时不做增量更新，各索引在使用时全量重建
+        :param fingerprint_result_dict: 已计算的扇区指纹，key为图层名称，value为get_sector_fingerprint的返回值
+        :type fingerprint_result_dict: dict
+        :return: None
+        """
+        self.sql_util.create_sector_fingerprint_tables(self.conn)
+        self.sql_util.create_hex_index_tables(self.conn)
+        old_identity_dict = {}
+        carry_over_flag = True
+        changed_flag = False
+        changed_extent_list = []
+        changed_cgi_set = set()
+        for layer_name in ('宏站扇区图层', '室分扇区图层'):
+            layers = self.qgsProjectInstance.mapLayersByName(layer_name)
+            if not layers:
+                continue
+            layer_sector_polygon = layers[0]
+            source_path = layer_sector_polygon.source().split('|')[0]
+            if not os.path.exists(source_path):
+                carry_over_flag = False
+                continue
+            source_identity = SectorCoverageGrid.get_source_identity(source_path)
+            source = json.dumps(source_identity, ensure_ascii=False)
+            old_source = self.sql_util.get_sector_fingerprint_source(self.conn, layer_name)
+            old_identity_dict[layer_name] = json.loads(old_source) if old_source else None
+            if old_source == source:
+                # 工参未变化，历史版本库中尚无该图层时以当前工参作为首个版本
+                if not self.parameter_history.get_version_list(layer_name):
+                    fingerprint_dict, feature_dict, _ = self.get_sector_fingerprint(layer_sector_polygon)
+                    self.record_parameter_history(layer_name, layer_sector_polygon, source_path, fingerprint_dict,
+                                                  feature_dict)
+                continue
+
+            # 计算新工参的扇区指纹，后台加载新工参时已在工作线程中计算
+            transform_flag = layer_sector_polygon.crs().authid() == 'EPSG:4326'
+            if fingerprint_result_dict and layer_name in fingerprint_result_dict:
+                fingerprint_dict, feature_dict, duplicate_flag = fingerprint_result_dict[layer_name]
+            else:
+                fingerprint_dict, feature_dict, duplicate_flag = self.get_sector_fingerprint(layer_sector_polygon)
+            self.record_parameter_history(layer_name, layer_sector_polygon, source_path, fingerprint_dict, feature_dict)
+            if not old_source:
+                self.sql_util.replace_sector_fingerprint(self.conn, layer_name, source, fingerprint_dict)
+                self.mainWindow.log_text_field_update(f"已建立{layer_name}扇区指纹，共{len(fingerprint_dict)}个扇区")
+                carry_over_flag = False
+                continue
+
+            # 与上一版工参比对
+            old_fingerprint_dict = self.sql_util.get_sector_fingerprint_dict(self.conn, layer_name)
+            added_cgi_set = fingerprint_dict.keys() - old_fingerprint_dict.keys()
+            removed_cgi_set = old_fingerprint_dict.keys() - fingerprint_dict.keys()
+            modified_cgi_set = {cgi for cgi in fingerprint_dict.keys() & old_fingerprint_dict.keys()
+                                if fingerprint_dict[cgi][:2] != old_fingerprint_dict[cgi][:2]}
+            changed_flag = True
+            self.mainWindow.log_text_field_update(
+                f"{layer_name}工参比对：新增{len(added_cgi_set)}个、删除{len(removed_cgi_set)}个、修改{len(modified_cgi_set)}个扇区，"
+                f"未变化{len(fingerprint_dict) - len(added_cgi_set) - len(modified_cgi_set)}个")
+            for diff_name, cgi_set in (('新增', added_cgi_set), ('删除', removed_cgi_set), ('修改', modified_cgi_set)):
+                if cgi_set:
+                    cgi_text = '、'.join(sorted(cgi_set)[:10])
+                    self.mainWindow.log_text_field_update(
+                        f"{diff_name}扇区：{cgi_text}{f'等{len(cgi_set)}个' if len(cgi_set) > 10 else ''}", 2)
+
+            # 受影响范围（新旧几何的外包框，EPSG:3857）和受影响小区（变化扇区及与其同Group ID的扇区）
+            layer_extent_list = []
+            affected_group_id_set = set()
+            for cgi in removed_cgi_set | modified_cgi_set:
+                layer_extent_list.append(old_fingerprint_dict[cgi][3:])
+                affected_group_id_set.add(old_fingerprint_dict[cgi][2])
+            for cgi in added_cgi_set | modified_cgi_set:
+                layer_extent_list.append(fingerprint_dict[cgi][3:])
+                affected_group_id_set.add(fingerprint_dict[cgi][2])
+            for extent in layer_extent_list:
+                if transform_flag:
+                    rectangle = self.transformer_4326_to_3857.transformBoundingBox(QgsRectangle(*extent))
+                    extent = (rectangle.xMinimum(), rectangle.yMinimum(), rectangle.xMaximum(), rectangle.yMaximum())
+                changed_extent_list.append(extent)
+            affected_group_id_set.discard('0')
+            changed_cgi_set |= added_cgi_set | removed_cgi_set | modified_cgi_set
+            changed_cgi_set |= {cgi for cgi, fingerprint in fingerprint_dict.items() if fingerprint[2] in affected_group_id_set}
+            changed_cgi_set |= {cgi for cgi, fingerprint in old_fingerprint_dict.items() if fingerprint[2] in affected_group_id_set}
+
+            if not duplicate_flag:
+                update_cgi_list = sorted(added_cgi_set | modified_cgi_set)
+                removed_cgi_list = sorted(removed_cgi_set | modified_cgi_set)
+                # 增量更新六边形索引
+                if self.sql_util.get_sector_hex_index_source(self.conn, layer_name) == old_source:
+                    transformer_to_32650 = QgsCoordinateTransform(layer_sector_polygon.crs(),
+                                                                  QgsCoordinateReferenceSystem("EPSG:32650"),
+                                                                  self.qgsProjectInstance)
+                    hex_row_list = []
+                    for cgi in update_cgi_list:
+                        geometry = QgsGeometry(feature_dict[cgi][1])
+                        geometry.transform(transformer_to_32650)
+                        for resolution, hex_cells in HexUtils.wkb_to_cells(bytes(geometry.asWkb())).items():
+                            hex_row_list.extend((cgi, resolution, int(hex_cell)) for hex_cell in hex_cells)
+                    self.sql_util.update_sector_hex_index(self.conn, layer_name, source, removed_cgi_list, hex_row_list)
+                    self.mainWindow.log_text_field_update(f"已增量更新{layer_name}六边形索引，重算{len(update_cgi_list)}个扇区")
+                # 增量更新覆盖栅格索引
+                sector_grid = SectorCoverageGrid(os.path.join('data', 'grid_index', layer_name),
+                                                 self.sector_grid_cell_size)
+                if sector_grid.is_valid_for_identity(old_identity_dict[layer_name], 'EPSG:3857'):
+                    sector_grid.load()
+                    wkb_list = []
+                    group_id_list = []
+                    for cgi in update_cgi_list:
+                        geometry = QgsGeometry(feature_dict[cgi][1])
+                        if transform_flag:
+                            geometry.transform(self.transformer_4326_to_3857)
+                        wkb_list.append(bytes(geometry.asWkb()))
+                        group_id_list.append(fingerprint_dict[cgi][2])
+                    cell_count = sector_grid.update(source_path, removed_cgi_list, wkb_list, update_cgi_list, group_id_list,
+                                                    [feature_dict[cgi][0] for cgi in update_cgi_list],
+                                                    {cgi: feature_value[0] for cgi, feature_value in feature_dict.items()})
+                    self.sector_coverage_grid_dict.pop(layer_name, None)
+                    if cell_count >= 0:
+                        self.mainWindow.log_text_field_update(
+                            f"已增量更新{layer_name}覆盖栅格索引，重算{len(update_cgi_list)}个扇区，覆盖格网{cell_count}个")
+            self.sql_util.replace_sector_fingerprint(self.conn, layer_name, source, fingerprint_dict)
+
+        # 增量更新无法覆盖时（首次建立或唯一标识重复），在后台全量重建六边形索引
+        for layer_name in ('宏站扇区图层', '室分扇区图层'):
+            self.update_sector_hex_index(layer_name)
+
+        # 沿用不受影响的气泡扩散缓存结果
+        if changed_flag and carry_over_flag and all(old_identity_dict.values()):
+            old_parameter_identity = json.dumps(old_identity_dict, ensure_ascii=False, sort_keys=True)
+            kept_count, invalid_count = self.bubble_result_cache.carry_over(
+                old_parameter_identity, self.get_parameter_identity(), changed_extent_list, changed_cgi_set)
+            self.mainWindow.log_text_field_update(f"气泡扩散缓存沿用{kept_count}条，受工参变化影响失效{invalid_count}条")
+
+    # 后台加载拖入的图层
+    def load_dropped_layer(self, file_path):
+        """
+        提交拖入图层的后台加载任务，加载完成后加入工程并缩放至图层范围
+        :param file_path: 文件路径
+        :type file_path: str
+        :return: None
+        """
+        task = DroppedLayerLoadTask(file_path, self)
+        task.progressChanged.connect(lambda progress: self.dropped_layer_load_progress())
+        self.dropped_layer_load_task_list.append(task)
+        QgsApplication.taskManager().addTask(task)
+        self.mainWindow.log_text_field_update(f"正在后台加载{task.layer_name}")
+        self.dropped_layer_load_progress()
+
+    # 更新拖入图层的加载进度，显示全部加载中任务的平均进度
+    def dropped_layer_load_progress(self):
+        if self.dropped_layer_load_task_list:
+            progress = sum(task.progress() for task in self.dropped_layer_load_task_list) / len(self.dropped_layer_load_task_list)
+            self.mainWindow.statusbar_progress_update(int(progress))
         else:
+            self.mainWindow.statusbar_progress_update(-1)
+
+    # 拖入图层加载完成，在主线程中加入工程
+    def dropped_layer_load_finished(self, task, result):
+        """
+        拖入图层加载完成后在主线程中加入工程，按图层实际坐标系将范围转换至画布坐标系后缩放
+        :param task: 后台加载任务
+        :type task: DroppedLayerLoadTask
+        :param result: 是否加载成功
+        :type result: bool
+        :return: None
+        """
+        if task in self.dropped_layer_load_task_list:
+            self.dropped_layer_load_task_list.remove(task)
+        self.dropped_layer_load_progress()
+        if not result:
+            self.mainWindow.log_text_field_update(f"{task.layer_name}加载失败：{task.error or '任务已取消'}", 3)
+            return
+        self.qgsProjectInstance.addMapLayer(task.layer)
+        converted_text = f"，已转换为临时GeoPackage：{task.converted_path}" if task.converted_path else ''
+        self.mainWindow.log_text_field_update(f"已加载{task.layer_name}，要素{task.layer.featureCount()}个{converted_text}")
+        if task.extent is not None and not task.extent.isEmpty():
+            transformer = QgsCoordinateTransform(task.layer.crs(), self.mapCanvas.mapSettings().destinationCrs(),
+                                                 self.qgsProjectInstance)
+            self.mapCanvas.setExtent(transformer.transformBoundingBox(task.extent))
+            self.mapCanvas.refresh()
+
+    # 将当前工参登记至工参历史版本库
+    def record_parameter_history(self, layer_name, layer_sector_polygon, source_path, fingerprint_dict, feature_dict):
+        """
+        将当前工参登记至工参历史版本库，工参日期、序号和内容哈希取自工参快照目录，未登记在目录中的工参文件不记录历史
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :param layer_sector_polygon: 扇区图层
+        :type layer_sector_polygon: QgsVectorLayer
+        :param source_path: 工参文件路径
+        :type source_path: str
+        :param fingerprint_dict: 扇区指纹，key为唯一标识
+        :type fingerprint_dict: dict
+        :param feature_dict: key为唯一标识，value为(要素id, 几何)
+        :type feature_dict: dict
+        :return: None
+        """
+        snapshot_list = [snapshot for snapshot in self.sql_util.get_parameter_snapshot_list(self.conn, layer_name)
+                         if os.path.abspath(snapshot['路径']) == os.path.abspath(source_path)]
+        if not snapshot_list:
+            return
+        field_names = layer_sector_polygon.fields().names()
+
+        def load_sector(cgi):
+            feature = layer_sector_polygon.getFeature(feature_dict[cgi][0])
+            return bytes(feature_dict[cgi][1].asWkb()), dict(zip(field_names, feature.attributes()))
+
+        result = self.parameter_history.record_snapshot(
+            layer_name, snapshot_list[0]['日期'], snapshot_list[0]['序号'], snapshot_list[0]['内容哈希'],
+            {cgi: fingerprint[:2] for cgi, fingerprint in fingerprint_dict.items()}, load_sector)
+        if result:
+            self.mainWindow.log_text_field_update(
+                f"{layer_name}工参{snapshot_list[0]['日期']}已登记为历史版本{result[0]}，"
+                f"新增{result[1]}个、删除{result[2]}个、修改{result[3]}个扇区")
+
+    # 开启工参目录监视
+    def start_parameter_file_watcher(self, watch_dir='resources/layer'):
+        """
+        开启工参目录监视，目录中出现新的宏站、室分工参文件时在后台加载，完成后替换工程中的同名图层，无需重启
+        :param watch_dir: 工参目录
+        :type watch_dir: str
+        :return: None
+        """
+        os.makedirs(watch_dir, exist_ok=True)
+        self.parameter_file_watcher = QFileSystemWatcher([watch_dir], self)
+        self.parameter_file_watcher.directoryChanged.connect(self.parameter_dir_changed)
+        self.mainWindow.log_text_field_update(f"已开启工参目录监视：{watch_dir}，新工参文件将自动加载")
+
+    # 工参目录变化，复制文件期间会连续触发，延时合并后再检查
+    def parameter_dir_changed(self, path):
+        self.parameter_watch_timer.start()
+
+    # 检查工参目录中是否有新工参文件，有则提交后台加载任务
+    def check_new_parameter_file(self):
+        """
+        检查工参目录中是否有比当前图层更新的工参文件：先在异步访问层的写连接中后台更新工参快照目录
+        （仅对大小、修改时间变化且已稳定的文件计算哈希），完成后再检查最新工参
+        :return: None
+        """
+        if self.parameter_catalog_updating:
+            self.parameter_watch_timer.start()
+            return
+        self.parameter_catalog_updating = True
+        self.mainWindow.async_db.write(IOUtils.update_parameter_catalog,
+                                       settle_seconds=self.parameter_watch_timer.interval() / 1000,
+                                       callback=self.parameter_catalog_updated,
+                                       error_callback=self.parameter_catalog_update_failed)
+
+    # 工参快照目录更新失败
+    def parameter_catalog_update_failed(self, error):
+        self.parameter_catalog_updating = False
+        self.mainWindow.log_text_field_update(f"工参快照目录更新失败：{error}", 3)
+
+    # 工参快照目录更新完成，检查最新工参并提交后台加载任务
+    def parameter_catalog_updated(self, result):
+        """
+        工参快照目录更新完成后，shp、shx、dbf齐全且文件大小不再变化（复制完成）的最新工参提交后台加载任务，
+        仍在复制的文件等待下一次检查
+        :param result: update_parameter_catalog的返回值
+        :type result: tuple[int, int, int]
+        :return: None
+        """
+        self.parameter_catalog_updating = False
+        if result[2]:
+            self.parameter_watch_timer.start()
+        for layer_name in ('宏站扇区图层', '室分扇区图层'):
+            if layer_name in self.sector_layer_load_task_dict:
+                continue
+            latest_path = IOUtils.find_latest_para_file(layer_name, self.conn)[0]
+            if not latest_path:
+                continue
+            layers = self.qgsProjectInstance.mapLayersByName(layer_name)
+            if layers and os.path.abspath(layers[0].source().split('|')[0]) == os.path.abspath(latest_path):
+                continue
+            part_path_list = [os.path.splitext(latest_path)[0] + extension for extension in ('.shp', '.shx', '.dbf')]
+            if not all(os.path.exists(part_path) for part_path in part_path_list):
+                self.parameter_watch_timer.start()
+                continue
+            file_size = tuple(os.path.getsize(part_path) for part_path in part_path_list)
+            if self.parameter_file_size_dict.get(latest_path) != file_size:
+                self.parameter_file_size_dict[latest_path] = file_size
+                self.parameter_watch_timer.start()
+                continue
+
+            task = SectorLayerLoadTask(layer_name, latest_path, self)
+            task.progressChanged.connect(lambda progress, task=task: self.sector_layer_load_progress(task, progress))
+            self.sector_layer_load_task_dict[layer_name] = task
+            QgsApplication.taskManager().addTask(task)
+            self.mainWindow.log_text_field_update(f"检测到新工参{os.path.basename(latest_path)}，正在后台加载{layer_name}", 2)
+
+    # 后台加载进度，每25%输出一次日志
+    def sector_layer_load_progress(self, task, progress):
+        if progress >= task.last_logged_progress + 25:
+            task.last_logged_progress = int(progress // 25 * 25)
+            self.mainWindow.log_text_field_update(f"{task.layer_name}后台加载进度{task.last_logged_progress}%")
+            self.mainWindow.statusbar_message_update(f"正在后台加载{task.layer_name}：{progress:.0f}%", 2000)
+
+    # 后台加载完成，在主线程中替换图层并增量更新索引
+    def sector_layer_load_finished(self, task, result):
+        """
+        后台加载完成后在主线程中替换工程中的同名图层，再以工作线程计算的扇区指纹进行工参比对和索引增量更新；
+        气泡扩张动画进行中时延后替换，避免正在使用的图层被删除
+        :param task: 后台加载任务
+        :type task: SectorLayerLoadTask
+        :param result: 是否加载成功
+        :type result: bool
+        :return: None
+        """
+        if not result:
+            self.sector_layer_load_task_dict.pop(task.layer_name, None)
+            self.mainWindow.log_text_field_update(f"{task.layer_name}后台加载失败：{task.error or '任务已取消'}", 3)
+            return
+        if self.bubbleExpandTimer.isActive():
+            QTimer.singleShot(5000, lambda: self.sector_layer_load_finished(task, result))
+            return
+        self.replace_sector_layer(task.layer_name, task.layer)
+        self.sector_layer_load_task_dict.pop(task.layer_name, None)
+        self.mainWindow.log_text_field_update(
+            f"已切换至新工参{os.path.basename(task.source_path)}，{task.layer_name}共{len(task.fingerprint_result[0])}个扇区", 4)
+        self.update_sector_parameter_diff({task.layer_name: task.fingerprint_result})
+        # 加载期间可能又有新文件写入
+        self.parameter_watch_timer.start()
+
+    # 以新图层替换工程中的同名图层
+    def replace_sector_layer(self, layer_name, new_layer):
+        """
+        以新图层替换工程中的同名图层：沿用原图层的渲染样式（新出现的频段补充分类），插入原图层在图层树中的位置后删除原图层，
+        在主线程中一次完成，其他方法按名称获取图层时不会取到新旧两个图层
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :param new_layer: 新图层
+        :type new_layer: QgsVectorLayer
+        :return: None
+        """
+        old_layers = self.qgsProjectInstance.mapLayersByName(layer_name)
+        if not old_layers:
+            self.qgsProjectInstance.addMapLayer(new_layer)
+            return
+        old_layer = old_layers[0]
+        renderer = old_layer.renderer().clone()
+        if isinstance(renderer, QgsCategorizedSymbolRenderer):
+            field_index = new_layer.fields().indexFromName(renderer.classAttribute())
+            category_value_set = {category.value() for category in renderer.categories()}
+            for value in new_layer.uniqueValues(field_index) if field_index >= 0 else []:
+                if value not in category_value_set:
+                    fill_symbol = QgsFillSymbol.createSimple({
+                        "color": "189, 143, 83, 160",
+                        "outline_style": "no",
+                        "style": "dense2",
+                    })
+                    renderer.addCategory(QgsRendererCategory(value, fill_symbol, str(value)))
+        new_layer.setRenderer(renderer)
+
+        root = self.qgsProjectInstance.layerTreeRoot()
+        old_node = root.findLayer(old_layer.id())
+        self.qgsProjectInstance.addMapLayer(new_layer, False)
+        if old_node:
+            parent_node = old_node.parent()
+            new_node = parent_node.insertLayer(parent_node.children().index(old_node), new_layer)
+            new_node.setItemVisibilityChecked(old_node.itemVisibilityChecked())
+        else:
+            root.insertLayer(0, new_layer)
+        # 原图层的Shapely索引在下次获取索引时自动清理
+        self.qgsProjectInstance.removeMapLayer(old_layer.id())
+        self.sector_coverage_grid_dict.pop(layer_name, None)
+        self.sector_attribute_store_dict.pop(layer_name, None)
+        self.mapCanvas.refresh()
+
+    def update_project_conflict_matrix(self, distance):
+        """
+        增量计算全网项目冲突矩阵：仅对几何（或距离阈值）变化的项目，与全部项目做距离约束的空间自连接，
+        Shapely后端使用STRtree的dwithin剪枝，QGIS后端使用QgsSpatialIndex外包框剪枝，结果写入项目冲突表
+        :param distance: 冲突距离阈值（米），距离不超过该值的项目对写入冲突表
+        :type distance: float
+        :return: 本次重新计算的项目数量
+        :rtype: int
+        """
+        self.sql_util.create_project_conflict_tables(self.conn)
+        project_name_list = self.project_geometry_cache.get_project_name_list()
+        geometry_list = [self.project_geometry_cache.get_geometry(project_name, True) for project_name in project_name_list]
+        wkb_list = [bytes(geometry.asWkb()) for geometry in geometry_list]
+        # 距离阈值一并计入哈希，阈值变化后全部重算
+        hash_list = [hashlib.sha1(wkb + f'{distance}'.encode()).hexdigest() for wkb in wkb_list]
+        project_hash_dict_stored = self.sql_util.get_project_conflict_hash_dict(self.conn)
+        changed_index_list = [i for i, project_name in enumerate(project_name_list)
+                              if project_hash_dict_stored.get(project_name) != hash_list[i]]
+        project_name_set = set(project_name_list)
+        removed_project_name_list = [project_name for project_name in project_hash_dict_stored
+                                     if project_name not in project_name_set]
+        if not changed_index_list and not removed_project_name_list:
+            return 0
+
+        if self.geometry_backend == 'shapely':
+            shapely_index_project = ShapelyIndex(wkb_list, list(range(len(wkb_list))))
+            query_index, tree_index, distance_array, overlap_area_array = shapely_index_project.query_distance_and_overlap(
+                [wkb_list[i] for i in changed_index_list], distance)
+            pair_list = zip([changed_index_list[i] for i in query_index.tolist()], tree_index.tolist(),
+                            distance_array.tolist(), overlap_area_array.tolist())
+        else:
+            spatial_index_project = QgsSpatialIndex()
+            for i, geometry in enumerate(geometry_list):
+                spatial_index_project.insertFeature(i, geometry.boundingBox())
+            pair_list = []
+            for i in changed_index_list:
+                for j in spatial_index_project.intersects(geometry_list[i].boundingBox().buffered(distance)):
+                    pair_distance = geometry_list[i].distance(geometry_list[j])
+                    if pair_distance <= distance:
+                        overlap_area = geometry_list[i].intersection(geometry_list[j]).area() if pair_distance == 0 else 0
+                        pair_list.append((i, j, pair_distance, overlap_area))
+
+        update_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conflict_row_dict = {}
+        for i, j, pair_distance, overlap_area in pair_list:
+            if i == j:
+                continue
+            project_name_a, project_name_b = sorted((project_name_list[i], project_name_list[j]))
+            conflict_row_dict[(project_name_a, project_name_b)] = (
+                project_name_a, project_name_b, int(pair_distance == 0), round(overlap_area, 1), round(pair_distance, 1),
+                update_time)
+        self.sql_util.update_project_conflict(self.conn,
+                                              {project_name_list[i]: hash_list[i] for i in changed_index_list},
+                                              removed_project_name_list, list(conflict_row_dict.values()))
+        return len(changed_index_list)
+
+    def export_project_conflict_matrix(self, output_path):
+        """
+        导出项目冲突矩阵，.gpkg后缀导出为GeoPackage（几何为两个项目之间的最短连线，EPSG:3857），其他后缀导出为CSV（utf-8-sig，可直接用Excel打开）
+        :param output_path: 导出文件路径
+        :type output_path: str
+        :return: 错误信息，成功时为空字符串
+        :rtype: str
+        """
+        conflict_list = self.sql_util.get_project_conflict_list(self.conn)
+        column_names = ['项目名称A', '项目名称B', '是否重叠', '重叠面积', '最小距离', '更新时间']
+        try:
+            if output_path.lower().endswith('.gpkg'):
+                conflict_layer = QgsVectorLayer("LineString?crs=EPSG:3857", '项目冲突', "memory")
+                provider = conflict_layer.dataProvider()
+                provider.addAttributes([QgsField('项目名称A', QVariant.String), QgsField('项目名称B', QVariant.String),
+                                        QgsField('是否重叠', QVariant.Int), QgsField('重叠面积', QVariant.Double),
+                                        QgsField('最小距离', QVariant.Double), QgsField('更新时间', QVariant.String)])
+                conflict_layer.updateFields()
+                features_conflict = []
+                for conflict in conflict_list:
+                    geometry_a = self.project_geometry_cache.get_geometry(conflict['项目名称A'])
+                    geometry_b = self.project_geometry_cache.get_geometry(conflict['项目名称B'])
+                    feature = QgsFeature(conflict_layer.fields())
+                    if geometry_a and geometry_b:
+                        feature.setGeometry(geometry_a.shortestLine(geometry_b))
+                    feature.setAttributes([conflict[column_name] for column_name in column_names])
+                    features_conflict.append(feature)
+                provider.addFeatures(features_conflict)
+                options = QgsVectorFileWriter.SaveVectorOptions()
+                options.driverName = 'GPKG'
+                options.layerName = '项目冲突'
+                options.fileEncoding = 'UTF-8'
+                error = QgsVectorFileWriter.writeAsVectorFormatV3(conflict_layer, output_path,
+                                                                  self.qgsProjectInstance.transformContext(), options)
+                return '' if error[0] == QgsVectorFileWriter.NoError else error[1]
+            with open(output_path, 'w', encoding='utf-8-sig', newline='') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=column_names)
+                writer.writeheader()
+                writer.writerows(conflict_list)
+            return ''
+        except Exception as e:
+            return f"处理过程中发生错误: {e}"
+
+    # 根据工参批量生成宏站、室分扇区图层
+    # 提交由工参生成扇区图层的后台任务
+    def start_sector_layer_build(self, parameter_path):
+        """
+        提交由工参生成扇区图层的后台任务，读取工参、生成扇区几何和写入shp均不阻塞界面
+        :param parameter_path: 工参文件路径
+        :type parameter_path: str
+        :return: None
+        """
+        task = SectorLayerBuildTask(parameter_path, self.qgsProjectInstance.transformContext(), self)
+        task.progressChanged.connect(lambda progress: self.mainWindow.statusbar_progress_update(int(progress)))
+        self.sector_layer_build_task_list.append(task)
+        QgsApplication.taskManager().addTask(task)
+
+    # 扇区图层生成完成，输出结果并触发新工参检查
+    def sector_layer_build_finished(self, task, result):
+        """
+        扇区图层生成完成后在主线程中输出结果，并直接触发一次新工参检查（新图层位于工参目录中，无需等待目录监视），
+        由后台加载任务替换当前扇区图层
+        :param task: 后台生成任务
+        :type task: SectorLayerBuildTask
+        :param result: 是否生成成功
+        :type result: bool
+        :return: None
+        """
+        if task in self.sector_layer_build_task_list:
+            self.sector_layer_build_task_list.remove(task)
+        self.mainWindow.statusbar_progress_update(-1)
+        if not result:
+            self.mainWindow.log_text_field_update(f"扇区图层生成失败：{task.error or '任务已取消'}", 4)
+            self.mainWindow.statusbar_message_update("扇区图层生成失败")
+            return
+        for output_path, sector_count in zip(task.output_path_list, task.sector_count_list):
+            self.mainWindow.log_text_field_update(f"已生成{output_path}，共{sector_count}个扇区")
+        if task.skipped_count:
+            self.mainWindow.log_text_field_update(f"{task.skipped_count}行工参缺少有效的唯一标识、经纬度或方位角，已跳过", 3)
+        self.mainWindow.log_text_field_update(
+            f"扇区图层生成耗时{(datetime.datetime.now() - task.start_time).total_seconds():.1f}秒，"
+            f"将在后台自动加载并替换当前扇区图层")
+        self.check_new_parameter_file()
+        self.mainWindow.statusbar_message_update("扇区图层生成完成", 3000, 'lightgreen')
+
+    @staticmethod
+    def build_sector_layers(parameter_path, transform_context, output_dir='resources/layer', task=None):
+        """
+        根据工参（CSV/XLSX）批量生成宏站、室分扇区图层（EPSG:4326的shp，字段与外部制作的扇区图层一致），
+        文件名按工参文件的命名规则（图层名+日期_时分）生成，之后加载工参时即为最新工参
+        工参需包含唯一标识（或CGI）、经度、纬度，宏站需包含方位角；波瓣宽度、覆盖半径缺省时按频段取默认值，
+        站型包含“室分”或“室内”的小区生成以站点为圆心的圆；不访问工程和界面，可在工作线程中执行
+        :param parameter_path: 工参文件路径
+        :type parameter_path: str
+        :param transform_context: 坐标转换上下文
+        :type transform_context: QgsCoordinateTransformContext
+        :param output_dir: 输出目录
+        :type output_dir: str
+        :param task: 所在的后台任务，用于汇报进度和响应取消
+        :type task: QgsTask
+        :return: 生成的图层文件路径列表、各图层扇区数、跳过的行数，任务取消时返回None
+        :rtype: list[str], list[int], int
+        """
+        row_iter = ImportUtils.read_rows(parameter_path)
+        header = [str(column).strip() for column in next(row_iter, [])]
+        column_alias_dict = {'唯一标识': ('唯一标识', 'CGI'), '设备厂家': ('设备厂家', '无线厂家')}
+
+        def get_column_index(column_name):
+            for alias in column_alias_dict.get(column_name, (column_name,)):
+                if alias in header:
+                    return header.index(alias)
             return -1
 
+        field_index_list = [get_column_index(field_name) for field_name, _ in SECTOR_LAYER_FIELDS]
+        lon_index, lat_index, azimuth_index, beamwidth_index, radius_index = [
+            get_column_index(column_name) for column_name in ('经度', '纬度', '方位角', '波瓣宽度', '覆盖半径')]
+        if field_index_list[0] < 0 or lon_index < 0 or lat_index < 0:
+            raise ValueError("工参缺少唯一标识（CGI）、经度或纬度字段")
+
+        def get_number(row, index, default=np.nan):
+            try:
+                return float(row[index]) if 0 <= index < len(row) and str(row[index]).strip() != '' else default
+            except ValueError:
+                return np.nan
+
+        attribute_list_dict = {'宏站扇区图层': [], '室分扇区图层': []}
+        value_list_dict = {'宏站扇区图层': [], '室分扇区图层': []}
+        skipped_count = 0
+        for row_index, row in enumerate(row_iter):
+            if task is not None and row_index % 10000 == 0 and task.isCanceled():
+                return None
+            if not any(str(value).strip() for value in row):
+                continue
+            attributes = [row[index] if 0 <= index < len(row) else None for index in field_index_list]
+            attributes = [str(value).strip() if value not in (None, '') else None for value in attributes]
+            # 唯一标识保留工参中的原始PLMN（广电小区需按MNC识别），与其他数据比对时由cgi_remove_plmn统一去除PLMN
+            for i, (_, field_type) in enumerate(SECTOR_LAYER_FIELDS):
+                if field_type == QVariant.Int and attributes[i] is not None:
+                    number = get_number([attributes[i]], 0)
+                    attributes[i] = int(number) if np.isfinite(number) else None
+            indoor = any(keyword in (attributes[3] or '') for keyword in ('室分', '室内'))
+            default_beamwidth, default_radius = SECTOR_BAND_DEFAULTS.get(attributes[6] or '', SECTOR_OTHER_BAND_DEFAULT)
+            lon = get_number(row, lon_index)
+            lat = get_number(row, lat_index)
+            azimuth = get_number(row, azimuth_index, 0.0 if indoor else np.nan)
+            beamwidth = 360.0 if indoor else get_number(row, beamwidth_index, default_beamwidth)
+            radius = get_number(row, radius_index, SECTOR_INDOOR_RADIUS_DEFAULT if indoor else default_radius)
+            if not attributes[0] or not (-180 <= lon <= 180 and -90 <= lat <= 90) \
+                    or not np.isfinite(azimuth) or not beamwidth > 0 or not radius > 0:
+                skipped_count += 1
+                continue
+            layer_name = '室分扇区图层' if indoor else '宏站扇区图层'
+            attribute_list_dict[layer_name].append(attributes)
+            value_list_dict[layer_name].append((lon, lat, azimuth, beamwidth, radius))
+
+        fields = QgsFields()
+        for field_name, field_type in SECTOR_LAYER_FIELDS:
+            fields.append(QgsField(field_name, field_type))
+        options = QgsVectorFileWriter.SaveVectorOptions()
+        options.driverName = 'ESRI Shapefile'
+        # 与外部制作的扇区图层一致使用GBK编码，中文字段名不超过dbf的10字节限制
+        options.fileEncoding = 'GBK'
+        output_path_list = []
+        sector_count_list = []
+        timestamp = datetime.datetime.now()
+        for layer_index, (layer_name, value_list) in enumerate(value_list_dict.items()):
+            if task is not None:
+                if task.isCanceled():
+                    return None
+                task.setProgress(50 * (layer_index + 1))
+            if not value_list:
+                continue
+            # 同一分钟内重复生成时顺延编号，保证新文件为最新工参
+            output_number = timestamp.hour * 100 + timestamp.minute
+            while True:
+                output_path = os.path.join(output_dir, f"{layer_name}{timestamp.strftime('%Y%m%d')}_{output_number:04d}.shp")
+                if not os.path.exists(output_path):
+                    break
+                output_number += 1
+            value_array = np.array(value_list, dtype=float)
+            wkb_list = GeometryUtils.polygon_rings_to_wkb_list(GeometryUtils.sector_wedge_rings(*value_array.T))
+            os.makedirs(output_dir, exist_ok=True)
+            writer = QgsVectorFileWriter.create(output_path, fields, QgsWkbTypes.Polygon,
+                                                QgsCoordinateReferenceSystem("EPSG:4326"), transform_context, options)
+            if writer.hasError() != QgsVectorFileWriter.NoError:
+                raise IOError(writer.errorMessage())
+            features = []
+            for attributes, wkb in zip(attribute_list_dict[layer_name], wkb_list):
+                feature = QgsFeature(fields)
+                geometry = QgsGeometry()
+                geometry.fromWkb(wkb)
+                feature.setGeometry(geometry)
+                feature.setAttributes(attributes)
+                features.append(feature)
+            writer.addFeatures(features)
+            del writer
+            output_path_list.append(output_path)
+            sector_count_list.append(len(value_list))
+        return output_path_list, sector_count_list, skipped_count
+
     # 传入geometry，返回一个QgsRectangle，可以直接用于setextend方法，留出边框
     @staticmethod
     def get_expanded_extend_by_geometry(geometry):
@@ -1257,6 +2557,33 @@ class QGISCanvasUtils(QMainWindow):
 
         features_bubble = layer_bubble_polygon.getFeatures()
 
+        if self.geometry_backend == 'shapely':
+            bubble_wkb_list = []
+            bubble_num_list = []
+            for feature_bubble in features_bubble:
+                geometry_bubble = feature_bubble.geometry()
+                if crs_trans_flag == 2:
+                    geometry_bubble.transform(self.transformer_3857_to_4326)
+                elif crs_trans_flag == 1:
+                    geometry_bubble.transform(self.transformer_4326_to_3857)
+                bubble_wkb_list.append(bytes(geometry_bubble.asWkb()))
+                bubble_num_list.append(feature_bubble['num'])
+            shapely_index_sector = self.get_shapely_layer_index(layer_sector_polygon, ['唯一标识', 'Group ID'])
+            bubble_index, sector_index = shapely_index_sector.query(bubble_wkb_list)
+            cgi_bubble_intersect_dict_return = {}
+            for i, j in zip(bubble_index.tolist(), sector_index.tolist()):
+                cgi = shapely_index_sector.get_attribute('唯一标识', j)
+                group_id = shapely_index_sector.get_attribute('Group ID', j)
+                if not group_id:
+                    group_id = 0
+                if isinstance(group_id, (int, float)) and group_id < 0:
+                    group_id = 0
+                dict_return_key = f'{cgi},{group_id}'
+                bubble_num_list_of_sector = cgi_bubble_intersect_dict_return.setdefault(dict_return_key, [])
+                if bubble_num_list[i] not in bubble_num_list_of_sector:
+                    bubble_num_list_of_sector.append(bubble_num_list[i])
+            return cgi_bubble_intersect_dict_return
+
         # 建立快速索引
         spatial_index_source = QgsSpatialIndex(layer_sector_polygon.getFeatures())
 
@@ -1287,6 +2614,177 @@ class QGISCanvasUtils(QMainWindow):
                         cgi_bubble_intersect_dict_return[dict_return_key] = [feature_bubble['num']]
         return cgi_bubble_intersect_dict_return
 
+    def get_parameter_identity(self):
+        """
+        获取当前加载的宏站、室分工参文件标识（路径、大小、修改时间），用于判定依赖工参的缓存是否有效
+        :return: 工参标识
+        :rtype: str
+        """
+        parameter_identity_dict = {}
+        for layer_name in ('宏站扇区图层', '室分扇区图层'):
+            layers = self.qgsProjectInstance.mapLayersByName(layer_name)
+            if not layers:
+                continue
+            source_path = layers[0].source().split('|')[0]
+            parameter_identity_dict[layer_name] = SectorCoverageGrid.get_source_identity(source_path) \
+                if os.path.exists(source_path) else source_path
+        return json.dumps(parameter_identity_dict, ensure_ascii=False, sort_keys=True)
+
+    def get_sector_coverage_grid(self, layer_name_of_sector_polygon):
+        """
+        获取扇区图层的覆盖栅格索引，索引保存在data/grid_index/图层名下并内存映射加载，
+        工参文件（路径、大小、修改时间）变化后自动重建，栅格统一使用EPSG:3857
+        :param layer_name_of_sector_polygon: 扇区图层名称
+        :type layer_name_of_sector_polygon: str
+        :return: 扇区覆盖栅格索引
+        :rtype: SectorCoverageGrid
+        """
+        layer_sector_polygon = self.qgsProjectInstance.mapLayersByName(layer_name_of_sector_polygon)[0]
+        source_path = layer_sector_polygon.source().split('|')[0]
+        sector_grid = self.sector_coverage_grid_dict.get(layer_name_of_sector_polygon)
+        if sector_grid and sector_grid.is_loaded() and \
+                sector_grid.meta.get('source_path') == os.path.abspath(source_path):
+            return sector_grid
+        sector_grid = SectorCoverageGrid(os.path.join('data', 'grid_index', layer_name_of_sector_polygon),
+                                         self.sector_grid_cell_size)
+        if sector_grid.is_valid_for(source_path, 'EPSG:3857'):
+            sector_grid.load()
+        else:
+            self.mainWindow.log_text_field_update(f"正在重建{layer_name_of_sector_polygon}覆盖栅格索引")
+            transform_flag = layer_sector_polygon.crs().authid() == 'EPSG:4326'
+            wkb_list, cgi_list, group_id_list, fid_list = [], [], [], []
+            for feature in layer_sector_polygon.getFeatures():
+                geometry = feature.geometry()
+                if geometry.isEmpty():
+                    continue
+                if transform_flag:
+                    geometry.transform(self.transformer_4326_to_3857)
+                group_id = feature['Group ID']
+                if not group_id:
+                    group_id = 0
+                if isinstance(group_id, (int, float)) and group_id < 0:
+                    group_id = 0
+                wkb_list.append(bytes(geometry.asWkb()))
+                cgi_list.append(feature['唯一标识'])
+                group_id_list.append(f'{group_id}')
+                fid_list.append(feature.id())
+            cell_count = sector_grid.build(source_path, 'EPSG:3857', wkb_list, cgi_list, group_id_list, fid_list)
+            self.mainWindow.log_text_field_update(
+                f"已完成{layer_name_of_sector_polygon}覆盖栅格索引重建，扇区{len(wkb_list)}个，覆盖格网{cell_count}个")
+        self.sector_coverage_grid_dict[layer_name_of_sector_polygon] = sector_grid
+        return sector_grid
+
+    def get_sector_attribute_store(self, layer_name_of_sector_polygon):
+        """
+        获取扇区图层的属性列存储，存储在data/attribute_store/图层名下并内存映射加载，
+        工参文件（路径、大小、修改时间）变化后自动重建
+        :param layer_name_of_sector_polygon: 扇区图层名称
+        :type layer_name_of_sector_polygon: str
+        :return: 扇区属性列存储
+        :rtype: SectorAttributeStore
+        """
+        layer_sector_polygon = self.qgsProjectInstance.mapLayersByName(layer_name_of_sector_polygon)[0]
+        source_path = layer_sector_polygon.source().split('|')[0]
+        sector_store = self.sector_attribute_store_dict.get(layer_name_of_sector_polygon)
+        if sector_store and sector_store.is_loaded() and \
+                sector_store.meta.get('source_path') == os.path.abspath(source_path):
+            return sector_store
+        sector_store = SectorAttributeStore(os.path.join('data', 'attribute_store', layer_name_of_sector_polygon))
+        if sector_store.is_valid_for(source_path):
+            sector_store.load()
+        else:
+            row_list = []
+            fid_list = []
+            request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+            request.setSubsetOfAttributes(list(SECTOR_ATTRIBUTE_COLUMNS), layer_sector_polygon.fields())
+            for feature in layer_sector_polygon.getFeatures(request):
+                row_list.append(tuple(str(feature[column_name]) for column_name in SECTOR_ATTRIBUTE_COLUMNS))
+                fid_list.append(feature.id())
+            sector_store.build(source_path, row_list, fid_list)
+            self.mainWindow.log_text_field_update(
+                f"已完成{layer_name_of_sector_polygon}属性列存储重建，扇区{len(row_list)}个")
+        self.sector_attribute_store_dict[layer_name_of_sector_polygon] = sector_store
+        return sector_store
+
+    # 栅格模式下的气泡相交判定，返回格式与get_sector_dict_intersects_bubble相同
+    def get_sector_dict_intersects_bubble_by_grid(self, layer_name_of_sector_polygon, points, bubble_size):
+        """
+        栅格模式下的气泡相交判定，以圆心和半径直接查询扇区覆盖栅格，无需生成气泡多边形
+        :param layer_name_of_sector_polygon: 扇区图层名称
+        :type layer_name_of_sector_polygon: str
+        :param points: 气泡圆心（EPSG:3857）
+        :type points: list[QgsGeometry]
+        :param bubble_size: 气泡半径（EPSG:3857单位）
+        :type bubble_size: float
+        :return: key为“唯一标识,Group ID”，value为相交的气泡序号列表
+        :rtype: dict{str:list[int]}
+        """
+        sector_grid = self.get_sector_coverage_grid(layer_name_of_sector_polygon)
+        point_xy_list = [point.asPoint() for point in points]
+        point_index, sector_ids = sector_grid.query_points_within([point_xy.x() for point_xy in point_xy_list],
+                                                                  [point_xy.y() for point_xy in point_xy_list],
+                                                                  bubble_size)
+        cgi_bubble_intersect_dict_return = {}
+        for i, j in zip(point_index.tolist(), sector_ids.tolist()):
+            dict_return_key = f'{sector_grid.sector_cgi[j]},{sector_grid.sector_group_id[j]}'
+            cgi_bubble_intersect_dict_return.setdefault(dict_return_key, []).append(i)
+        return cgi_bubble_intersect_dict_return
+
+    def get_shapely_layer_index(self, layer, attribute_name_list=None):
+        """
+        获取图层的Shapely索引，按图层id缓存，图层从工程中移除后自动清理；
+        图层要素增删、几何或属性修改时通过图层信号清空缓存，
+        直接经数据提供者修改（不触发图层信号）时由要素数量和范围构成的数据版本判定缓存失效
+        :param layer: 图层
+        :type layer: QgsVectorLayer
+        :param attribute_name_list: 需要随索引缓存的属性列名
+        :type attribute_name_list: list[str]
+        :return: Shapely索引，keys为要素id
+        :rtype: ShapelyIndex
+        """
+        attribute_name_tuple = tuple(attribute_name_list) if attribute_name_list else ()
+        layer_id_list = self.qgsProjectInstance.mapLayers().keys()
+        for index_key in [index_key for index_key in self.shapely_layer_index_dict if index_key[0] not in layer_id_list]:
+            del self.shapely_layer_index_dict[index_key]
+        self.shapely_layer_watch_set &= set(layer_id_list)
+        layer_id = layer.id()
+        if layer_id not in self.shapely_layer_watch_set:
+            for signal in (layer.featureAdded, layer.featuresDeleted, layer.geometryChanged,
+                           layer.attributeValueChanged, layer.dataChanged):
+                signal.connect(lambda *args, changed_layer_id=layer_id:
+                               self.invalidate_shapely_layer_index(changed_layer_id))
+            self.shapely_layer_watch_set.add(layer_id)
+        extent = layer.extent()
+        data_version = (layer.featureCount(), extent.xMinimum(), extent.yMinimum(), extent.xMaximum(), extent.yMaximum())
+        index_key = (layer_id, attribute_name_tuple)
+        cache_value = self.shapely_layer_index_dict.get(index_key)
+        if cache_value is None or cache_value[0] != data_version:
+            wkb_list = []
+            fid_list = []
+            attribute_dict = {attribute_name: [] for attribute_name in attribute_name_tuple}
+            for feature in layer.getFeatures():
+                geometry = feature.geometry()
+                if geometry.isEmpty():
+                    continue
+                wkb_list.append(bytes(geometry.asWkb()))
+                fid_list.append(feature.id())
+                for attribute_name in attribute_name_tuple:
+                    attribute_dict[attribute_name].append(feature[attribute_name])
+            cache_value = (data_version, ShapelyIndex(wkb_list, fid_list, attribute_dict))
+            self.shapely_layer_index_dict[index_key] = cache_value
+        return cache_value[1]
+
+    # 清空图层的Shapely索引缓存
+    def invalidate_shapely_layer_index(self, layer_id):
+        """
+        清空图层的全部Shapely索引缓存（不同属性列组合），下次查询时重新建立
+        :param layer_id: 图层id
+        :type layer_id: str
+        :return: None
+        """
+        for index_key in [index_key for index_key in self.shapely_layer_index_dict if index_key[0] == layer_id]:
+            del self.shapely_layer_index_dict[index_key]
+
     def get_sector_feature_include_geometry_from_layer(self, layer_name_of_sector_polygon, cgi_list, plmn_normalization = False):
         layer_sector_polygon = self.qgsProjectInstance.mapLayersByName(layer_name_of_sector_polygon)[0]
         if plmn_normalization:
@@ -1303,18 +2801,10 @@ class QGISCanvasUtils(QMainWindow):
         return features
 
     def get_sector_info_from_layer(self, layer_name_of_sector_polygon, cgi_list):
-        layer_sector_polygon = self.qgsProjectInstance.mapLayersByName(layer_name_of_sector_polygon)[0]
-        match_info_list = []
+        # 从扇区属性列存储中按行号取值，不再逐要素读取图层
+        sector_store = self.get_sector_attribute_store(layer_name_of_sector_polygon)
+        match_info_list = sector_store.get_rows(sector_store.get_row_index(cgi_list), SECTOR_ATTRIBUTE_COLUMNS[:8])
         # unmatch_cgi_list = []
-        quoted_cgi = [f"'{cgi}'" for cgi in cgi_list]
-        expression = QgsExpression(f'"唯一标识" IN ({", ".join(quoted_cgi)})')
-        request = QgsFeatureRequest(expression)
-        features = list(layer_sector_polygon.getFeatures(request))
-        for feature in features:
-            match_info_list.append(
-                {'唯一标识': str(feature["唯一标识"]),'基站号': str(feature["基站号"]),'小区名': str(feature["小区名"]),
-                 '站型': str(feature["站型"]),'行政区': str(feature["行政区"]),'设备厂家': str(feature["设备厂家"]),
-                 '频段': str(feature["频段"]),'带宽': str(feature["带宽"])})
         #
         # for cgi in cgi_list:
         #     expression = QgsExpression(f'"唯一标识" = \'{cgi}\'')
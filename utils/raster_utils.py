@@ -0,0 +1,506 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from utils.geometry_utils import GeometryUtils
+
+
+# scipy为可选依赖，用于距离场计算（欧氏距离变换），未安装时冗余度评估回退到逐扇区精确计算
+try:
+    from scipy import ndimage
+    SCIPY_AVAILABLE = True
+except ImportError:
+    ndimage = None
+    SCIPY_AVAILABLE = False
+
+
+class RasterGrid:
+    """
+    规则格网基类，meta中保存格网原点（origin_x、origin_y）、边长（cell_size）和行列数（n_cols、n_rows），
+    格网编号为行号*列数+列号
+    """
+
+    def __init__(self, cell_size=25):
+        self.cell_size = float(cell_size)
+        self.meta = {}
+
+    # 将几何（若干环或线）栅格化为格网编号
+    def rasterize_coords_list(self, coords_list, closed_list=None):
+        """
+        将几何栅格化为格网编号：格网中心在闭合环（面）内的格网，加上边界或线按半个格网间距采样经过的格网，超出格网范围的部分忽略
+        :param coords_list: 环或线的坐标数组列表
+        :type coords_list: list[np.ndarray]
+        :param closed_list: 与coords_list对应的是否为闭合环的标记，为空则全部视为闭合环
+        :type closed_list: list[bool]
+        :return: 格网编号（升序、去重）
+        :rtype: np.ndarray
+        """
+        if closed_list is None:
+            closed_list = [True] * len(coords_list)
+        ring_list = [coords for coords, closed in zip(coords_list, closed_list) if closed]
+        key_chunks = []
+        if ring_list:
+            all_coords = np.vstack(ring_list)
+            col_min, row_min = self.get_cell_col_row(all_coords[:, 0].min(), all_coords[:, 1].min())
+            col_max, row_max = self.get_cell_col_row(all_coords[:, 0].max(), all_coords[:, 1].max())
+            cols, rows = np.meshgrid(np.arange(max(col_min, 0), min(col_max, self.meta['n_cols'] - 1) + 1),
+                                     np.arange(max(row_min, 0), min(row_max, self.meta['n_rows'] - 1) + 1))
+            cols = cols.ravel()
+            rows = rows.ravel()
+            center_x = self.meta['origin_x'] + (cols + 0.5) * self.cell_size
+            center_y = self.meta['origin_y'] + (rows + 0.5) * self.cell_size
+            inside = GeometryUtils.points_in_rings(center_x, center_y, ring_list)
+            key_chunks.append(self.get_cell_key(cols[inside], rows[inside]))
+        border_points = np.vstack([GeometryUtils.densify_coords(coords, self.cell_size / 2) for coords in coords_list])
+        border_cols, border_rows = self.get_cell_col_row(border_points[:, 0], border_points[:, 1])
+        key_chunks.append(self.get_cell_key(border_cols, border_rows))
+        keys = np.unique(np.concatenate(key_chunks))
+        return keys[keys >= 0]
+
+    def get_cell_col_row(self, x, y):
+        """
+        计算坐标所在格网的列号和行号
+        """
+        col = np.floor((np.asarray(x, dtype=float) - self.meta['origin_x']) / self.cell_size).astype(np.int64)
+        row = np.floor((np.asarray(y, dtype=float) - self.meta['origin_y']) / self.cell_size).astype(np.int64)
+        return col, row
+
+    def get_cell_key(self, col, row):
+        """
+        计算格网编号，超出格网范围的返回-1
+        """
+        col = np.asarray(col, dtype=np.int64)
+        row = np.asarray(row, dtype=np.int64)
+        valid = (col >= 0) & (col < self.meta['n_cols']) & (row >= 0) & (row < self.meta['n_rows'])
+        return np.where(valid, row * self.meta['n_cols'] + col, -1)
+
+
+class SectorCoverageGrid(RasterGrid):
+    """
+    扇区覆盖栅格索引：将扇区多边形栅格化到规则格网，以CSR结构保存“格网→扇区”关系
+    cell_keys为有覆盖的格网编号（行号*列数+列号，升序），indptr[i]:indptr[i+1]为cell_keys[i]对应的扇区序号区间，
+    sector_ids为扇区序号，扇区的唯一标识、Group ID和要素id分别保存在sector_cgi、sector_group_id和sector_fid中
+    全部数组以.npy文件保存在索引目录下，加载时内存映射，工参文件（路径、大小、修改时间）变化后需重建
+    栅格化为保守策略：格网中心落在扇区内或扇区边界经过的格网均视为被覆盖，查询结果为精确结果的超集
+    """
+
+    ARRAY_NAMES = ('cell_keys', 'indptr', 'sector_ids', 'sector_cgi', 'sector_group_id', 'sector_fid')
+
+    def __init__(self, index_dir, cell_size=25):
+        """
+        :param index_dir: 索引目录，例如data/grid_index/宏站扇区图层
+        :type index_dir: str
+        :param cell_size: 格网边长（坐标系单位）
+        :type cell_size: float
+        """
+        super().__init__(cell_size)
+        self.index_dir = index_dir
+        self.cell_keys = None
+        self.indptr = None
+        self.sector_ids = None
+        self.sector_cgi = None
+        self.sector_group_id = None
+        self.sector_fid = None
+
+    def is_loaded(self):
+        return self.cell_keys is not None
+
+    # 获取工参文件的标识，用于判定索引是否需要重建
+    @staticmethod
+    def get_source_identity(source_path):
+        """
+        获取工参文件的标识，用于判定索引是否需要重建
+        :param source_path: 工参文件路径
+        :type source_path: str
+        :return: 文件绝对路径、大小、修改时间
+        :rtype: dict
+        """
+        stat = os.stat(source_path)
+        return {'source_path': os.path.abspath(source_path), 'source_size': stat.st_size,
+                'source_mtime_ns': stat.st_mtime_ns}
+
+    # 判断磁盘上的索引是否与当前工参文件和格网参数一致
+    def is_valid_for(self, source_path, crs_authid):
+        """
+        判断磁盘上的索引是否与当前工参文件和格网参数一致
+        :param source_path: 工参文件路径
+        :type source_path: str
+        :param crs_authid: 栅格化所用坐标系，例如EPSG:3857
+        :type crs_authid: str
+        :return: 是否可直接加载
+        :rtype: bool
+        """
+        if not os.path.exists(source_path):
+            return False
+        return self.is_valid_for_identity(self.get_source_identity(source_path), crs_authid)
+
+    # 判断磁盘上的索引是否由指定标识的工参文件建立
+    def is_valid_for_identity(self, source_identity, crs_authid):
+        """
+        判断磁盘上的索引是否由指定标识的工参文件建立，工参更新时用于判断旧索引能否增量更新
+        :param source_identity: 工参文件标识（get_source_identity的返回值）
+        :type source_identity: dict
+        :param crs_authid: 栅格化所用坐标系，例如EPSG:3857
+        :type crs_authid: str
+        :return: 是否一致
+        :rtype: bool
+        """
+        meta_path = os.path.join(self.index_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return False
+        expected = dict(source_identity)
+        expected.update({'cell_size': self.cell_size, 'crs': crs_authid})
+        return all(meta.get(key) == value for key, value in expected.items()) and all(
+            os.path.exists(os.path.join(self.index_dir, f'{name}.npy')) for name in self.ARRAY_NAMES)
+
+    # 从磁盘以内存映射方式加载索引
+    def load(self):
+        """
+        从磁盘以内存映射方式加载索引
+        :return: None
+        """
+        with open(os.path.join(self.index_dir, 'meta.json'), 'r', encoding='utf-8') as meta_file:
+            self.meta = json.load(meta_file)
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, np.load(os.path.join(self.index_dir, f'{name}.npy'), mmap_mode='r'))
+
+    # 对扇区多边形进行栅格化，生成CSR索引并写入磁盘
+    def build(self, source_path, crs_authid, wkb_list, cgi_list, group_id_list, fid_list):
+        """
+        对扇区多边形进行栅格化，生成CSR索引并写入磁盘，写入过程中先删除meta.json，中断后下次会自动重建
+        :param source_path: 工参文件路径
+        :type source_path: str
+        :param crs_authid: 几何所在坐标系，例如EPSG:3857
+        :type crs_authid: str
+        :param wkb_list: 扇区多边形WKB列表
+        :type wkb_list: list[bytes]
+        :param cgi_list: 扇区唯一标识列表
+        :type cgi_list: list[str]
+        :param group_id_list: 扇区Group ID列表（已规范化为字符串）
+        :type group_id_list: list[str]
+        :param fid_list: 扇区要素id列表
+        :type fid_list: list[int]
+        :return: 有覆盖的格网数量
+        :rtype: int
+        """
+        coords_closed_list_of_sector = [GeometryUtils.wkb_to_coords_list(wkb) for wkb in wkb_list]
+        coords_list_of_sector = [coords_closed[0] for coords_closed in coords_closed_list_of_sector]
+        closed_list_of_sector = [coords_closed[1] for coords_closed in coords_closed_list_of_sector]
+        bounds = [np.vstack(coords_list) for coords_list in coords_list_of_sector if coords_list]
+        if bounds:
+            all_coords = np.vstack(bounds)
+            origin_x = float(np.floor(all_coords[:, 0].min() / self.cell_size) * self.cell_size)
+            origin_y = float(np.floor(all_coords[:, 1].min() / self.cell_size) * self.cell_size)
+            n_cols = int(np.ceil((all_coords[:, 0].max() - origin_x) / self.cell_size)) + 1
+            n_rows = int(np.ceil((all_coords[:, 1].max() - origin_y) / self.cell_size)) + 1
+        else:
+            origin_x = origin_y = 0.0
+            n_cols = n_rows = 1
+        self.meta = {'cell_size': self.cell_size, 'crs': crs_authid, 'origin_x': origin_x, 'origin_y': origin_y,
+                     'n_cols': n_cols, 'n_rows': n_rows}
+
+        all_keys, all_sectors = self.rasterize_sectors(coords_list_of_sector, closed_list_of_sector)
+        return self.save(source_path, all_keys, all_sectors, np.asarray(cgi_list, dtype=str),
+                         np.asarray(group_id_list, dtype=str), np.asarray(fid_list, dtype=np.int64))
+
+    # 对一组扇区进行栅格化，返回(格网编号, 扇区序号)对
+    def rasterize_sectors(self, coords_list_of_sector, closed_list_of_sector, first_sector_id=0):
+        """
+        对一组扇区进行栅格化，返回(格网编号, 扇区序号)对
+        :param coords_list_of_sector: 每个扇区的环坐标数组列表
+        :type coords_list_of_sector: list[list[np.ndarray]]
+        :param closed_list_of_sector: 每个扇区的闭合环标记列表
+        :type closed_list_of_sector: list[list[bool]]
+        :param first_sector_id: 第一个扇区的序号
+        :type first_sector_id: int
+        :return: 格网编号，扇区序号
+        :rtype: np.ndarray (int64), np.ndarray (int32)
+        """
+        key_chunks = []
+        sector_chunks = []
+        for i, coords_list in enumerate(coords_list_of_sector):
+            if not coords_list:
+                continue
+            cell_keys_of_sector = self.rasterize_coords_list(coords_list, closed_list_of_sector[i])
+            key_chunks.append(cell_keys_of_sector)
+            sector_chunks.append(np.full(len(cell_keys_of_sector), first_sector_id + i, dtype=np.int32))
+        all_keys = np.concatenate(key_chunks) if key_chunks else np.empty(0, dtype=np.int64)
+        all_sectors = np.concatenate(sector_chunks) if sector_chunks else np.empty(0, dtype=np.int32)
+        return all_keys, all_sectors
+
+    # 由(格网编号, 扇区序号)对生成CSR索引并写入磁盘
+    def save(self, source_path, all_keys, all_sectors, sector_cgi, sector_group_id, sector_fid):
+        """
+        由(格网编号, 扇区序号)对生成CSR索引并写入磁盘，写入过程中先删除meta.json，中断后下次会自动重建
+        :return: 有覆盖的格网数量
+        :rtype: int
+        """
+        order = np.lexsort((all_sectors, all_keys))
+        all_keys = all_keys[order]
+        all_sectors = all_sectors[order]
+        cell_keys, cell_start = np.unique(all_keys, return_index=True)
+        indptr = np.append(cell_start, len(all_keys)).astype(np.int64)
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        meta_path = os.path.join(self.index_dir, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        arrays = {
+            'cell_keys': cell_keys.astype(np.int64),
+            'indptr': indptr,
+            'sector_ids': all_sectors.astype(np.int32),
+            'sector_cgi': sector_cgi,
+            'sector_group_id': sector_group_id,
+            'sector_fid': sector_fid,
+        }
+        # 释放旧数组的内存映射后再覆盖文件
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, None)
+        for name, array in arrays.items():
+            np.save(os.path.join(self.index_dir, f'{name}.npy'), array)
+        self.meta.update(self.get_source_identity(source_path))
+        self.meta['sector_count'] = len(sector_cgi)
+        with open(meta_path, 'w', encoding='utf-8') as meta_file:
+            json.dump(self.meta, meta_file, ensure_ascii=False)
+        self.load()
+        return len(cell_keys)
+
+    # 工参更新后增量更新索引，仅对新增和被修改的扇区进行栅格化
+    def update(self, source_path, removed_cgi_list, wkb_list, cgi_list, group_id_list, fid_list, cgi_fid_dict):
+        """
+        工参更新后增量更新已加载的索引：删除被删除和被修改扇区的格网，仅对新增和被修改的扇区进行栅格化，
+        保留扇区的要素id按新工参重新对应；新扇区超出原格网范围或保留扇区在新工参中找不到时返回-1，需全量重建
+        :param source_path: 新工参文件路径
+        :type source_path: str
+        :param removed_cgi_list: 被删除和被修改扇区的唯一标识列表
+        :type removed_cgi_list: list[str]
+        :param wkb_list: 新增和被修改扇区的多边形WKB列表
+        :type wkb_list: list[bytes]
+        :param cgi_list: 新增和被修改扇区的唯一标识列表
+        :type cgi_list: list[str]
+        :param group_id_list: 新增和被修改扇区的Group ID列表（已规范化为字符串）
+        :type group_id_list: list[str]
+        :param fid_list: 新增和被修改扇区在新工参中的要素id列表
+        :type fid_list: list[int]
+        :param cgi_fid_dict: 新工参全部扇区的唯一标识与要素id的对应关系
+        :type cgi_fid_dict: dict{str:int}
+        :return: 有覆盖的格网数量，需全量重建时为-1
+        :rtype: int
+        """
+        coords_closed_list_of_sector = [GeometryUtils.wkb_to_coords_list(wkb) for wkb in wkb_list]
+        coords_list_of_sector = [coords_closed[0] for coords_closed in coords_closed_list_of_sector]
+        closed_list_of_sector = [coords_closed[1] for coords_closed in coords_closed_list_of_sector]
+        bounds = [np.vstack(coords_list) for coords_list in coords_list_of_sector if coords_list]
+        if bounds:
+            all_coords = np.vstack(bounds)
+            x_max = self.meta['origin_x'] + self.meta['n_cols'] * self.cell_size
+            y_max = self.meta['origin_y'] + self.meta['n_rows'] * self.cell_size
+            if all_coords[:, 0].min() < self.meta['origin_x'] or all_coords[:, 1].min() < self.meta['origin_y'] \
+                    or all_coords[:, 0].max() >= x_max or all_coords[:, 1].max() >= y_max:
+                return -1
+
+        # 保留的扇区按原顺序重新编号，要素id按新工参重新对应
+        sector_cgi = np.array(self.sector_cgi)
+        keep = ~np.isin(sector_cgi, np.asarray(removed_cgi_list, dtype=str))
+        kept_cgi = sector_cgi[keep]
+        kept_fid = np.array([cgi_fid_dict.get(cgi, -1) for cgi in kept_cgi.tolist()], dtype=np.int64)
+        if (kept_fid < 0).any():
+            return -1
+        new_sector_id = np.full(len(sector_cgi), -1, dtype=np.int64)
+        new_sector_id[keep] = np.arange(keep.sum())
+
+        # 展开原CSR为(格网编号, 扇区序号)对，去除删除的扇区后与新栅格化结果合并
+        counts = np.diff(np.asarray(self.indptr))
+        old_keys = np.repeat(np.asarray(self.cell_keys), counts)
+        old_sectors = new_sector_id[np.asarray(self.sector_ids)]
+        pair_keep = old_sectors >= 0
+        added_keys, added_sectors = self.rasterize_sectors(coords_list_of_sector, closed_list_of_sector, len(kept_cgi))
+        return self.save(source_path,
+                         np.concatenate([old_keys[pair_keep], added_keys]),
+                         np.concatenate([old_sectors[pair_keep].astype(np.int32), added_sectors]),
+                         np.concatenate([kept_cgi, np.asarray(cgi_list, dtype=str)]),
+                         np.concatenate([np.asarray(self.sector_group_id)[keep], np.asarray(group_id_list, dtype=str)]),
+                         np.concatenate([kept_fid, np.asarray(fid_list, dtype=np.int64)]))
+
+    # 将若干[start, end)区间展开为下标数组
+    @staticmethod
+    def expand_ranges(starts, ends):
+        """
+        将若干[start, end)区间展开为下标数组
+        :return: 每个下标所属区间的序号，展开后的下标
+        :rtype: np.ndarray, np.ndarray
+        """
+        lengths = np.maximum(np.asarray(ends) - np.asarray(starts), 0)
+        owner = np.repeat(np.arange(len(lengths)), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return owner, np.repeat(starts, lengths) + offsets
+
+    # 由格网在cell_keys中的位置获取扇区序号
+    def get_sector_ids_by_cell_position(self, cell_position):
+        """
+        由格网在cell_keys中的位置获取扇区序号
+        :param cell_position: 格网在cell_keys中的位置
+        :type cell_position: np.ndarray
+        :return: 每个扇区对应的输入序号，扇区序号
+        :rtype: np.ndarray, np.ndarray
+        """
+        owner, sector_position = self.expand_ranges(self.indptr[cell_position], self.indptr[cell_position + 1])
+        return owner, np.asarray(self.sector_ids[sector_position])
+
+    # 查询面覆盖的扇区
+    def query_polygon(self, wkb):
+        """
+        查询面覆盖的扇区，面需与索引位于同一坐标系
+        :param wkb: 面的WKB
+        :type wkb: bytes
+        :return: 扇区序号（升序、去重）
+        :rtype: np.ndarray
+        """
+        coords_list, closed_list = GeometryUtils.wkb_to_coords_list(wkb)
+        if not coords_list or not len(self.cell_keys):
+            return np.empty(0, dtype=np.int32)
+        keys = self.rasterize_coords_list(coords_list, closed_list)
+        position = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        position = position[np.asarray(self.cell_keys[position]) == keys]
+        return np.unique(self.get_sector_ids_by_cell_position(position)[1])
+
+    # 查询以各点为圆心、给定半径的圆覆盖的扇区
+    def query_points_within(self, x, y, radius):
+        """
+        查询以各点为圆心、给定半径的圆覆盖的扇区，即扇区所在格网与圆心的最小距离不超过半径
+        :param x: 圆心X坐标
+        :type x: np.ndarray (n,)
+        :param y: 圆心Y坐标
+        :type y: np.ndarray (n,)
+        :param radius: 半径（坐标系单位）
+        :type radius: float
+        :return: 点序号数组，扇区序号数组（每对唯一，按点序号、扇区序号排序）
+        :rtype: np.ndarray, np.ndarray
+        """
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if not len(x) or not len(self.cell_keys):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        n_cols = self.meta['n_cols']
+        col_min, row_min = self.get_cell_col_row(x - radius, y - radius)
+        col_max, row_max = self.get_cell_col_row(x + radius, y + radius)
+        col_min = np.clip(col_min, 0, n_cols - 1)
+        col_max = np.clip(col_max, 0, n_cols - 1)
+        row_min = np.clip(row_min, 0, self.meta['n_rows'] - 1)
+        row_max = np.clip(row_max, 0, self.meta['n_rows'] - 1)
+        # 每个点外包框覆盖的每一行，在cell_keys中二分查找该行[col_min, col_max]区间
+        point_of_row, row = self.expand_ranges(row_min, row_max + 1)
+        starts = np.searchsorted(self.cell_keys, row * n_cols + col_min[point_of_row], side='left')
+        ends = np.searchsorted(self.cell_keys, row * n_cols + col_max[point_of_row], side='right')
+        row_of_cell, cell_position = self.expand_ranges(starts, ends)
+        point_of_cell = point_of_row[row_of_cell]
+        cell_keys = np.asarray(self.cell_keys[cell_position])
+        cell_x = self.meta['origin_x'] + (cell_keys % n_cols + 0.5) * self.cell_size
+        cell_y = self.meta['origin_y'] + (cell_keys // n_cols + 0.5) * self.cell_size
+        dx = np.maximum(np.abs(cell_x - x[point_of_cell]) - self.cell_size / 2, 0)
+        dy = np.maximum(np.abs(cell_y - y[point_of_cell]) - self.cell_size / 2, 0)
+        within = dx * dx + dy * dy <= radius * radius
+        point_of_cell = point_of_cell[within]
+        owner, sector_ids = self.get_sector_ids_by_cell_position(cell_position[within])
+        pairs = np.unique(np.column_stack((point_of_cell[owner], sector_ids)).astype(np.int64), axis=0)
+        return pairs[:, 0], pairs[:, 1].astype(np.int32)
+
+
+class ProjectDistanceField(RasterGrid):
+    """
+    项目距离场：将项目几何栅格化到以项目外包框外扩pad的窗口格网，通过精确欧氏距离变换（EDT）得到每个格网到项目的距离，
+    扇区到项目的最小距离即扇区所在格网距离的最小值，与扇区数量和项目下属小区数量无关
+    距离以格网中心计算，与精确距离的误差不超过tolerance（见get_tolerance），需要精确结果的扇区应回退到精确计算
+    """
+
+    # 距离场距离与精确距离的误差上界
+    @staticmethod
+    def get_tolerance(cell_size):
+        """
+        距离场距离与精确距离的误差上界：栅格化时边界按半个格网间距采样，边界上任一点到最近采样点不超过cell/4，
+        采样点到所在格网中心不超过cell*√2/2，因此几何上任一边界点到其栅格中某格网中心不超过cell/4+cell*√2/2；
+        反之栅格中任一格网中心到几何不超过cell*√2/2。两个几何各计一次，距离场距离比精确距离最多大cell*√2+cell/2，
+        最多小cell*√2
+        :param cell_size: 格网边长（米）
+        :type cell_size: float
+        :return: 误差上界（米）
+        :rtype: float
+        """
+        return cell_size * (math.sqrt(2) + 0.5)
+
+    def __init__(self, project_wkb, pad, cell_size=20):
+        """
+        :param project_wkb: 项目几何WKB（米制坐标系）
+        :type project_wkb: bytes
+        :param pad: 窗口外扩距离（米），应不小于判定阈值与两倍容差之和
+        :type pad: float
+        :param cell_size: 格网边长（米）
+        :type cell_size: float
+        """
+        super().__init__(cell_size)
+        self.tolerance = self.get_tolerance(self.cell_size)
+        self.pad = float(pad)
+        coords_list, closed_list = GeometryUtils.wkb_to_coords_list(project_wkb)
+        all_coords = np.vstack(coords_list)
+        origin_x = float(all_coords[:, 0].min() - self.pad)
+        origin_y = float(all_coords[:, 1].min() - self.pad)
+        self.meta = {'cell_size': self.cell_size, 'origin_x': origin_x, 'origin_y': origin_y,
+                     'n_cols': int(np.ceil((all_coords[:, 0].max() + self.pad - origin_x) / self.cell_size)) + 1,
+                     'n_rows': int(np.ceil((all_coords[:, 1].max() + self.pad - origin_y) / self.cell_size)) + 1}
+        outside = np.ones(self.meta['n_rows'] * self.meta['n_cols'], dtype=bool)
+        outside[self.rasterize_coords_list(coords_list, closed_list)] = False
+        self.field = ndimage.distance_transform_edt(outside.reshape(self.meta['n_rows'], self.meta['n_cols']),
+                                                    sampling=self.cell_size).ravel()
+
+    # 批量获取几何到项目的距离，并给出需要精确计算的几何序号
+    def get_distance_list(self, wkb_list, threshold):
+        """
+        批量获取几何到项目的距离，并给出需要精确计算的几何序号：
+        距离与阈值之差在容差内（分类可能与精确结果不同）、或几何不在窗口内（距离超出距离场范围）
+        :param wkb_list: 几何WKB列表（与项目同一米制坐标系）
+        :type wkb_list: list[bytes]
+        :param threshold: 判定阈值（米）
+        :type threshold: float
+        :return: 距离列表（米），需要精确计算的几何序号列表
+        :rtype: list[float], list[int]
+        """
+        distance_list = []
+        exact_index_list = []
+        for i, wkb in enumerate(wkb_list):
+            coords_list, closed_list = GeometryUtils.wkb_to_coords_list(wkb)
+            keys = self.rasterize_coords_list(coords_list, closed_list) if coords_list else np.empty(0, dtype=np.int64)
+            distance = float(self.field[keys].min()) if len(keys) else math.inf
+            if abs(distance - threshold) <= self.tolerance or distance >= self.pad - self.tolerance:
+                exact_index_list.append(i)
+            distance_list.append(distance)
+        return distance_list, exact_index_list
@@ -0,0 +1,133 @@
+"""
+ @file
+ @brief
+ @author T.Ding <zhengting20001@126.com>
+
+ @section LICENSE
+
+ Copyright (c) 2025 T.Ding
+
+ ToB Wireless Manager is free software: you can redistribute it and/or modify
+ it under the terms of the GNU General Public License as published by
+ the Free Software Foundation, either version 3 of the License, or
+ (at your option) any later version.
+
+ ToB Wireless Manager is distributed in the hope that it will be useful,
+ but WITHOUT ANY WARRANTY; without even the implied warranty of
+ MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ GNU General Public License for more details.
+
+ You should have received a copy of the GNU General Public License
+ along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import numpy as np
+
+# Shapely 2为可选依赖，未安装或版本低于2时分析方法自动回退到QGIS逐要素计算
+try:
+    import shapely
+    SHAPELY_AVAILABLE = int(shapely.__version__.split('.')[0]) >= 2
+except ImportError:
+    shapely = None
+    SHAPELY_AVAILABLE = False
+
+
+class ShapelyIndex:
+    """
+    基于Shapely 2的几何数组和STRtree，对一组几何（通常为一个图层的全部要素）建立索引，
+    查询时以数组方式一次性完成候选筛选和精确谓词判定
+    """
+
+    def __init__(self, wkb_list, key_list, attribute_dict=None):
+        """
+        :param wkb_list: 几何WKB列表
+        :type wkb_list: list[bytes]
+        :param key_list: 与几何一一对应的键（例如要素id）
+        :type key_list: list
+        :param attribute_dict: 与几何一一对应的属性列，key为列名，value为列值列表
+        :type attribute_dict: dict{str:list}
+        """
+        self.geometries = shapely.from_wkb(wkb_list)
+        self.keys = np.asarray(key_list)
+        self.attribute_dict = attribute_dict if attribute_dict else {}
+        self.tree = shapely.STRtree(self.geometries)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def query(self, wkb_list, predicate='intersects', distance=None):
+        """
+        对一组查询几何进行批量查询，返回满足谓词的(查询几何序号, 索引几何序号)对，按查询几何序号、索引几何序号排序
+        :param wkb_list: 查询几何WKB列表
+        :type wkb_list: list[bytes]
+        :param predicate: 空间谓词，例如intersects、contains、dwithin
+        :type predicate: str
+        :param distance: predicate为dwithin时的距离
+        :type distance: float
+        :return: 查询几何序号数组，索引几何序号数组
+        :rtype: np.ndarray, np.ndarray
+        """
+        if not wkb_list or not len(self.keys):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        query_geometries = shapely.from_wkb(wkb_list)
+        if predicate == 'dwithin':
+            query_index, tree_index = self.tree.query(query_geometries, predicate=predicate, distance=distance)
+        else:
+            query_index, tree_index = self.tree.query(query_geometries, predicate=predicate)
+        order = np.lexsort((tree_index, query_index))
+        return query_index[order], tree_index[order]
+
+    def query_distance_and_overlap(self, wkb_list, distance):
+        """
+        对一组查询几何进行距离约束的批量连接（STRtree dwithin剪枝），返回满足条件的几何对及其最小距离和重叠面积
+        :param wkb_list: 查询几何WKB列表（与索引几何同一米制坐标系）
+        :type wkb_list: list[bytes]
+        :param distance: 距离上限
+        :type distance: float
+        :return: 查询几何序号数组，索引几何序号数组，最小距离数组，重叠面积数组
+        :rtype: np.ndarray, np.ndarray, np.ndarray, np.ndarray
+        """
+        query_index, tree_index = self.query(wkb_list, 'dwithin', distance)
+        if not len(query_index):
+            return query_index, tree_index, np.empty(0), np.empty(0)
+        query_geometries = shapely.from_wkb(wkb_list)[query_index]
+        tree_geometries = self.geometries[tree_index]
+        distance_array = shapely.distance(query_geometries, tree_geometries)
+        overlap_area_array = np.zeros(len(query_index))
+        intersects = distance_array == 0
+        if intersects.any():
+            overlap_area_array[intersects] = shapely.area(
+                shapely.intersection(query_geometries[intersects], tree_geometries[intersects]))
+        return query_index, tree_index, distance_array, overlap_area_array
+
+    def get_attribute(self, column_name, tree_index):
+        """
+        按索引几何序号获取属性值
+        :param column_name: 属性列名
+        :type column_name: str
+        :param tree_index: 索引几何序号
+        :type tree_index: int
+        :return: 属性值
+        """
+        return self.attribute_dict[column_name][tree_index]
+
+
+class ShapelyUtils:
+
+    # 批量计算一组几何到同一目标几何的最小距离
+    @staticmethod
+    def distance_list_to_geometry(wkb_list, target_wkb):
+        """
+        批量计算一组几何到同一目标几何的最小距离，目标几何预处理后复用
+        :param wkb_list: 几何WKB列表
+        :type wkb_list: list[bytes]
+        :param target_wkb: 目标几何WKB
+        :type target_wkb: bytes
+        :return: 距离列表
+        :rtype: list[float]
+        """
+        if not wkb_list:
+            return []
+        target_geometry = shapely.from_wkb(target_wkb)
+        shapely.prepare(target_geometry)
+        return shapely.distance(shapely.from_wkb(wkb_list), target_geometry).tolist()
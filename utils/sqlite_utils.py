@@ -21,8 +21,17 @@
  along with ToB Wireless Manager.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import json
+import math
 import sqlite3
 
+import numpy as np
+
+from utils.hex_utils import HexUtils
+
+# 项目明细中用于项目图层加载的二进制几何列及外包框列，不参与详情展示和图层属性
+PROJECT_GEOMETRY_COLUMNS = ('WKB', 'BBOX_XMIN', 'BBOX_YMIN', 'BBOX_XMAX', 'BBOX_YMAX')
+
 
 class SqliteUtils:
 
@@ -96,10 +105,40 @@ class SqliteUtils:
                 return None
             detail_data = result[0]
         for index, description in enumerate(cursor.description):
-            if description[0] != '序号':
+            if description[0] != '序号' and description[0] not in PROJECT_GEOMETRY_COLUMNS:
                 detail_title_and_data_return.append([description[0], str(detail_data[index])])
         return detail_title_and_data_return
 
+    # 批量获取明细表内容，用于明细缓存的预取
+    @staticmethod
+    def get_detail_table_dict(conn, level, vlookup_field_list):
+        """
+        批量获取明细表内容，返回格式与get_detail_table一致，用于明细缓存的预取
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param level: 0为项目，1为基站，2为小区
+        :type level: int
+        :param vlookup_field_list: 项目名称、基站号或CGI列表
+        :type vlookup_field_list: list[str]
+        :return: key为项目名称、基站号或CGI，value为[字段名, 字段值]列表
+        :rtype: dict{str:list[list[str]]}
+        """
+        table_name, key_column = [('项目明细', '项目名称'), ('基站明细', '基站号'), ('小区明细', 'CGI')][level]
+        cursor = conn.cursor()
+        detail_dict = {}
+        vlookup_field_list = [str(vlookup_field) for vlookup_field in vlookup_field_list]
+        for start in range(0, len(vlookup_field_list), 500):
+            chunk = vlookup_field_list[start:start + 500]
+            cursor.execute(f"SELECT * FROM {table_name} WHERE {key_column} IN ({','.join('?' * len(chunk))})", chunk)
+            column_list = [description[0] for description in cursor.description]
+            key_index = column_list.index(key_column)
+            for detail_data in cursor.fetchall():
+                # 与get_detail_table一致，同一键值仅取第一行
+                detail_dict.setdefault(str(detail_data[key_index]), [
+                    [column, str(detail_data[index])] for index, column in enumerate(column_list)
+                    if column != '序号' and column not in PROJECT_GEOMETRY_COLUMNS])
+        return detail_dict
+
     # 从数据库获取项目明细表的全部内容并反馈，包括wkt，用于项目图层制作
     @staticmethod
     def get_project_full_data_include_wkt(conn,project_name=''):
@@ -122,7 +161,7 @@ class SqliteUtils:
         for result in results:
             single_project_dict = {}
             for index, description in enumerate(cursor.description):
-                if description[0] != '序号':
+                if description[0] != '序号' and description[0] not in PROJECT_GEOMETRY_COLUMNS:
                     if str(description[0]).lower() == 'wkt':
                         single_project_dict['wkt'] = str(result[index])
                     else:
@@ -130,6 +169,972 @@ class SqliteUtils:
             data_dict_list_return.append(single_project_dict)
         return data_dict_list_return
 
+    # 从数据库获取项目明细表的全部内容并反馈，几何直接以WKB二进制返回，用于项目图层制作
+    @staticmethod
+    def get_project_full_data_include_wkb(conn, project_name=''):
+        """
+        从数据库获取项目明细表的全部内容并反馈，几何直接以WKB二进制返回（不读取WKT文本），用于项目图层制作
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_name: 项目名称，为空时返回全部项目
+        :type project_name: str
+        :return: data_dict_list_return，一个列表，里面每个项目是一个dict，key为wkb的值为WKB二进制（无效几何为空bytes）
+        :rtype: list
+        """
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(项目明细)")
+        column_list = [row[1] for row in cursor.fetchall()
+                       if row[1] != '序号' and str(row[1]).lower() != 'wkt' and row[1] not in PROJECT_GEOMETRY_COLUMNS]
+        column_sql_token = ', '.join([f'"{column}"' for column in column_list])
+        if project_name:
+            cursor.execute(f"SELECT {column_sql_token}, WKB FROM 项目明细 WHERE 项目名称=?", (project_name,))
+        else:
+            cursor.execute(f"SELECT {column_sql_token}, WKB FROM 项目明细")
+        results = cursor.fetchall()
+        if not results:
+            return None
+        data_dict_list_return = []
+        for result in results:
+            single_project_dict = dict(zip(column_list, result[:-1]))
+            single_project_dict['wkb'] = bytes(result[-1]) if result[-1] else b''
+            data_dict_list_return.append(single_project_dict)
+        return data_dict_list_return
+
+    # 为项目明细增加WKB几何列和外包框列，并建立WKT变更时使其失效的触发器，可重复调用
+    @staticmethod
+    def migrate_project_geometry_wkb(conn):
+        """
+        为项目明细增加WKB几何列和外包框列（BBOX_XMIN/BBOX_YMIN/BBOX_XMAX/BBOX_YMAX，EPSG:4326），
+        并建立触发器：WKT被修改时清空WKB和外包框，等待下次回填（数据库可能由外部工具维护，触发器中不使用自定义函数）
+        该方法可重复调用，已迁移的数据库不会重复修改
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 本次新增的列名列表
+        :rtype: list[str]
+        """
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(项目明细)")
+        existing_column_list = [row[1] for row in cursor.fetchall()]
+        added_column_list = []
+        for column in PROJECT_GEOMETRY_COLUMNS:
+            if column not in existing_column_list:
+                cursor.execute(f"ALTER TABLE 项目明细 ADD COLUMN {column} {'BLOB' if column == 'WKB' else 'REAL'}")
+                added_column_list.append(column)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS 项目明细_WKT更新_清空WKB
+            AFTER UPDATE OF WKT ON 项目明细
+            FOR EACH ROW WHEN NEW.WKT IS NOT OLD.WKT
+            BEGIN
+                UPDATE 项目明细 SET WKB = NULL, BBOX_XMIN = NULL, BBOX_YMIN = NULL, BBOX_XMAX = NULL, BBOX_YMAX = NULL
+                WHERE rowid = NEW.rowid;
+            END""")
+        conn.commit()
+        return added_column_list
+
+    # 建立项目外包框的R*Tree空间索引，并通过触发器与项目明细的外包框列保持同步，可重复调用
+    @staticmethod
+    def create_project_bbox_rtree(conn):
+        """
+        建立项目外包框的R*Tree空间索引（项目外包框索引，id为项目明细的rowid），并通过触发器与项目明细的外包框列保持同步
+        需先调用migrate_project_geometry_wkb完成外包框列的迁移，该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 是否成功建立（SQLite未编译R*Tree模块时返回False，查询时退化为外包框列扫描）
+        :rtype: bool
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='项目外包框索引'")
+        if cursor.fetchone():
+            return True
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE 项目外包框索引 USING rtree(id, xmin, xmax, ymin, ymax)")
+        except sqlite3.OperationalError:
+            return False
+        cursor.execute("""
+            INSERT INTO 项目外包框索引
+            SELECT rowid, BBOX_XMIN, BBOX_XMAX, BBOX_YMIN, BBOX_YMAX FROM 项目明细 WHERE BBOX_XMIN IS NOT NULL""")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS 项目明细_外包框插入_同步索引
+            AFTER INSERT ON 项目明细
+            FOR EACH ROW WHEN NEW.BBOX_XMIN IS NOT NULL
+            BEGIN
+                INSERT INTO 项目外包框索引 VALUES (NEW.rowid, NEW.BBOX_XMIN, NEW.BBOX_XMAX, NEW.BBOX_YMIN, NEW.BBOX_YMAX);
+            END""")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS 项目明细_外包框更新_同步索引
+            AFTER UPDATE OF BBOX_XMIN, BBOX_YMIN, BBOX_XMAX, BBOX_YMAX ON 项目明细
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM 项目外包框索引 WHERE id = OLD.rowid;
+                INSERT INTO 项目外包框索引
+                SELECT NEW.rowid, NEW.BBOX_XMIN, NEW.BBOX_XMAX, NEW.BBOX_YMIN, NEW.BBOX_YMAX WHERE NEW.BBOX_XMIN IS NOT NULL;
+            END""")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS 项目明细_删除_同步索引
+            AFTER DELETE ON 项目明细
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM 项目外包框索引 WHERE id = OLD.rowid;
+            END""")
+        conn.commit()
+        return True
+
+    # 查询外包框与给定外包框（EPSG:4326）距离在distance米以内的项目，用于冲突评估前的候选项目筛选
+    @staticmethod
+    def get_project_list_near_bbox(conn, xmin, ymin, xmax, ymax, distance):
+        """
+        查询外包框与给定外包框（EPSG:4326）距离在distance米以内的项目，用于冲突评估前的候选项目筛选，
+        返回的是候选集（外包框判定），仍需对候选项目进行精确距离计算
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param xmin: 外包框最小经度
+        :type xmin: float
+        :param ymin: 外包框最小纬度
+        :type ymin: float
+        :param xmax: 外包框最大经度
+        :type xmax: float
+        :param ymax: 外包框最大纬度
+        :type ymax: float
+        :param distance: 距离，米
+        :type distance: float
+        :return: 候选项目名称列表
+        :rtype: list[str]
+        """
+        # 米转为经纬度时预留1%余量，抵消投影坐标系（EPSG:32650）的尺度误差
+        delta_lat = distance * 1.01 / 111320
+        delta_lon = distance * 1.01 / (111320 * max(math.cos(math.radians((ymin + ymax) / 2)), 0.01))
+        query_bbox = (xmin - delta_lon, xmax + delta_lon, ymin - delta_lat, ymax + delta_lat)
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT 项目明细.项目名称 FROM 项目外包框索引 JOIN 项目明细 ON 项目明细.rowid = 项目外包框索引.id
+                WHERE 项目外包框索引.xmax >= ? AND 项目外包框索引.xmin <= ?
+                AND 项目外包框索引.ymax >= ? AND 项目外包框索引.ymin <= ?""", query_bbox)
+        except sqlite3.OperationalError:
+            cursor.execute("""
+                SELECT 项目名称 FROM 项目明细
+                WHERE BBOX_XMAX >= ? AND BBOX_XMIN <= ? AND BBOX_YMAX >= ? AND BBOX_YMIN <= ?""", query_bbox)
+        return [result[0] for result in cursor.fetchall()]
+
+    @staticmethod
+    def get_project_wkt_without_wkb(conn):
+        """
+        获取尚未回填WKB的项目（新增项目或WKT被修改过的项目）
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 一组[rowid, wkt]
+        :rtype: list[tuple]
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT rowid, WKT FROM 项目明细 WHERE WKB IS NULL")
+        return [(result[0], str(result[1]) if result[1] is not None else '') for result in cursor.fetchall()]
+
+    @staticmethod
+    def update_project_wkb(conn, wkb_row_list):
+        """
+        批量回填项目的WKB和外包框
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param wkb_row_list: 一组(wkb, xmin, ymin, xmax, ymax, rowid)，无效几何的wkb为空bytes，外包框为None
+        :type wkb_row_list: list[tuple]
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.executemany(
+            "UPDATE 项目明细 SET WKB=?, BBOX_XMIN=?, BBOX_YMIN=?, BBOX_XMAX=?, BBOX_YMAX=? WHERE rowid=?",
+            wkb_row_list)
+        conn.commit()
+
+    # 建立扇区和项目的六边形格网索引表
+    @staticmethod
+    def create_hex_index_tables(conn):
+        """
+        建立扇区六边形索引、项目六边形索引和六边形索引数据源表，并通过触发器在项目WKB变化或项目删除时清除对应项目的六边形索引，
+        该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 扇区六边形索引 (
+                图层名称 TEXT, 唯一标识 TEXT, 分辨率 INTEGER, 六边形编号 INTEGER)""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 扇区六边形索引_六边形编号 ON 扇区六边形索引 (分辨率, 六边形编号)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 扇区六边形索引_唯一标识 ON 扇区六边形索引 (唯一标识, 分辨率)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 项目六边形索引 (
+                项目名称 TEXT, 分辨率 INTEGER, 六边形编号 INTEGER)""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 项目六边形索引_六边形编号 ON 项目六边形索引 (分辨率, 六边形编号)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 项目六边形索引_项目名称 ON 项目六边形索引 (项目名称, 分辨率)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS 六边形索引数据源 (图层名称 TEXT PRIMARY KEY, 数据源 TEXT)")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS 项目明细_WKB更新_清空六边形索引
+            AFTER UPDATE OF WKB ON 项目明细
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM 项目六边形索引 WHERE 项目名称 = OLD.项目名称;
+            END""")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS 项目明细_删除_清空六边形索引
+            AFTER DELETE ON 项目明细
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM 项目六边形索引 WHERE 项目名称 = OLD.项目名称;
+            END""")
+        conn.commit()
+
+    @staticmethod
+    def get_sector_hex_index_source(conn, layer_name):
+        """
+        获取扇区图层六边形索引建立时的数据源（工参文件标识），用于判定是否需要重建
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 扇区图层名称
+        :type layer_name: str
+        :return: 数据源，未建立时为空字符串
+        :rtype: str
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 数据源 FROM 六边形索引数据源 WHERE 图层名称=?", (layer_name,))
+        result = cursor.fetchone()
+        return result[0] if result else ''
+
+    @staticmethod
+    def replace_sector_hex_index(conn, layer_name, source, hex_row_list):
+        """
+        在一个事务内替换扇区图层的全部六边形索引
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 扇区图层名称
+        :type layer_name: str
+        :param source: 数据源（工参文件标识）
+        :type source: str
+        :param hex_row_list: 一组(唯一标识, 分辨率, 六边形编号)
+        :type hex_row_list: list[tuple]
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM 扇区六边形索引 WHERE 图层名称=?", (layer_name,))
+        cursor.executemany("INSERT INTO 扇区六边形索引 VALUES (?, ?, ?, ?)",
+                           ((layer_name,) + hex_row for hex_row in hex_row_list))
+        cursor.execute("INSERT OR REPLACE INTO 六边形索引数据源 VALUES (?, ?)", (layer_name, source))
+        conn.commit()
+
+    @staticmethod
+    def update_sector_hex_index(conn, layer_name, source, removed_cgi_list, hex_row_list):
+        """
+        在一个事务内增量更新扇区图层的六边形索引：删除被删除和被修改扇区的索引，写入新增和被修改扇区的索引
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 扇区图层名称
+        :type layer_name: str
+        :param source: 新的数据源（工参文件标识）
+        :type source: str
+        :param removed_cgi_list: 需删除索引的扇区唯一标识列表
+        :type removed_cgi_list: list[str]
+        :param hex_row_list: 一组(唯一标识, 分辨率, 六边形编号)
+        :type hex_row_list: list[tuple]
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.executemany("DELETE FROM 扇区六边形索引 WHERE 唯一标识=? AND 图层名称=?",
+                           ((cgi, layer_name) for cgi in removed_cgi_list))
+        cursor.executemany("INSERT INTO 扇区六边形索引 VALUES (?, ?, ?, ?)",
+                           ((layer_name,) + hex_row for hex_row in hex_row_list))
+        cursor.execute("INSERT OR REPLACE INTO 六边形索引数据源 VALUES (?, ?)", (layer_name, source))
+        conn.commit()
+
+    # 建立扇区指纹表，用于新旧工参的增量比对，可重复调用
+    @staticmethod
+    def create_sector_fingerprint_tables(conn):
+        """
+        建立扇区指纹表（每个扇区的几何哈希、属性哈希、Group ID和外包框）及指纹数据源表，用于新旧工参的增量比对，
+        该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 扇区指纹 (
+                图层名称 TEXT, 唯一标识 TEXT, 几何哈希 TEXT, 属性哈希 TEXT, 分组 TEXT,
+                XMIN REAL, YMIN REAL, XMAX REAL, YMAX REAL, PRIMARY KEY (图层名称, 唯一标识))""")
+        cursor.execute("CREATE TABLE IF NOT EXISTS 扇区指纹数据源 (图层名称 TEXT PRIMARY KEY, 数据源 TEXT)")
+        conn.commit()
+
+    @staticmethod
+    def get_sector_fingerprint_source(conn, layer_name):
+        """
+        获取扇区指纹对应的数据源（工参文件标识）
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 扇区图层名称
+        :type layer_name: str
+        :return: 数据源，未建立时为空字符串
+        :rtype: str
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 数据源 FROM 扇区指纹数据源 WHERE 图层名称=?", (layer_name,))
+        result = cursor.fetchone()
+        return result[0] if result else ''
+
+    @staticmethod
+    def get_sector_fingerprint_dict(conn, layer_name):
+        """
+        获取扇区图层的全部扇区指纹
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 扇区图层名称
+        :type layer_name: str
+        :return: key为唯一标识，value为(几何哈希, 属性哈希, 分组, xmin, ymin, xmax, ymax)
+        :rtype: dict{str:tuple}
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 唯一标识, 几何哈希, 属性哈希, 分组, XMIN, YMIN, XMAX, YMAX FROM 扇区指纹 WHERE 图层名称=?",
+                       (layer_name,))
+        return {result[0]: tuple(result[1:]) for result in cursor.fetchall()}
+
+    @staticmethod
+    def replace_sector_fingerprint(conn, layer_name, source, fingerprint_dict):
+        """
+        在一个事务内替换扇区图层的全部扇区指纹
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 扇区图层名称
+        :type layer_name: str
+        :param source: 数据源（工参文件标识）
+        :type source: str
+        :param fingerprint_dict: key为唯一标识，value为(几何哈希, 属性哈希, 分组, xmin, ymin, xmax, ymax)
+        :type fingerprint_dict: dict{str:tuple}
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM 扇区指纹 WHERE 图层名称=?", (layer_name,))
+        cursor.executemany("INSERT INTO 扇区指纹 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           ((layer_name, cgi) + fingerprint for cgi, fingerprint in fingerprint_dict.items()))
+        cursor.execute("INSERT OR REPLACE INTO 扇区指纹数据源 VALUES (?, ?)", (layer_name, source))
+        conn.commit()
+
+    @staticmethod
+    def create_parameter_catalog_table(conn):
+        """
+        建立工参快照目录表，登记工参目录中每一期工参文件的日期、序号、路径、文件大小、修改时间、要素数量和内容哈希，
+        该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 工参快照 (
+                路径 TEXT PRIMARY KEY, 图层名称 TEXT, 日期 TEXT, 序号 INTEGER, 文件大小 INTEGER, 修改时间 INTEGER,
+                要素数量 INTEGER, 内容哈希 TEXT, 登记时间 TEXT)""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 工参快照_图层日期 ON 工参快照 (图层名称, 日期, 序号)")
+        conn.commit()
+
+    @staticmethod
+    def get_parameter_catalog_stat_dict(conn):
+        """
+        获取已登记工参文件的大小和修改时间，用于判断文件是否需要重新登记
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: key为路径，value为(文件大小, 修改时间)
+        :rtype: dict{str:tuple}
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 路径, 文件大小, 修改时间 FROM 工参快照")
+        return {result[0]: (result[1], result[2]) for result in cursor.fetchall()}
+
+    @staticmethod
+    def update_parameter_catalog(conn, snapshot_list, removed_path_list):
+        """
+        在一个事务内登记新增或变化的工参快照，并删除已不存在的工参文件
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param snapshot_list: 工参快照，每项为(路径, 图层名称, 日期, 序号, 文件大小, 修改时间, 要素数量, 内容哈希, 登记时间)
+        :type snapshot_list: list[tuple]
+        :param removed_path_list: 已不存在的工参文件路径
+        :type removed_path_list: list[str]
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.executemany("INSERT OR REPLACE INTO 工参快照 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", snapshot_list)
+        cursor.executemany("DELETE FROM 工参快照 WHERE 路径=?", ((path,) for path in removed_path_list))
+        conn.commit()
+
+    @staticmethod
+    def get_parameter_snapshot(conn, layer_name, date=None):
+        """
+        获取工参快照，date为空时为最新一期，否则为该日期的最后一期
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 图层名称，例如‘宏站扇区图层’
+        :type layer_name: str
+        :param date: 工参日期，形如‘20250519’
+        :type date: str
+        :return: key为工参快照表的字段名，不存在时为None
+        :rtype: dict
+        """
+        cursor = conn.cursor()
+        if date:
+            cursor.execute("SELECT * FROM 工参快照 WHERE 图层名称=? AND 日期=? ORDER BY 序号 DESC LIMIT 1",
+                           (layer_name, date))
+        else:
+            cursor.execute("SELECT * FROM 工参快照 WHERE 图层名称=? ORDER BY 日期 DESC, 序号 DESC LIMIT 1", (layer_name,))
+        result = cursor.fetchone()
+        return dict(zip([description[0] for description in cursor.description], result)) if result else None
+
+    @staticmethod
+    def get_parameter_snapshot_list(conn, layer_name):
+        """
+        获取图层的全部工参快照，按日期、序号由新到旧排列，用于历史工参比对
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param layer_name: 图层名称
+        :type layer_name: str
+        :return: 每项的key为工参快照表的字段名
+        :rtype: list[dict]
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM 工参快照 WHERE 图层名称=? ORDER BY 日期 DESC, 序号 DESC", (layer_name,))
+        column_names = [description[0] for description in cursor.description]
+        return [dict(zip(column_names, result)) for result in cursor.fetchall()]
+
+    @staticmethod
+    def get_project_list_without_hex_index(conn):
+        """
+        获取有几何但尚未建立六边形索引的项目（新增项目或几何被修改过的项目）
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 项目名称列表
+        :rtype: list[str]
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 项目名称 FROM 项目明细 WHERE length(WKB) > 0
+            AND 项目名称 NOT IN (SELECT DISTINCT 项目名称 FROM 项目六边形索引)""")
+        return [result[0] for result in cursor.fetchall()]
+
+    @staticmethod
+    def replace_project_hex_index(conn, hex_row_list_dict):
+        """
+        在一个事务内替换一组项目的六边形索引
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param hex_row_list_dict: key为项目名称，value为一组(分辨率, 六边形编号)
+        :type hex_row_list_dict: dict{str:list[tuple]}
+        :return: None
+        """
+        cursor = conn.cursor()
+        for project_name, hex_row_list in hex_row_list_dict.items():
+            cursor.execute("DELETE FROM 项目六边形索引 WHERE 项目名称=?", (project_name,))
+            cursor.executemany("INSERT INTO 项目六边形索引 VALUES (?, ?, ?)",
+                               ((project_name,) + hex_row for hex_row in hex_row_list))
+        conn.commit()
+
+    @staticmethod
+    def get_project_hex_cells(conn, project_name, resolution):
+        """
+        获取项目在指定分辨率下的六边形编号
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_name: 项目名称
+        :type project_name: str
+        :param resolution: 分辨率
+        :type resolution: int
+        :return: 六边形编号列表
+        :rtype: list[int]
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 六边形编号 FROM 项目六边形索引 WHERE 项目名称=? AND 分辨率=?", (project_name, resolution))
+        return [result[0] for result in cursor.fetchall()]
+
+    @staticmethod
+    def get_sector_hex_cells_by_cgi(conn, cgi_list, resolution):
+        """
+        获取一组扇区在指定分辨率下的六边形编号
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param cgi_list: 扇区唯一标识列表
+        :type cgi_list: list[str]
+        :param resolution: 分辨率
+        :type resolution: int
+        :return: key为唯一标识，value为六边形编号列表
+        :rtype: dict{str:list[int]}
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 唯一标识, 六边形编号 FROM 扇区六边形索引
+            WHERE 分辨率=? AND 唯一标识 IN (SELECT value FROM json_each(?))""", (resolution, json.dumps(cgi_list)))
+        hex_cells_dict_return = {}
+        for result in cursor.fetchall():
+            hex_cells_dict_return.setdefault(result[0], []).append(result[1])
+        return hex_cells_dict_return
+
+    @staticmethod
+    def get_sector_cgi_near_project_by_hex(conn, project_name, cgi_list, distance):
+        """
+        通过六边形索引的格网距离判定一组扇区中与项目距离必定不超过distance的扇区（整数运算，无需几何计算），
+        返回集合外的扇区仍需精确计算距离；仅访问数据库，可通过异步访问层在读线程中执行
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_name: 项目名称
+        :type project_name: str
+        :param cgi_list: 扇区唯一标识列表
+        :type cgi_list: list[str]
+        :param distance: 距离阈值（米）
+        :type distance: float
+        :return: 必定在阈值内的扇区唯一标识
+        :rtype: set[str]
+        """
+        # 选择格网距离k不小于2的最粗分辨率，兼顾格网数量和判定精度
+        resolution_list = sorted(HexUtils.RESOLUTION_EDGE, key=lambda res: -HexUtils.RESOLUTION_EDGE[res])
+        resolution = next((res for res in resolution_list if HexUtils.max_distance_of_grid_distance(2, res) <= distance),
+                          resolution_list[-1])
+        k = 0
+        while HexUtils.max_distance_of_grid_distance(k + 1, resolution) <= distance:
+            k += 1
+        if HexUtils.max_distance_of_grid_distance(k, resolution) > distance:
+            return set()
+        project_hex_cells = np.asarray(SqliteUtils.get_project_hex_cells(conn, project_name, resolution), dtype=np.int64)
+        if not len(project_hex_cells):
+            return set()
+        near_cgi_set_return = set()
+        for cgi, sector_hex_cells in SqliteUtils.get_sector_hex_cells_by_cgi(conn, cgi_list, resolution).items():
+            grid_distance = HexUtils.grid_distance(np.asarray(sector_hex_cells, dtype=np.int64)[:, None],
+                                                   project_hex_cells[None, :])
+            if grid_distance.min() <= k:
+                near_cgi_set_return.add(cgi)
+        return near_cgi_set_return
+
+    @staticmethod
+    def get_sector_cgi_list_by_hex_cells(conn, hex_cell_list, resolution):
+        """
+        获取与一组六边形有交集的扇区（整数关联），用于“哪些扇区与该区域相交”的候选筛选
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param hex_cell_list: 六边形编号列表
+        :type hex_cell_list: list[int]
+        :param resolution: 分辨率
+        :type resolution: int
+        :return: 扇区唯一标识列表
+        :rtype: list[str]
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT 唯一标识 FROM 扇区六边形索引
+            WHERE 分辨率=? AND 六边形编号 IN (SELECT value FROM json_each(?))""",
+                       (resolution, json.dumps([int(hex_cell) for hex_cell in hex_cell_list])))
+        return [result[0] for result in cursor.fetchall()]
+
+    @staticmethod
+    def get_project_list_by_hex_cells(conn, hex_cell_list, resolution):
+        """
+        获取与一组六边形有交集的项目（整数关联），传入项目六边形的k环即可用于邻近项目筛选
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param hex_cell_list: 六边形编号列表
+        :type hex_cell_list: list[int]
+        :param resolution: 分辨率
+        :type resolution: int
+        :return: 项目名称列表
+        :rtype: list[str]
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT 项目名称 FROM 项目六边形索引
+            WHERE 分辨率=? AND 六边形编号 IN (SELECT value FROM json_each(?))""",
+                       (resolution, json.dumps([int(hex_cell) for hex_cell in hex_cell_list])))
+        return [result[0] for result in cursor.fetchall()]
+
+    # 建立项目冲突矩阵表
+    @staticmethod
+    def create_project_conflict_tables(conn):
+        """
+        建立项目冲突表（每对项目只保存一行，项目名称A小于项目名称B）和项目冲突计算状态表（记录计算时的项目几何哈希），
+        并通过触发器在项目删除时清除相关记录，该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: None
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS 项目冲突 (
+                项目名称A TEXT, 项目名称B TEXT, 是否重叠 INTEGER, 重叠面积 REAL, 最小距离 REAL, 更新时间 TEXT,
+                PRIMARY KEY (项目名称A, 项目名称B))""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS 项目冲突_项目名称B ON 项目冲突 (项目名称B)")
+        cursor.execute("CREATE TABLE IF NOT EXISTS 项目冲突计算状态 (项目名称 TEXT PRIMARY KEY, 几何哈希 TEXT)")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS 项目明细_删除_清空项目冲突
+            AFTER DELETE ON 项目明细
+            FOR EACH ROW
+            BEGIN
+                DELETE FROM 项目冲突 WHERE 项目名称A = OLD.项目名称 OR 项目名称B = OLD.项目名称;
+                DELETE FROM 项目冲突计算状态 WHERE 项目名称 = OLD.项目名称;
+            END""")
+        conn.commit()
+
+    @staticmethod
+    def get_project_conflict_hash_dict(conn):
+        """
+        获取上次计算项目冲突时各项目的几何哈希
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: key为项目名称，value为几何哈希
+        :rtype: dict{str:str}
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 项目名称, 几何哈希 FROM 项目冲突计算状态")
+        return {result[0]: result[1] for result in cursor.fetchall()}
+
+    @staticmethod
+    def update_project_conflict(conn, project_hash_dict, removed_project_name_list, conflict_row_list):
+        """
+        在一个事务内增量更新项目冲突矩阵：清除变化项目和已删除项目的全部冲突记录后写入新的冲突记录，并更新计算状态
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_hash_dict: 本次重新计算的项目，key为项目名称，value为几何哈希
+        :type project_hash_dict: dict{str:str}
+        :param removed_project_name_list: 已不存在的项目名称列表
+        :type removed_project_name_list: list[str]
+        :param conflict_row_list: 一组(项目名称A, 项目名称B, 是否重叠, 重叠面积, 最小距离, 更新时间)
+        :type conflict_row_list: list[tuple]
+        :return: None
+        """
+        cursor = conn.cursor()
+        project_name_json = json.dumps(list(project_hash_dict) + list(removed_project_name_list), ensure_ascii=False)
+        cursor.execute("""
+            DELETE FROM 项目冲突 WHERE 项目名称A IN (SELECT value FROM json_each(?))
+            OR 项目名称B IN (SELECT value FROM json_each(?))""", (project_name_json, project_name_json))
+        cursor.executemany("INSERT OR REPLACE INTO 项目冲突 VALUES (?, ?, ?, ?, ?, ?)", conflict_row_list)
+        cursor.executemany("DELETE FROM 项目冲突计算状态 WHERE 项目名称=?",
+                           ((project_name,) for project_name in removed_project_name_list))
+        cursor.executemany("INSERT OR REPLACE INTO 项目冲突计算状态 VALUES (?, ?)", project_hash_dict.items())
+        conn.commit()
+
+    @staticmethod
+    def get_project_conflict_list(conn):
+        """
+        获取项目冲突矩阵，按是否重叠、最小距离排序
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 项目冲突记录
+        :rtype: list[dict]
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 项目名称A, 项目名称B, 是否重叠, 重叠面积, 最小距离, 更新时间 FROM 项目冲突
+            ORDER BY 是否重叠 DESC, 最小距离, 项目名称A, 项目名称B""")
+        column_names = [description[0] for description in cursor.description]
+        return [dict(zip(column_names, result)) for result in cursor.fetchall()]
+
+    # 物化汇总表定义：汇总表名 -> (来源表, [(汇总表键列, 来源表列)], 计数列, 去重列)
+    # 去重列不为空时计数为该列的不同取值数（例如同一项目重复录入同一小区只计1个项目），为空时计数为来源表行数
+    SUMMARY_TABLE_DEFINITIONS = {
+        '小区归属汇总': ('小区明细', [('CGI', 'CGI')], '项目数', '项目名称'),
+        '项目频段汇总': ('小区明细', [('项目名称', '项目名称'), ('频段', '频段')], '小区数', None),
+        '行政区基站汇总': ('基站明细', [('行政区', '行政区')], '基站数', None),
+        '行政区项目汇总': ('项目明细', [('行政区', '行政区')], '项目数', '项目名称'),
+    }
+
+    # 建立物化汇总表，并通过触发器随明细表的插入、删除和更新自动维护
+    @staticmethod
+    def create_summary_tables(conn):
+        """
+        建立物化汇总表（小区归属汇总、项目频段汇总、行政区基站汇总、行政区项目汇总），首次建立时从明细表全量统计，
+        之后通过明细表上的触发器增量维护计数，计数为0的行自动删除，空值统一记为空字符串；
+        有去重列的汇总表仅在明细表中首次出现或最后一次消失某个(键, 去重列)组合时增减计数；
+        库中已有触发器与当前定义不一致时（例如旧版本按行计数），删除触发器并重新全量统计；该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: None
+        """
+        cursor = conn.cursor()
+
+        # 来源表列与NEW/OLD行取值相等（空值与空字符串视为相同），拆为OR以便使用索引
+        def match_sql(column, row_prefix):
+            value = f"COALESCE({row_prefix}.{column}, '')"
+            return f"({column} = {value} OR ({value} = '' AND {column} IS NULL))"
+
+        for summary_table, (source_table, key_column_pair_list, count_column, distinct_column) in \
+                SqliteUtils.SUMMARY_TABLE_DEFINITIONS.items():
+            summary_column_list = [key_column_pair[0] for key_column_pair in key_column_pair_list]
+            source_column_list = [key_column_pair[1] for key_column_pair in key_column_pair_list]
+            summary_columns = ', '.join(summary_column_list)
+            watch_column_list = source_column_list + ([distinct_column] if distinct_column else [])
+            new_values = ', '.join(f"COALESCE(NEW.{column}, '')" for column in source_column_list)
+            old_condition = ' AND '.join(f"{summary_column} = COALESCE(OLD.{source_column}, '')"
+                                         for summary_column, source_column in key_column_pair_list)
+            if distinct_column:
+                new_match = ' AND '.join(match_sql(column, 'NEW') for column in watch_column_list)
+                old_match = ' AND '.join(match_sql(column, 'OLD') for column in watch_column_list)
+                increase_sql = f"""
+                INSERT INTO {summary_table} ({summary_columns}, {count_column})
+                SELECT {new_values}, 1 WHERE (SELECT COUNT(*) FROM {source_table} WHERE {new_match}) = 1
+                ON CONFLICT ({summary_columns}) DO UPDATE SET {count_column} = {count_column} + 1;"""
+                decrease_sql = f"""
+                UPDATE {summary_table} SET {count_column} = {count_column} - 1
+                WHERE {old_condition} AND NOT EXISTS (SELECT 1 FROM {source_table} WHERE {old_match});
+                DELETE FROM {summary_table} WHERE {count_column} <= 0;"""
+            else:
+                increase_sql = f"""
+                INSERT INTO {summary_table} ({summary_columns}, {count_column}) VALUES ({new_values}, 1)
+                ON CONFLICT ({summary_columns}) DO UPDATE SET {count_column} = {count_column} + 1;"""
+                decrease_sql = f"""
+                UPDATE {summary_table} SET {count_column} = {count_column} - 1 WHERE {old_condition};
+                DELETE FROM {summary_table} WHERE {count_column} <= 0;"""
+            # 仅在参与统计的列取值变化时触发更新，避免去重计数在取值未变时被重复增加
+            update_condition = ' OR '.join(f"COALESCE(OLD.{column}, '') IS NOT COALESCE(NEW.{column}, '')"
+                                           for column in watch_column_list)
+            trigger_sql_dict = {
+                f'{source_table}_插入_{summary_table}': f"""CREATE TRIGGER {source_table}_插入_{summary_table}
+                AFTER INSERT ON {source_table} FOR EACH ROW
+                BEGIN {increase_sql} END""",
+                f'{source_table}_删除_{summary_table}': f"""CREATE TRIGGER {source_table}_删除_{summary_table}
+                AFTER DELETE ON {source_table} FOR EACH ROW
+                BEGIN {decrease_sql} END""",
+                f'{source_table}_更新_{summary_table}': f"""CREATE TRIGGER {source_table}_更新_{summary_table}
+                AFTER UPDATE OF {', '.join(watch_column_list)} ON {source_table} FOR EACH ROW
+                WHEN {update_condition}
+                BEGIN {decrease_sql} {increase_sql} END"""}
+
+            cursor.execute(f"SELECT name, sql FROM sqlite_master WHERE type='trigger' AND name IN "
+                           f"({', '.join(['?'] * len(trigger_sql_dict))})", list(trigger_sql_dict))
+            if dict(cursor.fetchall()) != trigger_sql_dict:
+                for trigger_name in trigger_sql_dict:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+                cursor.execute(f"DROP TABLE IF EXISTS {summary_table}")
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (summary_table,))
+            if not cursor.fetchone():
+                cursor.execute(f"""
+                    CREATE TABLE {summary_table} (
+                        {', '.join(f'{column} TEXT NOT NULL' for column in summary_column_list)},
+                        {count_column} INTEGER NOT NULL, PRIMARY KEY ({summary_columns}))""")
+                source_columns = ', '.join(f"COALESCE({column}, '')" for column in source_column_list)
+                count_sql = f"COUNT(DISTINCT COALESCE({distinct_column}, ''))" if distinct_column else 'COUNT(*)'
+                cursor.execute(f"""
+                    INSERT INTO {summary_table} ({summary_columns}, {count_column})
+                    SELECT {source_columns}, {count_sql} FROM {source_table} GROUP BY {source_columns}""")
+            if distinct_column:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {source_table}_{'_'.join(watch_column_list)} "
+                               f"ON {source_table} ({', '.join(watch_column_list)})")
+            for trigger_name, trigger_sql in trigger_sql_dict.items():
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (trigger_name,))
+                if not cursor.fetchone():
+                    cursor.execute(trigger_sql)
+        conn.commit()
+
+    @staticmethod
+    def get_shared_cell_list(conn, min_project_count=2):
+        """
+        获取被多个项目同时使用的小区
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param min_project_count: 最少归属项目数
+        :type min_project_count: int
+        :return: 小区列表，包括CGI、项目数和项目列表（顿号分隔）
+        :rtype: list[dict]
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 小区归属汇总.CGI, 小区归属汇总.项目数, group_concat(小区项目.项目名称, '、')
+            FROM 小区归属汇总 JOIN (SELECT DISTINCT CGI, 项目名称 FROM 小区明细) AS 小区项目 ON 小区项目.CGI = 小区归属汇总.CGI
+            WHERE 小区归属汇总.项目数 >= ?
+            GROUP BY 小区归属汇总.CGI ORDER BY 小区归属汇总.项目数 DESC, 小区归属汇总.CGI""", (min_project_count,))
+        return [{'CGI': result[0], '项目数': result[1], '项目列表': result[2]} for result in cursor.fetchall()]
+
+    @staticmethod
+    def get_cell_project_count(conn, cgi):
+        """
+        获取一个小区的归属项目数
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param cgi: 小区号（CGI）
+        :type cgi: str
+        :return: 归属项目数
+        :rtype: int
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 项目数 FROM 小区归属汇总 WHERE CGI=?", (cgi,))
+        result = cursor.fetchone()
+        return result[0] if result else 0
+
+    @staticmethod
+    def get_project_shared_cell_count(conn, project_name):
+        """
+        获取一个项目中同时归属其他项目的小区数量
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_name: 项目名称
+        :type project_name: str
+        :return: 共享小区数量
+        :rtype: int
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(DISTINCT 小区明细.CGI) FROM 小区明细 JOIN 小区归属汇总 ON 小区归属汇总.CGI = 小区明细.CGI
+            WHERE 小区明细.项目名称 = ? AND 小区归属汇总.项目数 > 1""", (project_name,))
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def get_project_band_mix_dict(conn, project_name=''):
+        """
+        获取项目的频段构成
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param project_name: 项目名称，为空则返回全部项目
+        :type project_name: str
+        :return: key为项目名称，value为{频段: 小区数}
+        :rtype: dict{str:dict{str:int}}
+        """
+        cursor = conn.cursor()
+        if project_name:
+            cursor.execute("SELECT 项目名称, 频段, 小区数 FROM 项目频段汇总 WHERE 项目名称=? ORDER BY 频段", (project_name,))
+        else:
+            cursor.execute("SELECT 项目名称, 频段, 小区数 FROM 项目频段汇总 ORDER BY 项目名称, 频段")
+        band_mix_dict_return = {}
+        for result in cursor.fetchall():
+            band_mix_dict_return.setdefault(result[0], {})[result[1]] = result[2]
+        return band_mix_dict_return
+
+    @staticmethod
+    def get_district_summary_list(conn):
+        """
+        获取各行政区的基站数和项目数
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 行政区汇总列表，包括行政区、基站数、项目数
+        :rtype: list[dict]
+        """
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 行政区, SUM(基站数), SUM(项目数) FROM (
+                SELECT 行政区, 基站数, 0 AS 项目数 FROM 行政区基站汇总
+                UNION ALL
+                SELECT 行政区, 0 AS 基站数, 项目数 FROM 行政区项目汇总)
+            GROUP BY 行政区 ORDER BY 行政区""")
+        return [{'行政区': result[0], '基站数': result[1], '项目数': result[2]} for result in cursor.fetchall()]
+
+    # 全文检索的来源表定义：来源表 -> (类型, 类型编码, {检索表列: 来源表列})，来源表中不存在的列以NULL代替
+    SEARCH_SOURCE_DEFINITIONS = {
+        '项目明细': ('项目', 1, {'名称': '项目名称', '标识': '项目名称', '行政区': '行政区', '厂家': '无线厂家',
+                             '频段': None, '项目名称': '项目名称', '基站号': None}),
+        '基站明细': ('基站', 2, {'名称': '基站名', '标识': '基站号', '行政区': '行政区', '厂家': '无线厂家',
+                             '频段': None, '项目名称': '项目名称', '基站号': '基站号'}),
+        '小区明细': ('小区', 3, {'名称': '小区名', '标识': 'CGI', '行政区': '行政区', '厂家': '无线厂家',
+                             '频段': '频段', '项目名称': '项目名称', '基站号': '基站号'}),
+    }
+
+    # 建立项目、基站、小区的FTS5全文检索表，并通过触发器与明细表保持同步
+    @staticmethod
+    def create_search_index(conn):
+        """
+        建立项目、基站、小区的FTS5全文检索表（全文检索），优先使用trigram分词以支持CGI、名称的任意子串匹配，
+        检索表rowid为来源表rowid*4+类型编码，通过触发器与三张明细表保持同步；该方法可重复调用
+        :param conn: 数据库连接
+        :type conn: Connection
+        :return: 是否成功建立（SQLite未编译FTS5模块时返回False，检索时退化为明细表LIKE扫描）
+        :rtype: bool
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='全文检索'")
+        if cursor.fetchone():
+            return True
+        columns = "类型 UNINDEXED, 名称, 标识, 行政区, 厂家, 频段, 项目名称 UNINDEXED, 基站号 UNINDEXED"
+        try:
+            cursor.execute(f"CREATE VIRTUAL TABLE 全文检索 USING fts5({columns}, tokenize='trigram')")
+        except sqlite3.OperationalError:
+            try:
+                cursor.execute(f"CREATE VIRTUAL TABLE 全文检索 USING fts5({columns})")
+            except sqlite3.OperationalError:
+                return False
+        for source_table, (search_type, type_code, column_dict) in SqliteUtils.SEARCH_SOURCE_DEFINITIONS.items():
+            cursor.execute(f"PRAGMA table_info({source_table})")
+            source_column_set = {result[1] for result in cursor.fetchall()}
+
+            def source_values(prefix):
+                return ', '.join(f'{prefix}{source_column}' if source_column in source_column_set else 'NULL'
+                                 for source_column in column_dict.values())
+
+            search_columns = ', '.join(column_dict)
+            cursor.execute(f"""
+                INSERT INTO 全文检索 (rowid, 类型, {search_columns})
+                SELECT rowid * 4 + {type_code}, '{search_type}', {source_values('')} FROM {source_table}""")
+            insert_sql = f"""
+                INSERT INTO 全文检索 (rowid, 类型, {search_columns})
+                VALUES (NEW.rowid * 4 + {type_code}, '{search_type}', {source_values('NEW.')});"""
+            delete_sql = f"DELETE FROM 全文检索 WHERE rowid = OLD.rowid * 4 + {type_code};"
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {source_table}_插入_全文检索
+                AFTER INSERT ON {source_table} FOR EACH ROW
+                BEGIN {insert_sql} END""")
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {source_table}_删除_全文检索
+                AFTER DELETE ON {source_table} FOR EACH ROW
+                BEGIN {delete_sql} END""")
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {source_table}_更新_全文检索
+                AFTER UPDATE ON {source_table} FOR EACH ROW
+                BEGIN {delete_sql} {insert_sql} END""")
+        conn.commit()
+        return True
+
+    # 在项目、基站、小区中进行全文检索，返回按相关度排序的结果
+    @staticmethod
+    def search(conn, keyword, limit=50):
+        """
+        在项目、基站、小区的名称、标识（项目名称、基站号、CGI）、行政区、厂家、频段中检索关键字，返回按相关度排序的结果，
+        关键字不少于3个字符时使用FTS5索引（bm25排序），不足3个字符时（trigram无法索引）在检索表中进行LIKE匹配
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param keyword: 关键字
+        :type keyword: str
+        :param limit: 最多返回条数
+        :type limit: int
+        :return: 检索结果，包括类型（项目/基站/小区）、名称、标识、行政区、项目名称、基站号，可用于在项目树中定位
+        :rtype: list[dict]
+        """
+        keyword = keyword.strip()
+        if not keyword:
+            return []
+        cursor = conn.cursor()
+        select_sql = "SELECT 类型, 名称, 标识, 行政区, 项目名称, 基站号 FROM 全文检索"
+        like_keyword = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        like_sql = f"""{select_sql}
+            WHERE 名称 LIKE ? ESCAPE '\\' OR 标识 LIKE ? ESCAPE '\\' OR 行政区 LIKE ? ESCAPE '\\'
+            OR 厂家 LIKE ? ESCAPE '\\' OR 频段 LIKE ? ESCAPE '\\'
+            ORDER BY rowid % 4, length(标识) LIMIT ?"""
+        try:
+            if len(keyword) >= 3:
+                cursor.execute(f"{select_sql} WHERE 全文检索 MATCH ? ORDER BY rank LIMIT ?",
+                               ('"' + keyword.replace('"', '""') + '"', limit))
+            else:
+                cursor.execute(like_sql, (like_keyword,) * 5 + (limit,))
+        except sqlite3.OperationalError:
+            # 未建立全文检索表时退化为明细表扫描
+            results = []
+            for source_table, (search_type, _, column_dict) in SqliteUtils.SEARCH_SOURCE_DEFINITIONS.items():
+                cursor.execute(f"PRAGMA table_info({source_table})")
+                source_column_set = {result[1] for result in cursor.fetchall()}
+                select_columns = ', '.join(source_column if source_column in source_column_set else 'NULL'
+                                           for source_column in column_dict.values())
+                match_columns = [column_dict[search_column] for search_column in ('名称', '标识', '行政区', '厂家', '频段')
+                                 if column_dict[search_column] in source_column_set]
+                cursor.execute(f"""
+                    SELECT {select_columns} FROM {source_table}
+                    WHERE {' OR '.join(f"{column} LIKE ? ESCAPE '\\'" for column in match_columns)}
+                    LIMIT ?""", (like_keyword,) * len(match_columns) + (limit - len(results),))
+                results.extend((search_type, result[0], result[1], result[2], result[5], result[6])
+                               for result in cursor.fetchall())
+                if len(results) >= limit:
+                    break
+            column_names = ['类型', '名称', '标识', '行政区', '项目名称', '基站号']
+            return [dict(zip(column_names, (str(value) if value is not None else '' for value in result)))
+                    for result in results]
+        column_names = [description[0] for description in cursor.description]
+        return [dict(zip(column_names, (str(value) if value is not None else '' for value in result)))
+                for result in cursor.fetchall()]
+
     @staticmethod
     def get_project_cgi_list(conn, project_name):
         """
@@ -202,6 +1207,27 @@ class SqliteUtils:
             cgi_return.append(result[0])
         return cgi_return
 
+    @staticmethod
+    def get_gnb_cgi_dict(conn, gnbid_list):
+        """
+        批量获取基站的小区号（CGI）列表，用于明细缓存的预取
+        :param conn: 数据库连接
+        :type conn: Connection
+        :param gnbid_list: 基站号列表
+        :type gnbid_list: list[str]
+        :return: key为基站号，value为小区号（CGI）列表
+        :rtype: dict{str:list[str]}
+        """
+        cursor = conn.cursor()
+        gnb_cgi_dict = {str(gnbid): [] for gnbid in gnbid_list}
+        gnbid_list = list(gnb_cgi_dict)
+        for start in range(0, len(gnbid_list), 500):
+            chunk = gnbid_list[start:start + 500]
+            cursor.execute(f"SELECT 基站号, CGI FROM 小区明细 WHERE 基站号 IN ({','.join('?' * len(chunk))})", chunk)
+            for gnbid, cgi in cursor.fetchall():
+                gnb_cgi_dict[str(gnbid)].append(cgi)
+        return gnb_cgi_dict
+
     @staticmethod
     def get_project_type(conn, project_name):
         """